@@ -0,0 +1,71 @@
+"""
+Per-call latency of YouTube Data API requests: a fresh discovery build and transport
+per call (the old YouTubeAPI behaviour) against the shared client with a keep-alive pool.
+
+Runs offline against a local HTTP/1.1 server that answers videos.list.
+
+    python -m benchmarks.bench_api_client --calls 200
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httplib2
+
+from src.core import api_client
+
+from .common import percentiles
+
+RESPONSE = json.dumps({"items": [{"id": "abc", "snippet": {"title": "t"}}]}).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(calls):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    options = {"api_endpoint": f"http://127.0.0.1:{server.server_port}/"}
+
+    try:
+        # 기존 방식: 호출마다 discovery 문서를 파싱하고 새 HTTP 연결을 만듦
+        cold = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            service = api_client.build_youtube_service(developer_key="bench", client_options=options)
+            service.videos().list(part="snippet", id="abc").execute(http=httplib2.Http())
+            cold.append(time.perf_counter() - started)
+
+        # 공유 클라이언트: 서비스는 한 번만 만들고 keep-alive 연결을 재사용
+        client = api_client.YouTubeClient(
+            api_client.build_youtube_service(developer_key="bench", client_options=options),
+            api_client.HttpPool())
+        pooled = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            client.execute(client.service.videos().list(part="snippet", id="abc"))
+            pooled.append(time.perf_counter() - started)
+    finally:
+        server.shutdown()
+
+    return {"calls": calls, "fresh_client": percentiles(cold), "shared_client": percentiles(pooled)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100)
+    print(json.dumps(run(parser.parse_args().calls), indent=4))
@@ -0,0 +1,104 @@
+"""
+Cold import time of the service entry points, measured with `python -X importtime`.
+
+Each module is imported in a fresh interpreter several times; the report has the median
+cumulative import time, the slowest imports underneath it, and any heavy dependency
+(googleapiclient, pytubefix, ...) that the import pulled in, which should stay deferred
+to the background warm-up.
+
+    python -m benchmarks.bench_import --runs 5
+    python -m benchmarks.bench_import --budget-ms 800
+
+With --budget-ms the run fails (exit code 1) if src.main takes longer than the budget or
+loads a heavy dependency.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+MODULES = ("src.core.config", "src", "src.main", "src.pipeline")
+# 서비스 시작 시 불러오면 안 되는 무거운 의존성
+HEAVY_MODULES = ("googleapiclient", "pytubefix", "google.cloud.storage", "google_auth_oauthlib",
+                 "numpy", "moviepy", "PIL")
+BUDGETED_MODULE = "src.main"
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module):
+    """
+    Imports `module` in a fresh interpreter.
+    :return: (cumulative seconds, {imported module: (self seconds, cumulative seconds)}).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, STARTUP_WARMUP="0"))
+    imported = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        imported[name] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+        if name == module:
+            total = int(cumulative_us) / 1e6
+    return total, imported
+
+
+def run(modules=MODULES, runs=5, top=10):
+    report = {}
+    for module in modules:
+        totals = []
+        imported = {}
+        for _ in range(runs):
+            total, imported = import_profile(module)
+            totals.append(total)
+        slowest = sorted(imported.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        report[module] = {
+            "median_ms": round(statistics.median(totals) * 1000, 1),
+            "min_ms": round(min(totals) * 1000, 1),
+            "modules_imported": len(imported),
+            "heavy_dependencies": [heavy for heavy in HEAVY_MODULES if heavy in imported],
+            "slowest_self_ms": {name: round(self_s * 1000, 1) for name, (self_s, _) in slowest},
+        }
+    return {"python": sys.version.split()[0], "runs": runs, "modules": report}
+
+
+def check_budget(result, budget_ms):
+    """:return: A list of budget violations for BUDGETED_MODULE (empty if none)."""
+    entry = result["modules"].get(BUDGETED_MODULE)
+    if entry is None:
+        return []
+    problems = []
+    if budget_ms and entry["median_ms"] > budget_ms:
+        problems.append(f"{BUDGETED_MODULE}: {entry['median_ms']:.1f} ms > budget {budget_ms:.1f} ms")
+    if entry["heavy_dependencies"]:
+        problems.append(f"{BUDGETED_MODULE} imports {', '.join(entry['heavy_dependencies'])} at start-up")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--module", action="append", help="module to measure (repeatable)")
+    parser.add_argument("--budget-ms", type=float, help=f"fail if {BUDGETED_MODULE} is slower than this")
+    args = parser.parse_args()
+
+    result = run(modules=tuple(args.module or MODULES), runs=args.runs)
+    problems = check_budget(result, args.budget_ms) if args.budget_ms is not None else []
+    result["problems"] = problems
+    print(json.dumps(result, indent=4))
+    for message in problems:
+        print(f"BUDGET {message}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Offline end-to-end benchmark of the pipeline stages on synthetic media.
+
+Generates lavfi source clips, serves them through a fake Data API / googlevideo server
+and an in-memory GCS, swaps pytubefix for a stub, then times credential loading,
+collect_videos, VideoProcessor.run_processing, run_upload and run_analysis. Everything
+runs in a scratch directory, so the real state store and caches are untouched.
+
+    python -m benchmarks.bench_pipeline --copies 2 --output benchmarks/results/run.json
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/baseline.json
+
+With --compare the run fails (exit code 1) if any stage got slower than the baseline
+by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httplib2
+
+from src.core import api_client, config
+from src.core import manifest, quota, response_cache, state_store
+
+from . import media
+from .common import percentiles
+from .fakes import FakeStorageClient, FakeYouTubeBackend, fake_youtube_class
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _isolate(workdir):
+    """Points every path and process-wide singleton at a scratch directory."""
+    config.STATE_DB_FILE = os.path.join(workdir, "state.db")
+    config.VIDEO_LIST_FILE = os.path.join(workdir, "video_list.json")
+    config.UPLOADED_VIDEOS_FILE = os.path.join(workdir, "uploaded_videos.json")
+    config.API_CACHE_DIR = os.path.join(workdir, "api_cache")
+    config.DOWNLOADS_DIR = os.path.join(workdir, "downloads")
+    config.PROCESSED_DIR = os.path.join(workdir, "processed")
+    config.THUMBNAILS_DIR = os.path.join(workdir, "thumbnails")
+    config.ANALYTICS_REPORT_FILE = os.path.join(workdir, "analytics_report.csv")
+    config.DAILY_QUOTA_UNITS = 10 ** 9
+    state_store._store = None
+    quota._ledger = None
+    response_cache._cache = None
+    manifest._manifest = None
+    api_client.clear_clients()
+
+
+def _fake_credentials(storage, bucket, blob):
+    token = {
+        "token": "bench-token",
+        "refresh_token": "bench-refresh",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "client_id": "bench",
+        "client_secret": "bench",
+        "scopes": ["https://www.googleapis.com/auth/youtube"],
+        "expiry": (datetime.utcnow() + timedelta(days=1)).isoformat(),
+    }
+    storage.bucket(bucket).blob(blob).upload_from_string(json.dumps(token))
+
+
+def _timed(results, name, fn, items_of=len):
+    started = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - started
+    items = items_of(value)
+    results[name] = {
+        "seconds": round(seconds, 4),
+        "items": items,
+        "items_per_sec": round(items / seconds, 3) if seconds and items else 0.0,
+    }
+    return value
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(specs=media.DEFAULT_CLIPS, copies=1, latency=0.0, clip_dir=None, keep_workdir=False):
+    """
+    Runs every stage once and returns the result document.
+    :param copies: How many search results (videos) each synthetic clip appears as.
+    :param latency: Seconds added to every fake API response.
+    :param clip_dir: Where generated clips are kept between runs (default: inside the workdir).
+    """
+    workdir = tempfile.mkdtemp(prefix="shorts-bench-")
+    clip_dir = clip_dir or os.path.join(workdir, "clips")
+    _isolate(workdir)
+
+    started = time.perf_counter()
+    clips = media.make_clips(specs, clip_dir)
+    generate_seconds = time.perf_counter() - started
+
+    sources = {f"{name}-{copy}": path for name, path in clips.items() for copy in range(copies)}
+    backend = FakeYouTubeBackend(sources, latency=latency).start()
+    config.YOUTUBE_API_ENDPOINT = backend.endpoint
+    # API 호출(httplib2)과 다운로드(requests)가 가짜 서버의 자체 서명 인증서를 신뢰하도록 설정
+    httplib2.CA_CERTS = backend.ca_file
+    os.environ["REQUESTS_CA_BUNDLE"] = backend.ca_file
+
+    # 무거운 모듈은 경로를 바꾼 뒤에 불러옵니다
+    from src.analysis import analyze
+    from src.collection import collect
+    from src.core.credentials_manager import CredentialManager
+    from src.processing import process
+    from src.upload import upload
+
+    process.YouTube = fake_youtube_class(backend)
+    config.MAX_DAILY_UPLOADS = config.UPLOADS_PER_INTERVAL = len(sources) + 1
+    max_pages = -(-len(sources) // 10)
+
+    storage = FakeStorageClient(latency=latency)
+    _fake_credentials(storage, "bench-bucket", "token.json")
+    stages = {}
+    try:
+        manager = CredentialManager("bench-bucket", "token.json", ["https://www.googleapis.com/auth/youtube"],
+                                    storage_client=storage)
+        credentials = _timed(stages, "credentials", manager.get, items_of=lambda creds: 1)
+        manager.close()
+
+        videos = _timed(stages, "collect", lambda: collect.collect_videos(credentials, max_pages=max_pages))
+        # 같은 입력으로 다시 수집하면 응답 캐시가 적중해야 합니다. 업로드 뒤에는 이미 올린 원본을
+        # 건너뛰므로 업로드 전에 같은 작업량으로 측정합니다
+        warm = _timed(stages, "collect_warm", lambda: collect.collect_videos(credentials, max_pages=max_pages))
+        if len(warm) != len(videos):
+            raise RuntimeError(f"Warm collect returned {len(warm)} videos, cold collect {len(videos)}")
+
+        processor = process.VideoProcessor()
+        _timed(stages, "process", lambda: processor.run_processing(videos), items_of=lambda count: count)
+        stages["process"]["latency"] = percentiles([s["elapsed"] for s in processor.encode_stats])
+        stages["process"]["modes"] = {mode: sum(1 for s in processor.encode_stats if s["mode"] == mode)
+                                      for mode in ("remux", "copy", "encode")}
+
+        _timed(stages, "upload", lambda: upload.run_upload(processor.processed_videos, credentials))
+        stages["upload"]["latency"] = percentiles(backend.timings["videos.insert.session"])
+        stages["upload"]["thumbnails"] = len(backend.thumbnails)
+
+        _timed(stages, "analysis", lambda: analyze.run_analysis(credentials),
+               items_of=lambda ok: len(backend.uploads) if ok else 0)
+    finally:
+        backend.stop()
+        config.YOUTUBE_API_ENDPOINT = None
+
+    cache = response_cache.get_response_cache()
+    result = {
+        "benchmark": "pipeline",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "copies": copies,
+            "latency": latency,
+            "transcode_mode": config.TRANSCODE_MODE,
+            "max_parallel_encodes": config.MAX_PARALLEL_ENCODES,
+            "download_workers": config.DOWNLOAD_WORKERS,
+            "clips": media.describe(specs),
+        },
+        "clip_generation_seconds": round(generate_seconds, 3),
+        "stages": stages,
+        "api_calls": {route: dict(percentiles(samples), calls=len(samples))
+                      for route, samples in sorted(backend.timings.items())},
+        "api_cache": cache.stats() if cache else None,
+        "quota": quota.get_quota_ledger().snapshot(),
+    }
+
+    state_store.get_state_store().close()
+    if keep_workdir:
+        result["workdir"] = workdir
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def compare(result, baseline, tolerance, min_seconds=0.05):
+    """
+    Compares stage wall times with a baseline document.
+    Stages faster than min_seconds in the baseline are reported but never flagged (too noisy).
+    :return: A list of regression messages (empty if none).
+    """
+    regressions = []
+    for name, stage in result["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before or not before.get("seconds"):
+            continue
+        ratio = stage["seconds"] / before["seconds"]
+        stage["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + tolerance and before["seconds"] >= min_seconds:
+            regressions.append(f"{name}: {before['seconds']:.3f}s -> {stage['seconds']:.3f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=1, help="videos per synthetic clip")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each fake API call")
+    parser.add_argument("--clip-dir", help="keep generated clips here between runs")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument("--compare", help="baseline result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown per stage (0.2 = 20%%)")
+    parser.add_argument("--keep-workdir", action="store_true")
+    args = parser.parse_args()
+
+    result = run(copies=args.copies, latency=args.latency, clip_dir=args.clip_dir,
+                 keep_workdir=args.keep_workdir)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        result["regressions"] = regressions
+
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"pipeline-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=4)
+
+    print(json.dumps(result["stages"], indent=4))
+    print(f"Results written to {output}")
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Single-pass render (processing/render.py) against the multi-pass chain of ffmpeg_utils steps.
+
+For each synthetic source the same Short (9:16 reframe, title, ducked music, intro and
+outro) three ways: with plan_render's single filter_complex, with the warm asset cache
+(main part encoded alone, cached bumpers joined by stream copy), and the file-to-file way:
+trim -> change_aspect_ratio -> add_text_overlay -> music mix -> merge_clips. Reported per
+clip: wall time, bytes written to disk (intermediates included) and the number of video
+encode generations.
+
+    python -m benchmarks.bench_render --duration 20 --output benchmarks/results/render.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from src.core import config, ffmpeg_utils
+from src.processing.assets import AssetCache, output_profile
+from src.processing.render import RenderSpec, render
+
+from . import media
+
+SOURCES = (
+    media.ClipSpec("landscape_720p", 40, 1280, 720),
+    media.ClipSpec("vertical_720p", 40, 720, 1280),
+)
+INTRO = media.ClipSpec("intro", 2, 1280, 720)
+OUTRO = media.ClipSpec("outro", 2, 720, 1280)
+
+
+def make_music(output_dir, duration=10):
+    path = os.path.join(output_dir, "music.mp3")
+    if not os.path.exists(path):
+        subprocess.run([config.FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+                        "-f", "lavfi", "-i", f"anoisesrc=d={duration}:c=pink:a=0.3",
+                        "-c:a", "libmp3lame", path], check=True, capture_output=True)
+    return path
+
+
+def _written(paths):
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def single_pass(spec, assets=False):
+    started = time.perf_counter()
+    result = render(spec, assets=assets)
+    seconds = round(time.perf_counter() - started, 3)
+    written = _written([spec.output])
+    if result["concat"] == "copy":
+        # 본편 임시 파일은 렌더 후 삭제되므로 출력 길이 비율로 추정합니다
+        written += int(written * (result["duration"] - _bumper_seconds(spec, assets)) / result["duration"])
+    return {"seconds": seconds, "bytes_written": written, "video_encodes": 1}
+
+
+def _bumper_seconds(spec, assets):
+    profile = output_profile(spec.width, spec.height, spec.fps)
+    return sum(ffmpeg_utils.probe(assets.prepare_clip(path, profile))['duration']
+               for path in (spec.intro, spec.outro) if path)
+
+
+def multi_pass(spec, workdir):
+    """The same Short built step by step, each step writing a full intermediate file."""
+    steps = {}
+    outputs = []
+    encodes = 0
+
+    def step(name, fn, output, encodes_video=True):
+        nonlocal encodes
+        started = time.perf_counter()
+        fn(output)
+        steps[name] = round(time.perf_counter() - started, 3)
+        outputs.append(output)
+        encodes += 1 if encodes_video else 0
+        return output
+
+    bumpers = sum(ffmpeg_utils.probe(path)['duration'] for path in (spec.intro, spec.outro) if path)
+    main_seconds = spec.duration - bumpers
+    trimmed = os.path.join(workdir, "1_trim.mp4")
+    mode = {}
+    step("trim", lambda out: mode.update(ffmpeg_utils.make_short(spec.source, out, main_seconds, spec.start)),
+         trimmed, encodes_video=False)
+    encodes += mode.get("mode") == "encode"
+
+    current = step("reframe", lambda out: ffmpeg_utils.change_aspect_ratio(trimmed, out, spec.width, spec.height),
+                   os.path.join(workdir, "2_reframe.mp4"))
+    if spec.title:
+        source = current
+        current = step("title", lambda out: ffmpeg_utils.add_text_overlay(
+            source, out, spec.title, spec.font_file, spec.font_size, spec.title_position),
+            os.path.join(workdir, "3_title.mp4"))
+    if spec.music:
+        source = current
+        current = step("music", lambda out: ffmpeg_utils.run_ffmpeg([
+            "-i", source, "-stream_loop", "-1", "-i", spec.music,
+            "-filter_complex", f"[1:a]volume={spec.music_volume}[m];[0:a][m]amix=inputs=2:duration=first[a]",
+            "-map", "0:v", "-map", "[a]", "-c:v", "copy"] + ffmpeg_utils.AUDIO_ENCODE_ARGS + [out]),
+            os.path.join(workdir, "4_music.mp4"), encodes_video=False)
+    clips = [path for path in (spec.intro, current, spec.outro) if path]
+    if len(clips) > 1:
+        step("concat", lambda out: mode.update(concat=ffmpeg_utils.merge_clips(clips, out)),
+             os.path.join(workdir, "5_concat.mp4"), encodes_video=False)
+        encodes += mode["concat"] == "encode"
+
+    return {
+        "seconds": round(sum(steps.values()), 3),
+        "bytes_written": _written(outputs),
+        "video_encodes": encodes,
+        "steps": steps,
+    }
+
+
+def run(duration=20, reframe="pad", clip_dir=None, threads=None):
+    workdir = tempfile.mkdtemp(prefix="shorts-render-")
+    clip_dir = clip_dir or os.path.join(workdir, "clips")
+    try:
+        intro = media.make_clip(INTRO, clip_dir)
+        outro = media.make_clip(OUTRO, clip_dir)
+        music = make_music(clip_dir)
+        title = "벤치마크 제목 Benchmark title"
+
+        assets = AssetCache(os.path.join(workdir, "asset_cache"))
+        results = {}
+        for clip in SOURCES:
+            source = media.make_clip(clip, clip_dir)
+            clip_workdir = os.path.join(workdir, clip.name)
+            os.makedirs(clip_workdir)
+            spec = RenderSpec(source, os.path.join(clip_workdir, "single.mp4"), start=5.0, duration=duration,
+                              reframe=reframe, title=title, music=music, intro=intro, outro=outro,
+                              threads=threads)
+            single = single_pass(spec)
+            _bumper_seconds(spec, assets)  # 캐시 준비 시간은 측정에서 제외
+            assets.prepare_music(music, output_profile(spec.width, spec.height, spec.fps))
+            spec.output = os.path.join(clip_workdir, "cached.mp4")
+            cached = single_pass(spec, assets)
+            multi = multi_pass(spec, clip_workdir)
+            results[clip.name] = {
+                "single_pass": single,
+                "single_pass_cached_assets": cached,
+                "multi_pass": multi,
+                "speedup": round(multi["seconds"] / single["seconds"], 2) if single["seconds"] else None,
+                "speedup_cached": round(multi["seconds"] / cached["seconds"], 2) if cached["seconds"] else None,
+                "bytes_saved": multi["bytes_written"] - single["bytes_written"],
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "benchmark": "render",
+        "params": {"duration": duration, "reframe": reframe, "threads": threads,
+                   "resolution": [spec.width, spec.height], "cpu_count": os.cpu_count()},
+        "clips": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20, help="length of each Short in seconds")
+    parser.add_argument("--reframe", default="pad", choices=("crop", "pad", "auto"))
+    parser.add_argument("--threads", type=int, help="x264 threads per encode")
+    parser.add_argument("--clip-dir", help="keep generated clips here between runs")
+    parser.add_argument("--output", help="also write the result to this file")
+    args = parser.parse_args()
+
+    result = run(args.duration, args.reframe, args.clip_dir, args.threads)
+    text = json.dumps(result, indent=4)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import statistics
+
+
+def percentiles(samples):
+    """mean/p50/p95 of durations in seconds, reported in milliseconds."""
+    if not samples:
+        return {"mean_ms": None, "p50_ms": None, "p95_ms": None}
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[max(0, int(len(samples) * 0.95) - 1)] * 1000, 3),
+    }
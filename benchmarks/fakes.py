@@ -0,0 +1,356 @@
+"""
+In-process stand-ins for the Google services the pipeline talks to.
+
+FakeYouTubeBackend is a local HTTP/1.1 server speaking enough of the Data API for
+search.list, videos.list (with ETag / If-None-Match), resumable videos.insert and
+thumbnails.set (the image is kept in `thumbnails`), and it
+also serves the synthetic clips with Range support as the "googlevideo" download URLs.
+It listens on HTTPS with a throwaway self-signed certificate (googleapiclient keeps the
+https scheme for media uploads even when the endpoint is overridden); trust `ca_file`
+and point the real client at it with config.YOUTUBE_API_ENDPOINT. FakeStorageClient mimics
+the google-cloud-storage bucket/blob API used by CredentialManager, and FakeYouTube
+replaces pytubefix.YouTube.
+"""
+import collections
+import hashlib
+import json
+import os
+import re
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_PAGE_SIZE = 10
+
+
+class FakeYouTubeBackend:
+    """
+    :param media: {video_id: path to a clip} served as search results and downloads.
+    :param latency: Seconds added to every API response, to model network round trips.
+    """
+
+    def __init__(self, media, latency=0.0):
+        self.media = dict(media)
+        self.latency = latency
+        self.video_ids = list(self.media)
+        self.uploads = {}
+        self.thumbnails = {}
+        self.timings = collections.defaultdict(list)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._cert_dir = tempfile.mkdtemp(prefix="fake-youtube-tls-")
+        self.ca_file = os.path.join(self._cert_dir, "cert.pem")
+
+    @property
+    def endpoint(self):
+        return f"https://127.0.0.1:{self._server.server_port}/"
+
+    def start(self):
+        backend = self
+
+        class Handler(_Handler):
+            pass
+
+        Handler.backend = backend
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._server.socket = self._tls_context().wrap_socket(self._server.socket, server_side=True)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _tls_context(self):
+        key_file = os.path.join(self._cert_dir, "key.pem")
+        subprocess.run([
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", key_file, "-out", self.ca_file,
+        ], check=True, capture_output=True)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.ca_file, key_file)
+        return context
+
+    def record(self, route, seconds):
+        with self._lock:
+            self.timings[route].append(seconds)
+
+    def media_url(self, video_id):
+        return f"{self.endpoint}media/{video_id}"
+
+    # --- API responses ---
+
+    def search(self, query):
+        start = int(query.get("pageToken", ["0"])[0] or 0)
+        page = self.video_ids[start:start + SEARCH_PAGE_SIZE]
+        body = {
+            "kind": "youtube#searchListResponse",
+            "items": [{"id": {"kind": "youtube#video", "videoId": video_id}} for video_id in page],
+        }
+        if start + SEARCH_PAGE_SIZE < len(self.video_ids):
+            body["nextPageToken"] = str(start + SEARCH_PAGE_SIZE)
+        return body
+
+    def videos(self, query):
+        ids = query.get("id", [""])[0].split(",")
+        items = []
+        for video_id in filter(None, ids):
+            title = self.uploads.get(video_id, {}).get("title", f"Synthetic clip {video_id}")
+            items.append({
+                "id": video_id,
+                "snippet": {
+                    "title": title,
+                    "description": "Generated with ffmpeg lavfi",
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                },
+                "contentDetails": {"duration": "PT1M"},
+                "statistics": {"viewCount": "100", "likeCount": "10"},
+            })
+        return {"kind": "youtube#videoListResponse", "items": items}
+
+    def start_upload(self, metadata):
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session_id] = {"metadata": metadata, "received": 0, "started": time.monotonic()}
+        return session_id
+
+    def session_status(self, session_id):
+        """Answers a `Content-Range: bytes */total` query for an interrupted session."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return 404, {"error": "unknown session"}, {}
+            received = session["received"]
+        return 308, None, {"Range": f"bytes=0-{received - 1}"} if received else {}
+
+    def set_thumbnail(self, video_id, data, content_type):
+        """Returns (status, body) for thumbnails.set on an uploaded video."""
+        with self._lock:
+            if video_id not in self.uploads:
+                return 404, {"error": f"unknown video {video_id}"}
+            self.thumbnails[video_id] = {"bytes": len(data), "content_type": content_type, "data": data}
+        return 200, {
+            "kind": "youtube#thumbnailSetResponse",
+            "items": [{"default": {"url": f"{self.endpoint}thumbnails/{video_id}.jpg"}}],
+        }
+
+    def receive_chunk(self, session_id, first, last, total, data):
+        """Returns (status, body, headers) for one PUT of a resumable session."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return 404, {"error": "unknown session"}, {}
+            if first != session["received"]:
+                return 308, None, {"Range": f"bytes=0-{session['received'] - 1}"}
+            session["received"] = last + 1
+            if session["received"] < total:
+                return 308, None, {"Range": f"bytes=0-{last}"}
+            del self._sessions[session_id]
+            video_id = "up" + session_id[:9]
+            self.uploads[video_id] = {"title": session["metadata"].get("snippet", {}).get("title"),
+                                      "bytes": total}
+            self.timings["videos.insert.session"].append(time.monotonic() - session["started"])
+        return 200, {"kind": "youtube#video", "id": video_id, "snippet": session["metadata"].get("snippet", {})}, {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    backend = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        started = time.monotonic()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.startswith("/media/"):
+            self._serve_media(url.path.rsplit("/", 1)[1])
+            self.backend.record("media", time.monotonic() - started)
+            return
+
+        time.sleep(self.backend.latency)
+        if url.path.endswith("/search"):
+            route, body = "search.list", self.backend.search(query)
+        elif url.path.endswith("/videos"):
+            route, body = "videos.list", self.backend.videos(query)
+        else:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        payload = json.dumps(body).encode("utf-8")
+        etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", {"ETag": etag})
+        else:
+            self._send(200, payload, {"ETag": etag, "Content-Type": "application/json"})
+        self.backend.record(route, time.monotonic() - started)
+
+    def do_POST(self):
+        started = time.monotonic()
+        body = self._read_body()
+        time.sleep(self.backend.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith("/thumbnails/set"):
+            status, response = self.backend.set_thumbnail(
+                query.get("videoId", [""])[0], body, self.headers.get("Content-Type", ""))
+            self._send_json(status, response)
+            self.backend.record("thumbnails.set", time.monotonic() - started)
+            return
+        if url.path.startswith("/upload/") and "resumable" in query.get("uploadType", []):
+            session_id = self.backend.start_upload(json.loads(body or b"{}"))
+            self._send(200, b"", {"Location": f"{self.backend.endpoint}upload/session/{session_id}"})
+        else:
+            self._send_json(404, {"error": "not found"})
+        self.backend.record("videos.insert.start", time.monotonic() - started)
+
+    def do_PUT(self):
+        started = time.monotonic()
+        data = self._read_body()
+        session_id = urlparse(self.path).path.rsplit("/", 1)[1]
+        content_range = self.headers.get("Content-Range", "")
+        status_query = re.match(r"bytes \*/(\d+)", content_range)
+        if status_query:
+            status, body, headers = self.backend.session_status(session_id)
+            if body is None:
+                self._send(status, b"", headers)
+            else:
+                self._send_json(status, body, headers)
+            return
+        match = re.match(r"bytes (\d+)-(\d+)/(\d+)", content_range)
+        if not match:
+            self._send_json(400, {"error": f"bad Content-Range {content_range!r}"})
+            return
+        first, last, total = (int(group) for group in match.groups())
+        status, body, headers = self.backend.receive_chunk(session_id, first, last, total, data)
+        if body is None:
+            self._send(status, b"", headers)
+        else:
+            self._send_json(status, body, headers)
+        self.backend.record("videos.insert.chunk", time.monotonic() - started)
+
+    def _serve_media(self, video_id):
+        path = self.backend.media.get(video_id)
+        if not path:
+            self._send_json(404, {"error": "no such media"})
+            return
+        size = os.path.getsize(path)
+        first, last = 0, size - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            first = int(match.group(1))
+            last = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        with open(path, "rb") as f:
+            f.seek(first)
+            data = f.read(last - first + 1)
+        headers = {"Content-Type": "video/mp4", "Accept-Ranges": "bytes"}
+        if match:
+            headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+        self._send(206 if match else 200, data, headers)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status, body, headers=None):
+        self._send(status, json.dumps(body).encode("utf-8"), dict(headers or {}, **{"Content-Type": "application/json"}))
+
+    def _send(self, status, payload, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+
+# --- GCS ---
+
+class FakeBlob:
+    def __init__(self, store, key, latency):
+        self._store = store
+        self._key = key
+        self._latency = latency
+
+    def download_as_bytes(self):
+        time.sleep(self._latency)
+        if self._key not in self._store:
+            raise FileNotFoundError(f"gs://{self._key[0]}/{self._key[1]}")
+        return self._store[self._key]
+
+    def upload_from_string(self, data):
+        time.sleep(self._latency)
+        self._store[self._key] = data.encode("utf-8") if isinstance(data, str) else data
+
+
+class FakeBucket:
+    def __init__(self, client, name):
+        self._client = client
+        self.name = name
+
+    def blob(self, blob_name):
+        return FakeBlob(self._client.objects, (self.name, blob_name), self._client.latency)
+
+
+class FakeStorageClient:
+    """In-memory google.cloud.storage.Client with the bucket().blob() subset CredentialManager uses."""
+
+    def __init__(self, latency=0.0):
+        self.objects = {}
+        self.latency = latency
+
+    def bucket(self, name):
+        return FakeBucket(self, name)
+
+
+# --- pytubefix ---
+
+class FakeStream:
+    def __init__(self, backend, video_id):
+        self.itag = 18
+        self.subtype = "mp4"
+        self.resolution = "720p"
+        self.url = backend.media_url(video_id)
+        self.filesize = os.path.getsize(backend.media[video_id])
+
+
+class FakeStreamQuery:
+    def __init__(self, streams):
+        self._streams = streams
+
+    def filter(self, **kwargs):
+        return self
+
+    def order_by(self, attribute):
+        return self
+
+    def desc(self):
+        return self
+
+    def first(self):
+        return self._streams[0] if self._streams else None
+
+
+def fake_youtube_class(backend):
+    """Returns a pytubefix.YouTube replacement whose streams download from `backend`."""
+
+    class FakeYouTube:
+        def __init__(self, url, *args, **kwargs):
+            self.video_id = parse_qs(urlparse(url).query)["v"][0]
+            self.title = f"Synthetic clip {self.video_id}"
+            streams = [FakeStream(backend, self.video_id)] if self.video_id in backend.media else []
+            self.streams = FakeStreamQuery(streams)
+
+    return FakeYouTube
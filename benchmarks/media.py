@@ -0,0 +1,76 @@
+"""
+Synthetic source clips generated with ffmpeg's lavfi test sources.
+
+Each clip has a moving test pattern and a sine tone. The length, resolution, frame
+rate and codecs vary so that every processing path is exercised: an h264/aac clip
+under SHORT_DURATION is remuxed, a longer one is stream-copied, and other codecs are
+re-encoded.
+"""
+import os
+import subprocess
+from dataclasses import asdict, dataclass
+
+from src.core import config
+
+
+@dataclass(frozen=True)
+class ClipSpec:
+    name: str
+    duration: float
+    width: int
+    height: int
+    fps: int = 30
+    video_codec: str = "libx264"
+    audio_codec: str = "aac"
+
+    @property
+    def file_name(self):
+        return f"{self.name}.mp4"
+
+
+# 기본 구성: 리먹스 / 스트림 복사(트림) / 재인코딩 경로를 하나 이상씩 포함
+DEFAULT_CLIPS = (
+    ClipSpec("short_h264_720p", 8, 1280, 720),
+    ClipSpec("long_h264_vertical", 75, 720, 1280),
+    ClipSpec("mpeg4_480p", 20, 854, 480, fps=25, video_codec="mpeg4"),
+    ClipSpec("h264_mp3_360p", 30, 640, 360, audio_codec="libmp3lame"),
+)
+
+
+def make_clip(spec, output_dir, overwrite=False):
+    """
+    Renders `spec` into output_dir (reusing an existing file unless overwrite is set).
+    :return: Path of the generated clip.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, spec.file_name)
+    if os.path.exists(path) and not overwrite:
+        return path
+
+    video_args = ["-c:v", spec.video_codec, "-pix_fmt", "yuv420p"]
+    if spec.video_codec == "libx264":
+        # 실제 업로드 영상처럼 키프레임 간격을 2초로 둡니다
+        video_args += ["-preset", "ultrafast", "-crf", "28", "-g", str(spec.fps * 2)]
+    else:
+        video_args += ["-q:v", "5"]
+
+    cmd = [
+        config.FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={spec.width}x{spec.height}:rate={spec.fps}",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100",
+        "-t", str(spec.duration),
+        *video_args,
+        "-c:a", spec.audio_codec, "-b:a", "128k",
+        "-shortest", path,
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return path
+
+
+def make_clips(specs, output_dir, overwrite=False):
+    """Generates every spec and returns {spec.name: path}."""
+    return {spec.name: make_clip(spec, output_dir, overwrite) for spec in specs}
+
+
+def describe(specs):
+    return [asdict(spec) for spec in specs]
@@ -1,19 +1,31 @@
 """
 YouTube Shorts Automation Package
 """
-
-from .core import get_credentials, YouTubeAPI
-from .collection import collect_videos
-from .processing import VideoProcessor
-from .upload import run_upload
-from .analysis import run_analysis
+import importlib
 
 __version__ = "0.1.0"
-__all__ = [
-    'get_credentials',
-    'YouTubeAPI',
-    'collect_videos',
-    'VideoProcessor',
-    'run_upload',
-    'run_analysis',
-]
+
+# 공개 이름은 처음 접근할 때 불러옵니다 (PEP 562): `import src.core.config`만으로
+# googleapiclient, pytubefix 등 무거운 의존성이 로드되지 않도록 합니다
+_EXPORTS = {
+    'get_credentials': 'src.core',
+    'YouTubeAPI': 'src.core',
+    'collect_videos': 'src.collection',
+    'VideoProcessor': 'src.processing',
+    'run_upload': 'src.upload',
+    'run_analysis': 'src.analysis',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,26 +1,25 @@
 import csv
-import json
 import logging
 from ..core import config
 from ..core.youtube_api import YouTubeAPI
+from ..core.manifest import get_manifest
+from ..core.state_store import get_state_store
 
-def run_analysis():
+def run_analysis(credentials=None):
     """
     Analyzes the performance of uploaded videos and generates a CSV report.
+    :param credentials: OAuth 2.0 credentials; falls back to config.YOUTUBE_API_KEY.
     """
     logging.info("Initializing performance analysis.")
-    api = YouTubeAPI() # Use OAuth 2.0 for reading stats
+    if credentials:
+        api = YouTubeAPI(credentials=credentials) # Use OAuth 2.0 for reading stats
+    else:
+        api = YouTubeAPI(developerKey=config.YOUTUBE_API_KEY)
     if not api.youtube:
         logging.error("Failed to initialize YouTube API client. Aborting analysis.")
         return False
         
-    try:
-        with open(config.UPLOADED_VIDEOS_FILE, 'r', encoding='utf-8') as f:
-            uploaded_videos = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logging.warning("No uploaded videos log found. Nothing to analyze.")
-        return True
-        
+    uploaded_videos = get_state_store().list_uploads()
     if not uploaded_videos:
         logging.warning("Uploaded videos log is empty. Nothing to analyze.")
         return True
@@ -34,10 +33,11 @@ def run_analysis():
     
     report_data = []
     
-    # YouTube API allows fetching details for multiple video IDs at once
-    # For this placeholder, we'll iterate
+    # YouTube API allows fetching details for up to 50 video IDs at once
+    # 통계는 매번 바뀌므로 캐시를 항상 재검증(ETag)합니다
+    details_by_id = api.get_videos_details(video_ids, cache_ttl=0)
     for video_id in video_ids:
-        details = api.get_video_details(video_id)
+        details = details_by_id.get(video_id)
         if details:
             snippet = details.get('snippet', {})
             stats = details.get('statistics', {})
@@ -63,6 +63,12 @@ def run_analysis():
             writer.writeheader()
             writer.writerows(report_data)
         logging.info(f"Analytics report successfully saved to {config.ANALYTICS_REPORT_FILE}")
+        # 분석된 업로드의 원본 항목에 analysed 단계를 기록합니다
+        reported = {row['VideoID'] for row in report_data}
+        manifest = get_manifest()
+        for video in uploaded_videos:
+            if video.get('source_video_id') and video['id'] in reported:
+                manifest.mark(video['source_video_id'], "analysed", video['id'], config.ANALYTICS_REPORT_FILE)
     except IOError as e:
         logging.error(f"Failed to write analytics report: {e}")
         return False
@@ -1,3 +1,3 @@
-from .collect import collect_videos
+from .collect import collect_videos, collection_stats, iter_videos
 
-__all__ = ['collect_videos'] 
\ No newline at end of file
+__all__ = ['collect_videos', 'collection_stats', 'iter_videos']
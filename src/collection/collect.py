@@ -1,44 +1,92 @@
-import json
 import logging
 from src.core.youtube_api import YouTubeAPI
-from src.core import config
-import os
-from typing import List, Dict
+from src.core.manifest import get_manifest
+from src.core.state_store import get_state_store
+from typing import Dict, Iterator, List
 
 logger = logging.getLogger(__name__)
 
+# 마지막 수집 실행의 API 호출 통계: 실제로 보낸 요청 수(응답 캐시 적중 제외)와
+# 비디오별 개별 조회(검색 + N회) 대비 줄인 요청 수
+collection_stats = {
+    "api_calls": 0,
+    "api_calls_saved": 0,
+}
+
 # 비디오 수집
-def collect_videos(credentials) -> List[Dict]:
+def collect_videos(credentials, max_pages=1, skip_ids=()) -> List[Dict]:
+    """
+    Searches for Shorts and fetches their details.
+    :param max_pages: Number of search result pages to request (100 units each); 0 skips the search.
+    :param skip_ids: Video IDs to leave out, see iter_videos.
+    """
     try:
-        # YouTube API 클라이언트 초기화
-        api = YouTubeAPI(credentials=credentials)
-        if not api.youtube:
-            logger.error("YouTube API 클라이언트 초기화 실패")
-            return []
+        videos = list(iter_videos(credentials, max_pages=max_pages, skip_ids=skip_ids))
+        logger.info(f"총 {len(videos)}개의 비디오를 수집했습니다.")
+        return videos
+    except Exception as e:
+        logger.error(f"비디오 수집 중 오류 발생: {str(e)}")
+        return []
+
+def iter_videos(credentials, max_pages=1, skip_ids=()) -> Iterator[Dict]:
+    """
+    Yields collected videos page by page, so downstream stages can start on the first
+    page while later pages are still being searched. Each page is stored as it arrives.
+    :param max_pages: Number of search result pages to request (100 units each); 0 skips the search.
+    :param skip_ids: Video IDs already queued elsewhere (e.g. resumed from an earlier run).
+    """
+    collection_stats["api_calls"] = 0
+    collection_stats["api_calls_saved"] = 0
+    if max_pages <= 0:
+        logger.warning("남은 API 쿼터가 부족하여 비디오 수집을 건너뜁니다.")
+        return
+
+    # YouTube API 클라이언트 초기화
+    api = YouTubeAPI(credentials=credentials)
+    if not api.youtube:
+        logger.error("YouTube API 클라이언트 초기화 실패")
+        return
+
+    # 검색 쿼리 설정
+    search_query = "shorts"  # 실제 검색어로 수정 필요
 
-        # 검색 쿼리 설정
-        search_query = "shorts"  # 실제 검색어로 수정 필요
-        
-        # 비디오 검색
-        search_response = api.youtube.search().list(
+    store = get_state_store()
+    manifest = get_manifest()
+    seen_ids = set(skip_ids)
+    page_token = None
+    # 비디오 검색 (쿼터 계획에 따라 최대 max_pages 페이지)
+    for _ in range(max_pages):
+        requests_before = api.requests_sent
+        search_response = api.execute(api.youtube.search().list(
             q=search_query,
             part="id,snippet",
             maxResults=10,
             type="video",
-            videoDuration="short"
-        ).execute()
+            videoDuration="short",
+            pageToken=page_token
+        ))
 
-        # 검색 결과 처리
-        videos = []
+        # 검색 결과에서 비디오 ID를 먼저 모은 뒤, videos.list를 50개 단위로 일괄 조회
+        # 이미 업로드한 원본은 건너뜁니다
+        video_ids = []
         for item in search_response.get("items", []):
             video_id = item["id"]["videoId"]
-            video_details = api.youtube.videos().list(
-                part="snippet,contentDetails",
-                id=video_id
-            ).execute()
+            if video_id in seen_ids:
+                continue
+            seen_ids.add(video_id)
+            if store.is_uploaded_source(video_id):
+                logger.info(f"이미 업로드한 비디오를 건너뜁니다: {video_id}")
+                continue
+            video_ids.append(video_id)
+
+        details_by_id = api.get_videos_details(video_ids, part="snippet,contentDetails")
+        api_calls = api.requests_sent - requests_before
 
-            if video_details["items"]:
-                video_info = video_details["items"][0]
+        # 검색 결과 순서를 유지하여 결과 구성
+        videos = []
+        for video_id in video_ids:
+            video_info = details_by_id.get(video_id)
+            if video_info:
                 videos.append({
                     "id": video_id,
                     "title": video_info["snippet"]["title"],
@@ -47,19 +95,25 @@ def collect_videos(credentials) -> List[Dict]:
                     "publishedAt": video_info["snippet"]["publishedAt"]
                 })
 
-        logger.info(f"총 {len(videos)}개의 비디오를 수집했습니다.")
+        # 비디오별 개별 조회(검색 + N회) 대비 절약한 API 호출 수 (일괄 조회와 캐시 적중 포함)
+        collection_stats["api_calls"] += api_calls
+        collection_stats["api_calls_saved"] += (1 + len(video_ids)) - api_calls
+        logger.info(
+            f"API 호출 {collection_stats['api_calls']}회까지 수집 진행 "
+            f"(개별 조회 대비 {collection_stats['api_calls_saved']}회 절약)"
+        )
 
-        # 수집된 비디오 정보를 파일로 저장
-        os.makedirs(os.path.dirname(config.VIDEO_LIST_FILE), exist_ok=True)
-        with open(config.VIDEO_LIST_FILE, 'w', encoding='utf-8') as f:
-            json.dump(videos, f, indent=4)
-        logger.info(f"수집된 비디오 목록을 {config.VIDEO_LIST_FILE}에 저장했습니다.")
+        # 수집된 비디오 정보를 상태 저장소에 기록
+        store.add_collected(videos)
+        for video in videos:
+            manifest.mark(video["id"], "collected")
+        logger.info(f"수집된 비디오 {len(videos)}개를 {store.db_path}에 저장했습니다.")
 
-        return videos
+        yield from videos
 
-    except Exception as e:
-        logger.error(f"비디오 수집 중 오류 발생: {str(e)}")
-        return []
+        page_token = search_response.get("nextPageToken")
+        if not page_token:
+            break
 
 if __name__ == '__main__':
     collect_videos()
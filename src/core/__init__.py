@@ -1,10 +1,27 @@
-from src.core import youtube_api
-from src.core import auth
+import importlib
+
 from src.core import config
-from src.core import ffmpeg_utils
-from src.core import logging_config
 from src.core.config import *
-from src.core.auth import get_credentials
-from src.core.youtube_api import YouTubeAPI
+
+# 무거운 하위 모듈과 공개 이름은 처음 접근할 때 불러옵니다 (PEP 562)
+_SUBMODULES = {'youtube_api', 'auth', 'ffmpeg_utils', 'logging_config'}
+_EXPORTS = {
+    'get_credentials': 'src.core.auth',
+    'YouTubeAPI': 'src.core.youtube_api',
+}
 
 __all__ = ['get_credentials', 'YouTubeAPI']
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(__all__))
@@ -0,0 +1,149 @@
+import contextlib
+import queue
+import threading
+
+import google_auth_httplib2
+import googleapiclient.discovery
+import httplib2
+
+from . import config
+
+
+class HttpPool:
+    """
+    Thread-safe pool of keep-alive HTTP transports.
+
+    httplib2.Http is not thread-safe, so each caller borrows one transport for the
+    duration of a request. Transports are created lazily up to `size` and reused LIFO,
+    which keeps the most recently used TCP/TLS connections warm.
+    """
+
+    def __init__(self, credentials=None, size=None, timeout=None):
+        self.credentials = credentials
+        self.size = size or config.API_HTTP_POOL_SIZE
+        self.timeout = timeout or config.API_HTTP_TIMEOUT
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_http(self):
+        http = httplib2.Http(timeout=self.timeout)
+        # 재개 업로드의 308(Resume Incomplete)을 리다이렉트로 따라가지 않도록 합니다 (build_http와 동일)
+        http.redirect_codes = http.redirect_codes - {308}
+        if self.credentials:
+            return google_auth_httplib2.AuthorizedHttp(self.credentials, http=http)
+        return http
+
+    def set_credentials(self, credentials):
+        """Switches new and idle transports to another credentials object for the same account."""
+        self.credentials = credentials
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for http in idle:
+            if isinstance(http, google_auth_httplib2.AuthorizedHttp):
+                http.credentials = credentials
+            self._idle.put(http)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrows a transport from the pool and returns it afterwards."""
+        try:
+            http = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            http = self._new_http() if create else self._idle.get()
+        try:
+            yield http
+        finally:
+            # 빌려 간 동안 자격 증명이 교체되었으면 반납 시 맞춰 줍니다
+            if isinstance(http, google_auth_httplib2.AuthorizedHttp) and http.credentials is not self.credentials:
+                http.credentials = self.credentials
+            self._idle.put(http)
+
+
+class YouTubeClient:
+    """A YouTube Data API service object plus the HTTP pool used to execute its requests."""
+
+    def __init__(self, service, http_pool):
+        self.service = service
+        self.http_pool = http_pool
+
+    def set_credentials(self, credentials):
+        """Points the pool and the service's own transport at a new credentials object."""
+        self.http_pool.set_credentials(credentials)
+        service_http = getattr(self.service, "_http", None)
+        if isinstance(service_http, google_auth_httplib2.AuthorizedHttp):
+            service_http.credentials = credentials
+
+    def execute(self, request):
+        """Executes a googleapiclient request on a pooled transport."""
+        with self.http_pool.connection() as http:
+            return request.execute(http=http)
+
+
+_clients_by_credentials = {}
+_clients_by_key = {}
+_clients_lock = threading.Lock()
+
+
+def build_youtube_service(credentials=None, developer_key=None, **kwargs):
+    """Builds the service from the discovery document bundled with googleapiclient."""
+    if config.YOUTUBE_API_ENDPOINT and "client_options" not in kwargs:
+        kwargs["client_options"] = {"api_endpoint": config.YOUTUBE_API_ENDPOINT}
+    return googleapiclient.discovery.build(
+        config.YOUTUBE_API_SERVICE_NAME, config.YOUTUBE_API_VERSION,
+        credentials=credentials, developerKey=developer_key,
+        static_discovery=True, cache_discovery=False, **kwargs)
+
+
+def credentials_key(credentials):
+    """
+    Stable identity of the account behind a credentials object: (client_id, refresh_token)
+    for user OAuth credentials, so a reloaded or re-authorised object for the same account
+    maps to the same key; otherwise the access token.
+    """
+    refresh_token = getattr(credentials, "refresh_token", None)
+    if refresh_token:
+        return ("oauth", getattr(credentials, "client_id", None), refresh_token)
+    return ("token", getattr(credentials, "token", None) or id(credentials))
+
+
+def get_youtube_client(credentials=None, developer_key=None):
+    """
+    Returns the shared YouTubeClient for a credentials object or API key, building it once.
+    Clients are keyed by account (credentials_key), not by object: a new credentials
+    object for the same account (GCS reload, OAuth callback) is swapped into the existing
+    client's pool instead of building another client and pool.
+    """
+    with _clients_lock:
+        if credentials is not None:
+            key = credentials_key(credentials)
+            client = _clients_by_credentials.get(key)
+            if client is None:
+                client = YouTubeClient(build_youtube_service(credentials=credentials),
+                                       HttpPool(credentials=credentials))
+                _clients_by_credentials[key] = client
+            elif client.http_pool.credentials is not credentials:
+                client.set_credentials(credentials)
+            return client
+
+        client = _clients_by_key.get(developer_key)
+        if client is None:
+            client = YouTubeClient(build_youtube_service(developer_key=developer_key),
+                                   HttpPool())
+            _clients_by_key[developer_key] = client
+        return client
+
+
+def clear_clients():
+    """Drops every cached client (e.g. after the OAuth token was replaced)."""
+    with _clients_lock:
+        _clients_by_credentials.clear()
+        _clients_by_key.clear()
@@ -12,12 +12,97 @@ YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "YOUR_API_KEY_HERE")
 # Keywords to search for on YouTube
 SEARCH_KEYWORDS = ["interesting moments", "funny clips", "satisfying videos"]
 MAX_RESULTS_PER_KEYWORD = 10
+# Upper bound on search result pages per run (the quota planner may grant fewer)
+MAX_SEARCH_PAGES = int(os.getenv("MAX_SEARCH_PAGES", "3"))
+# videos.list accepts up to 50 comma-separated IDs per request
+VIDEOS_LIST_BATCH_SIZE = 50
+# Number of videos.list batches fetched concurrently
+API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", "4"))
+# Keep-alive HTTP transports shared by API calls from worker threads, and their socket timeout
+API_HTTP_POOL_SIZE = int(os.getenv("API_HTTP_POOL_SIZE", "8"))
+API_HTTP_TIMEOUT = 60
+# Optional Data API base URL (e.g. a local stand-in for offline benchmarks); unset means Google
+YOUTUBE_API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT")
+# On-disk cache for read-only API responses: per-method freshness (seconds) before an
+# ETag revalidation, and a size cap. Search results change quickly, video metadata rarely.
+API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "1") == "1"
+API_CACHE_TTLS = {
+    "search.list": int(os.getenv("API_CACHE_SEARCH_TTL", "900")),
+    "videos.list": int(os.getenv("API_CACHE_VIDEOS_TTL", "86400")),
+}
+API_CACHE_MAX_BYTES = int(os.getenv("API_CACHE_MAX_BYTES", str(64 * 1024 ** 2)))
 
 # --- Video Processing ---
 # Target duration for each Short in seconds
 SHORT_DURATION = 59
 # Video resolution for output
 OUTPUT_RESOLUTION = (1080, 1920) # (width, height)
+# Number of videos downloaded concurrently while earlier ones are transcoded
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "4"))
+# Download cache: size cap (LRU eviction), ranged chunk size, retries and socket timeout
+DOWNLOAD_CACHE_MAX_BYTES = int(os.getenv("DOWNLOAD_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))
+DOWNLOAD_CHUNK_SIZE = 9 * 1024 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 30
+# Runs in which a video may hit a transient download error (timeout, 5xx) before it is given up
+DOWNLOAD_MAX_ATTEMPTS = int(os.getenv("DOWNLOAD_MAX_ATTEMPTS", "3"))
+# Transcoding mode: "process" runs encodes in a process pool, "inline" in the calling thread
+TRANSCODE_MODE = os.getenv("TRANSCODE_MODE", "process")
+# Maximum number of concurrent encodes; CPU cores are split evenly between them
+MAX_PARALLEL_ENCODES = int(os.getenv("MAX_PARALLEL_ENCODES", "2"))
+# Highlight selection: sources longer than SHORT_DURATION are cut at the window with the
+# highest audio energy (loudness + weighted onset strength) instead of at 0s
+HIGHLIGHT_ENABLED = os.getenv("HIGHLIGHT_ENABLED", "1") == "1"
+HIGHLIGHT_SAMPLE_RATE = 8000  # Hz, mono PCM decoded for the analysis
+HIGHLIGHT_HOP = 0.1  # seconds per loudness value (start offset resolution)
+HIGHLIGHT_ONSET_WEIGHT = float(os.getenv("HIGHLIGHT_ONSET_WEIGHT", "2.0"))
+# Short rendering: "trim" only cuts the source (stream copy where possible); "render" runs the
+# single-pass planner in processing/render.py (9:16 reframe, title, music, intro/outro)
+RENDER_MODE = os.getenv("RENDER_MODE", "trim")
+# Reframe to OUTPUT_RESOLUTION: "crop", "pad" (blurred background) or "auto" (crop unless that
+# would cut away more than RENDER_MAX_CROP_LOSS of the picture)
+RENDER_REFRAME = os.getenv("RENDER_REFRAME", "auto")
+RENDER_MAX_CROP_LOSS = 0.4
+RENDER_FPS = 30
+RENDER_TITLE = os.getenv("RENDER_TITLE", "1") == "1"
+RENDER_TITLE_FONT_SIZE = 64
+# Background music level before ducking under the original audio
+RENDER_MUSIC_VOLUME = float(os.getenv("RENDER_MUSIC_VOLUME", "0.3"))
+# Titles are rasterised once with Pillow and overlaid by ffmpeg; characters missing from
+# FONT_FILE are drawn with the first fallback font that has them (os.pathsep-separated list)
+TITLE_FALLBACK_FONTS = [path for path in os.getenv("TITLE_FALLBACK_FONTS", os.pathsep.join([
+    "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Bold.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansTelugu-Bold.ttf",
+    "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+])).split(os.pathsep) if path]
+TITLE_MAX_LINES = 3
+TITLE_CACHE_MAX_FILES = 1000
+# Intro/outro and music transcoded once to the output profile (ASSET_CACHE_DIR); renders then
+# join the bumpers by stream copy instead of re-encoding them every time
+ASSET_CACHE_ENABLED = os.getenv("ASSET_CACHE_ENABLED", "1") == "1"
+
+# Thumbnails: the best keyframe of each processed Short (sharpness, exposure and colourfulness)
+# is written to THUMBNAILS_DIR at YouTube's thumbnail size and set on upload
+THUMBNAIL_ENABLED = os.getenv("THUMBNAIL_ENABLED", "1") == "1"
+THUMBNAIL_SIZE = (1280, 720)  # (width, height)
+THUMBNAIL_ANALYSIS_WIDTH = 320  # keyframes are scored at this width
+THUMBNAIL_WEIGHTS = {"sharpness": 0.5, "brightness": 0.2, "colourfulness": 0.3}
+
+# Pipeline mode: "streaming" passes each video through bounded queues between stages,
+# "batch" finishes every stage for the whole list before the next one starts
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "streaming")
+# Items each inter-stage queue may hold before the upstream stage blocks (bounds disk use)
+PIPELINE_QUEUE_DEPTH = int(os.getenv("PIPELINE_QUEUE_DEPTH", "2"))
+# Unfinished items collected within this many seconds are resumed before searching again
+PIPELINE_RESUME_MAX_AGE = int(os.getenv("PIPELINE_RESUME_MAX_AGE", str(3 * 24 * 3600)))
+# Warm credentials, the API client, pipeline imports and ffmpeg in the background at service start
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+
+# FFmpeg binaries used by ffmpeg_utils
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE_BINARY = os.getenv("FFPROBE_BINARY", "ffprobe")
 
 # --- File & Directory Paths ---
 # Base directory (project root)
@@ -30,6 +115,9 @@ CREDENTIALS_FILE = os.path.join(DATA_DIR, "credentials.json")
 VIDEO_LIST_FILE = os.path.join(DATA_DIR, "video_list.json")
 UPLOADED_VIDEOS_FILE = os.path.join(DATA_DIR, "uploaded_videos.json")
 ANALYTICS_REPORT_FILE = os.path.join(DATA_DIR, "analytics_report.csv")
+# SQLite state store (VIDEO_LIST_FILE / UPLOADED_VIDEOS_FILE are only read by its one-time importer)
+STATE_DB_FILE = os.path.join(DATA_DIR, "state.db")
+API_CACHE_DIR = os.path.join(DATA_DIR, "api_cache")
 
 # Output paths
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
@@ -37,6 +125,8 @@ DOWNLOADS_DIR = os.path.join(OUTPUT_DIR, "downloads")
 PROCESSED_DIR = os.path.join(OUTPUT_DIR, "processed")
 THUMBNAILS_DIR = os.path.join(OUTPUT_DIR, "thumbnails")
 ARCHIVE_DIR = os.path.join(OUTPUT_DIR, "archive")
+ASSET_CACHE_DIR = os.path.join(OUTPUT_DIR, "asset_cache")
+TITLE_CACHE_DIR = os.path.join(OUTPUT_DIR, "title_cache")
 
 # Asset paths
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
@@ -49,14 +139,54 @@ FONT_FILE = os.path.join(ASSETS_DIR, "fonts", "NanumGothicBold.ttf")
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
 LOG_FILE = os.path.join(LOGS_DIR, "app.log")
 
+# --- Logging (core/logging_config.py) ---
+# Root level and output format ("json" = one JSON object per line, "text" = classic lines)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Per-module levels, "module=LEVEL,module=LEVEL" (e.g. "src.processing=DEBUG")
+LOG_MODULE_LEVELS = {
+    "googleapiclient.discovery_cache": "ERROR",
+    "urllib3": "WARNING",
+    "google.auth": "WARNING",
+}
+LOG_MODULE_LEVELS.update(
+    (name.strip(), level.strip().upper())
+    for name, _, level in (item.partition("=") for item in os.getenv("LOG_MODULE_LEVELS", "").split(","))
+    if name.strip() and level.strip()
+)
+# Fraction of per-request access lines that are written (errors are always kept)
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "0.01"))
+
+# --- YouTube Data API quota ---
+# Daily unit budget of the API project (per-method costs live in core/quota.py)
+DAILY_QUOTA_UNITS = int(os.getenv("DAILY_QUOTA_UNITS", "10000"))
+
 # --- YouTube Upload Settings ---
 UPLOAD_DEFAULTS = {
     "categoryId": "24", # Entertainment
     "privacyStatus": "private", # 'private', 'public', or 'unlisted'
+    # 'public' 업로드는 private + publishAt(예약 공개)으로 올라가고 예약 시각에 공개됩니다
     "tags": ["shorts", "funny", "trending"],
     "description": "Check out this cool YouTube Short! #shorts"
 }
 
+# Upload budgets: uploads per day, uploads started per UPLOAD_INTERVAL seconds, and
+# uploads running at once
+MAX_DAILY_UPLOADS = int(os.getenv("MAX_DAILY_UPLOADS", "5"))
+UPLOADS_PER_INTERVAL = int(os.getenv("UPLOADS_PER_INTERVAL", "3"))
+UPLOAD_INTERVAL = int(os.getenv("UPLOAD_INTERVAL", "60"))
+MAX_CONCURRENT_UPLOADS = int(os.getenv("MAX_CONCURRENT_UPLOADS", "3"))
+# Scheduled ('public') uploads: seconds from now to the first publishAt, so it has not
+# passed by the time the upload and YouTube's processing finish; later ones are spaced
+# by UPLOAD_INTERVAL
+PUBLISH_LEAD_TIME = int(os.getenv("PUBLISH_LEAD_TIME", str(15 * 60)))
+
+# Resumable upload settings: bytes per chunk (multiple of 256 KiB) and retries per chunk
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+UPLOAD_MAX_RETRIES = 8
+# HTTP status codes worth retrying during an upload
+UPLOAD_RETRIABLE_STATUS_CODES = (500, 502, 503, 504)
+
 # YouTube API 스코프 정의
 SCOPES = [
     'https://www.googleapis.com/auth/youtube.upload',
@@ -0,0 +1,179 @@
+import json
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 만료 몇 초 전에 미리 갱신할지
+DEFAULT_REFRESH_MARGIN = 300
+# 백그라운드 갱신이 실패했을 때 다시 시도하기까지의 대기 시간 (초, 실패할 때마다 두 배)
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 600
+
+
+class CredentialsUnavailableError(RuntimeError):
+    """Raised when no usable OAuth credentials can be loaded or refreshed."""
+
+
+def credentials_to_dict(credentials):
+    """Serialises OAuth credentials in the token.json format stored in GCS."""
+    return {
+        "token": credentials.token,
+        "refresh_token": credentials.refresh_token,
+        "token_uri": credentials.token_uri,
+        "client_id": credentials.client_id,
+        "client_secret": credentials.client_secret,
+        "scopes": credentials.scopes,
+        "expiry": credentials.expiry.isoformat() if credentials.expiry else None
+    }
+
+
+class CredentialManager:
+    """
+    Process-wide cache for the YouTube OAuth credentials kept in a GCS token blob.
+
+    One storage client is reused; credentials stay in memory until they are about to
+    expire and are refreshed by a background timer `refresh_margin` seconds early.
+    Loads and refreshes are single-flight, so concurrent callers trigger one GCS read or
+    token refresh, and the blob is only rewritten when the access token changed.
+    `storage_client` may be any object with the google-cloud-storage bucket/blob API,
+    e.g. a local stand-in or a client pointed at STORAGE_EMULATOR_HOST.
+    """
+
+    def __init__(self, bucket_name, blob_name, scopes, storage_client=None,
+                 refresh_margin=DEFAULT_REFRESH_MARGIN, on_change=None):
+        self.bucket_name = bucket_name
+        self.blob_name = blob_name
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self.on_change = on_change
+        self._storage_client = storage_client
+        self._credentials = None
+        self._stored_token = None
+        self._lock = threading.Lock()
+        self._timer = None
+        self._retry_delay = None
+
+    def get(self):
+        """
+        Returns valid credentials, loading them from GCS or refreshing them if needed.
+        :raises CredentialsUnavailableError: If there is no token or it cannot be refreshed.
+        """
+        credentials = self._credentials
+        if (credentials is not None and not self._expiring(credentials)
+                and credentials.token == self._stored_token):
+            return credentials
+
+        with self._lock:
+            # 다른 스레드가 먼저 갱신했을 수 있으므로 다시 확인합니다
+            if self._credentials is None:
+                self._credentials = self._load()
+            if self._expiring(self._credentials):
+                self._refresh(self._credentials)
+            else:
+                # 이전 갱신 뒤 GCS 저장이 실패했다면 지금 다시 저장합니다
+                self._write_back(self._credentials)
+            self._schedule_refresh()
+            return self._credentials
+
+    def set(self, credentials):
+        """Stores newly authorised credentials in memory and in GCS."""
+        with self._lock:
+            self._credentials = credentials
+            self._write_back(credentials)
+            self._schedule_refresh()
+
+    def close(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    @property
+    def storage_client(self):
+        if self._storage_client is None:
+            from google.cloud import storage
+            self._storage_client = storage.Client()
+        return self._storage_client
+
+    def _blob(self):
+        return self.storage_client.bucket(self.bucket_name).blob(self.blob_name)
+
+    def _load(self):
+        from google.oauth2.credentials import Credentials
+        try:
+            token_data = self._blob().download_as_bytes().decode("utf-8")
+        except Exception as e:
+            raise CredentialsUnavailableError(f"GCS에서 인증 정보를 읽을 수 없습니다: {e}") from e
+        try:
+            creds_dict = json.loads(token_data)
+            credentials = Credentials.from_authorized_user_info(creds_dict, self.scopes)
+        except ValueError as e:
+            # json.JSONDecodeError도 ValueError입니다 (손상되거나 필드가 빠진 토큰)
+            raise CredentialsUnavailableError(f"GCS의 인증 정보가 올바르지 않습니다: {e}") from e
+        self._stored_token = creds_dict.get("token")
+        logger.info("GCS에서 인증 정보를 불러왔습니다.")
+        if self.on_change:
+            self.on_change(credentials)
+        return credentials
+
+    def _refresh(self, credentials):
+        if not credentials.refresh_token:
+            raise CredentialsUnavailableError("인증 정보가 만료되었고 갱신 토큰이 없습니다.")
+        import google.auth.transport.requests
+        try:
+            credentials.refresh(google.auth.transport.requests.Request())
+        except Exception as e:
+            raise CredentialsUnavailableError(f"인증 정보 갱신 실패: {e}") from e
+        logger.info("인증 정보를 갱신했습니다.")
+        self._write_back(credentials)
+
+    def _write_back(self, credentials):
+        """Writes the credentials to GCS only if the access token differs from the stored one."""
+        if credentials.token == self._stored_token:
+            return
+        self._blob().upload_from_string(json.dumps(credentials_to_dict(credentials)))
+        self._stored_token = credentials.token
+        logger.info("갱신된 인증 정보가 GCS에 성공적으로 저장되었습니다.")
+        if self.on_change:
+            self.on_change(credentials)
+
+    def _expiring(self, credentials):
+        if not credentials.token:
+            return True
+        if credentials.expiry is None:
+            return False
+        remaining = (credentials.expiry - datetime.utcnow()).total_seconds()
+        return remaining <= self.refresh_margin
+
+    def _schedule_refresh(self, delay=None):
+        """
+        Arms a timer that refreshes the credentials shortly before they expire,
+        or after `delay` seconds when retrying a failed refresh.
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if delay is None:
+            credentials = self._credentials
+            if credentials is None or credentials.expiry is None or not credentials.refresh_token:
+                return
+            delay = (credentials.expiry - datetime.utcnow()).total_seconds() - self.refresh_margin
+        self._timer = threading.Timer(max(delay, 1.0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        try:
+            self.get()
+            self._retry_delay = None
+        except Exception as e:
+            # 어떤 오류든 타이머를 다시 걸어야 선제 갱신이 멈추지 않습니다
+            self._retry_delay = min(self._retry_delay * 2, MAX_RETRY_DELAY) if self._retry_delay else RETRY_DELAY
+            logger.error(f"백그라운드 인증 정보 갱신 실패, {self._retry_delay}초 후 다시 시도합니다: {e}",
+                         exc_info=True)
+            with self._lock:
+                # close()가 타이머를 치웠다면 다시 걸지 않습니다
+                if self._timer is not None:
+                    self._schedule_refresh(self._retry_delay)
@@ -1,44 +1,245 @@
 # This file contains utility functions for video processing using FFmpeg.
-# Note: FFmpeg must be installed on the system for these to work.
-# These functions are placeholders and require implementation.
+# Note: FFmpeg (including ffprobe) must be installed on the system for these to work.
+#
+# 각 함수는 ffprobe로 입력을 먼저 확인하고, 가능하면 재인코딩 없이
+# 스트림 복사(-c copy)로 처리하며 필요한 경우에만 libx264/aac로 인코딩합니다.
 
-import subprocess
+import json
+import logging
 import os
+import subprocess
+import tempfile
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 스트림 복사가 가능한 코덱 (YouTube Shorts에 그대로 올릴 수 있는 조합)
+COPYABLE_VIDEO_CODECS = {"h264"}
+COPYABLE_AUDIO_CODECS = {"aac"}
+
+# 재인코딩 시 사용하는 기본 인코더 설정
+VIDEO_ENCODE_ARGS = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-pix_fmt', 'yuv420p']
+AUDIO_ENCODE_ARGS = ['-c:a', 'aac', '-b:a', '128k']
+
+
+def video_encode_args(threads=None):
+    """Returns the libx264 arguments, optionally capped to a number of encoder threads."""
+    if threads:
+        return VIDEO_ENCODE_ARGS + ['-threads', str(threads)]
+    return list(VIDEO_ENCODE_ARGS)
+
+
+def run_ffmpeg(args):
+    """
+    Runs ffmpeg with the given arguments and raises CalledProcessError on failure.
+    """
+    command = [config.FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error'] + [str(a) for a in args]
+    logger.debug(f"Running: {' '.join(command)}")
+    return subprocess.run(command, check=True, capture_output=True)
+
+
+def check_binaries():
+    """
+    Runs `-version` on ffmpeg and ffprobe, which also pulls both binaries and their shared
+    libraries into the page cache before the first real encode.
+    :return: {binary: first line of its version output}.
+    :raises OSError / CalledProcessError: If a binary is missing or broken.
+    """
+    versions = {}
+    for binary in (config.FFMPEG_BINARY, config.FFPROBE_BINARY):
+        result = subprocess.run([binary, '-hide_banner', '-version'], check=True, capture_output=True, text=True)
+        versions[binary] = result.stdout.split('\n', 1)[0]
+    return versions
+
+
+def probe(input_path):
+    """
+    Reads duration, codecs and dimensions of a media file with ffprobe.
+    :return: A dictionary with duration, video_codec, audio_codec, width, height and fps.
+    """
+    command = [
+        config.FFPROBE_BINARY, '-v', 'error', '-print_format', 'json',
+        '-show_format', '-show_streams', input_path
+    ]
+    result = subprocess.run(command, check=True, capture_output=True)
+    data = json.loads(result.stdout.decode('utf-8') or '{}')
+
+    video = next((s for s in data.get('streams', []) if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in data.get('streams', []) if s.get('codec_type') == 'audio'), None)
+
+    fps = 0.0
+    if video and video.get('avg_frame_rate', '0/0') != '0/0':
+        num, den = video['avg_frame_rate'].split('/')
+        fps = float(num) / float(den) if float(den) else 0.0
+
+    return {
+        'duration': float(data.get('format', {}).get('duration', 0.0) or 0.0),
+        'video_codec': video.get('codec_name') if video else None,
+        'audio_codec': audio.get('codec_name') if audio else None,
+        'width': int(video.get('width', 0)) if video else 0,
+        'height': int(video.get('height', 0)) if video else 0,
+        'fps': fps,
+    }
+
 
-def trim_video(input_path, output_path, start_time, end_time):
+def can_stream_copy(info):
+    """Returns True when the probed streams can be written to MP4 without re-encoding."""
+    if info.get('video_codec') not in COPYABLE_VIDEO_CODECS:
+        return False
+    return info.get('audio_codec') is None or info.get('audio_codec') in COPYABLE_AUDIO_CODECS
+
+
+def keyframe_at_or_before(input_path, time_point):
+    """
+    Finds the timestamp of the last video keyframe at or before time_point.
+    Only packets around the target are read, so this does not decode the file.
+    """
+    if time_point <= 0:
+        return 0.0
+    command = [
+        config.FFPROBE_BINARY, '-v', 'error', '-select_streams', 'v:0',
+        '-skip_frame', 'nokey', '-show_entries', 'frame=pts_time',
+        '-read_intervals', f"{max(0.0, time_point - 10)}%{time_point + 0.001}",
+        '-of', 'csv=p=0', input_path
+    ]
+    result = subprocess.run(command, check=True, capture_output=True)
+    keyframes = []
+    for line in result.stdout.decode('utf-8').splitlines():
+        try:
+            keyframes.append(float(line.strip().strip(',')))
+        except ValueError:
+            continue
+    candidates = [t for t in keyframes if t <= time_point]
+    return max(candidates) if candidates else 0.0
+
+
+def trim_video(input_path, output_path, start_time, end_time, info=None, threads=None):
+    """
+    Trims a video to [start_time, end_time].
+    H.264/AAC sources are cut with stream copy from the nearest keyframe at or before
+    start_time, keeping the requested length; anything else is re-encoded with an exact
+    cut using at most `threads` encoder threads.
+    :return: 'copy' or 'encode', depending on the path taken.
+    """
+    info = info or probe(input_path)
+    end_time = min(end_time, info['duration']) if info['duration'] else end_time
+
+    if can_stream_copy(info):
+        start = keyframe_at_or_before(input_path, start_time)
+        run_ffmpeg([
+            '-ss', start, '-i', input_path, '-t', end_time - start_time,
+            '-map', '0:v:0', '-map', '0:a:0?', '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart', output_path
+        ])
+        return 'copy'
+
+    run_ffmpeg(
+        ['-ss', start_time, '-i', input_path, '-t', end_time - start_time,
+         '-map', '0:v:0', '-map', '0:a:0?']
+        + video_encode_args(threads) + AUDIO_ENCODE_ARGS
+        + ['-movflags', '+faststart', output_path]
+    )
+    return 'encode'
+
+
+def make_short(input_path, output_path, max_duration, start_time=0.0, threads=None, info=None):
     """
-    Trims a video to a specific duration.
-    (Not implemented)
+    Produces a Short of at most max_duration seconds starting at start_time.
+    Already-short H.264/AAC sources are only remuxed; longer ones are cut with
+    stream copy; other codecs are re-encoded.
+    :param info: probe() result of input_path, if the caller already has it.
+    :return: A dictionary with the mode used ('remux', 'copy' or 'encode') and the probe info.
     """
-    print(f"Placeholder: Trimming {input_path} from {start_time} to {end_time} -> {output_path}")
-    # Example command:
-    # command = [
-    #     'ffmpeg', '-i', input_path, '-ss', str(start_time),
-    #     '-to', str(end_time), '-c', 'copy', output_path
-    # ]
-    # subprocess.run(command, check=True)
-    pass
+    info = info or probe(input_path)
+
+    if can_stream_copy(info) and start_time <= 0 and info['duration'] <= max_duration:
+        run_ffmpeg([
+            '-i', input_path, '-map', '0:v:0', '-map', '0:a:0?', '-c', 'copy',
+            '-movflags', '+faststart', output_path
+        ])
+        return {'mode': 'remux', 'info': info}
+
+    mode = trim_video(input_path, output_path, start_time, start_time + max_duration,
+                      info=info, threads=threads)
+    return {'mode': mode, 'info': info}
+
 
 def merge_clips(clip_paths, output_path):
     """
-    Merges multiple video clips into one.
-    (Not implemented)
+    Merges multiple video clips into one with the concat demuxer.
+    Clips sharing codec and resolution are joined by stream copy; otherwise re-encoded.
+    """
+    infos = [probe(path) for path in clip_paths]
+    signatures = {(i['video_codec'], i['audio_codec'], i['width'], i['height']) for i in infos}
+    copy = len(signatures) == 1 and all(can_stream_copy(i) for i in infos)
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as list_file:
+        for path in clip_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+        list_path = list_file.name
+
+    try:
+        codec_args = ['-c', 'copy'] if copy else VIDEO_ENCODE_ARGS + AUDIO_ENCODE_ARGS
+        run_ffmpeg(
+            ['-f', 'concat', '-safe', '0', '-i', list_path]
+            + codec_args + ['-movflags', '+faststart', output_path]
+        )
+    finally:
+        os.remove(list_path)
+    return 'copy' if copy else 'encode'
+
+
+def overlay_filter(position):
+    """
+    Builds an overlay filter placing the second input (a title image) at a position name
+    ('top', 'center', 'bottom') or an (x, y) tuple of overlay expressions.
     """
-    print(f"Placeholder: Merging {len(clip_paths)} clips into {output_path}")
-    pass
+    if isinstance(position, (tuple, list)):
+        x, y = str(position[0]), str(position[1])
+    else:
+        positions = {
+            'top': ('(W-w)/2', 'H*0.08'),
+            'center': ('(W-w)/2', '(H-h)/2'),
+            'bottom': ('(W-w)/2', 'H*0.92-h'),
+        }
+        x, y = positions.get(position, positions['top'])
+    return f"overlay=x={x}:y={y}"
+
 
 def add_text_overlay(input_path, output_path, text, font_path, font_size, position):
     """
-    Adds a text overlay to a video.
-    (Not implemented)
+    Adds a text overlay to a video. The title is rasterised once into a cached PNG
+    (core/titles.py) and composited with the overlay filter; the video stream is
+    re-encoded, audio is copied.
     """
-    print(f"Placeholder: Adding text '{text}' to {input_path} -> {output_path}")
-    pass
+    # Pillow은 이 함수를 쓸 때만 불러옵니다
+    from . import titles
+
+    title = titles.render_title(text, probe(input_path)['width'], font_path, font_size)
+    if title is None:
+        logger.warning(f"Nothing to draw for title {text!r}; copying {input_path} unchanged.")
+        run_ffmpeg(['-i', input_path, '-map', '0', '-c', 'copy', '-movflags', '+faststart', output_path])
+        return
+    run_ffmpeg(
+        ['-i', input_path, '-i', title['path'],
+         '-filter_complex', f"[0:v][1:v]{overlay_filter(position)},format=yuv420p[v]",
+         '-map', '[v]', '-map', '0:a:0?']
+        + VIDEO_ENCODE_ARGS + ['-c:a', 'copy', '-movflags', '+faststart', output_path]
+    )
+
 
 def change_aspect_ratio(input_path, output_path, width, height):
     """
     Changes the aspect ratio of a video, e.g., to 9:16 for shorts.
-    (Not implemented)
+    The source is scaled to fit and padded; the video stream is re-encoded, audio is copied.
     """
-    print(f"Placeholder: Changing aspect ratio of {input_path} to {width}x{height} -> {output_path}")
-    pass
+    video_filter = (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+    )
+    run_ffmpeg(
+        ['-i', input_path, '-vf', video_filter, '-map', '0:v:0', '-map', '0:a:0?']
+        + VIDEO_ENCODE_ARGS + ['-c:a', 'copy', '-movflags', '+faststart', output_path]
+    )
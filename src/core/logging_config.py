@@ -1,27 +1,194 @@
+"""
+Single logging configuration for the service and the CLI.
+
+Log calls only put the record on an in-memory queue (QueueHandler); a QueueListener thread
+formats it and does the blocking console/file writes, so logging adds no I/O to request
+handling. Output is one JSON object per line by default (config.LOG_FORMAT).
+
+Process pool workers (spawned, so they start without any logging setup) are initialised
+with configure_worker(), which sends their records over a multiprocessing queue back to
+this process's handlers.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+
 from . import config
 
-def setup_logging():
+# 요청/응답 접근 로그 전용 로거 (샘플링 대상)
+ACCESS_LOGGER = "src.access"
+
+# LogRecord 기본 속성: 이 밖의 속성(extra=...)은 JSON 필드로 그대로 내보냅니다
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+_TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener = None
+_worker_queue = None
+_worker_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON line: ts, level, logger, msg, extra fields and exc."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` fraction of records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
     """
-    Configures logging for the application.
-    Logs to both a file and the console.
-    (Currently a basic placeholder, as main.py uses basicConfig)
+    Merges the message arguments on the caller's thread (they may change afterwards) but
+    leaves formatting to the listener, so the JSON formatter still sees `msg` and `exc` apart.
     """
-    log_file = config.LOG_FILE
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
-    logging.info("Logging configured.")
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _ForwardHandler(logging.Handler):
+    """Hands records received from pool workers to the logger of the same name in this process."""
+
+    def emit(self, record):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+def _formatter(fmt):
+    return JsonFormatter() if fmt == "json" else logging.Formatter(_TEXT_FORMAT)
+
+
+def setup_logging(level=None, fmt=None, module_levels=None, log_file=None, request_sample_rate=None):
+    """
+    Configures the root logger once per process; later calls return the running listener.
+    Handlers added elsewhere to the root logger (e.g. basicConfig) are replaced.
+    :param level: Root level name (default config.LOG_LEVEL).
+    :param fmt: "json" or "text" (default config.LOG_FORMAT).
+    :param module_levels: {logger name: level name} (default config.LOG_MODULE_LEVELS).
+    :param log_file: File written next to the console (default config.LOG_FILE, "" disables it).
+    :param request_sample_rate: Fraction of access lines kept (default config.LOG_REQUEST_SAMPLE_RATE).
+    :return: The QueueListener doing the writes.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = _formatter(fmt or config.LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        log_file = config.LOG_FILE if log_file is None else log_file
+        if log_file:
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_QueueHandler(log_queue))
+        root.setLevel(level or config.LOG_LEVEL)
+
+        for name, module_level in (config.LOG_MODULE_LEVELS if module_levels is None else module_levels).items():
+            logging.getLogger(name).setLevel(module_level)
+
+        rate = config.LOG_REQUEST_SAMPLE_RATE if request_sample_rate is None else request_sample_rate
+        access = logging.getLogger(ACCESS_LOGGER)
+        for log_filter in list(access.filters):
+            access.removeFilter(log_filter)
+        if rate < 1:
+            access.addFilter(SamplingFilter(rate))
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers)
+        _listener.start()
+        atexit.register(stop_logging)
+    return _listener
+
+
+def worker_log_queue(mp_context):
+    """
+    Returns the multiprocessing queue pool workers log to (pass it to configure_worker),
+    starting the thread that forwards its records to this process's handlers on first use.
+    """
+    global _worker_queue, _worker_listener
+    with _lock:
+        if _worker_queue is None:
+            _worker_queue = mp_context.Queue()
+            _worker_listener = logging.handlers.QueueListener(_worker_queue, _ForwardHandler())
+            _worker_listener.start()
+        return _worker_queue
+
+
+def configure_worker(log_queue, level=None, module_levels=None):
+    """
+    Process pool initializer: routes every record of the worker to log_queue.
+    :param level: Root level (pass the parent's, default config.LOG_LEVEL).
+    :param module_levels: {logger name: level name} (default config.LOG_MODULE_LEVELS).
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level or config.LOG_LEVEL)
+    for name, module_level in (config.LOG_MODULE_LEVELS if module_levels is None else module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+
+def stop_logging():
+    """Flushes queued records and stops the listener threads."""
+    global _listener, _worker_queue, _worker_listener
+    with _lock:
+        if _worker_listener is not None:
+            _worker_listener.stop()
+            _worker_queue.close()
+            _worker_queue = _worker_listener = None
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
 
 if __name__ == '__main__':
-    setup_logging()
+    setup_logging(level="DEBUG")
     logging.info("This is an info message.")
-    logging.warning("This is a warning message.")
+    logging.warning("This is a warning message.", extra={"video_id": "abc123"})
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from . import config
+from .state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+# 항목별 단계 순서
+STAGES = ("collected", "downloaded", "processed", "uploaded", "analysed")
+# 다운로드/처리에 실패한 항목 (다음 실행에서 이어서 처리하지 않음)
+FAILED = "failed"
+# 일시적인 오류로 중단된 항목 ("횟수:사유"를 기록, 다음 실행에서 다시 시도)
+RETRY = "retry"
+
+# 콘텐츠 해시에 읽는 파일 앞/뒤 구간 크기
+_DIGEST_SAMPLE_BYTES = 1024 * 1024
+
+# 처리 결과에 영향을 주는 코드가 바뀌면 올려서 기존 결과를 무효화합니다
+PROCESSING_VERSION = 2
+
+
+def fingerprint(*parts):
+    """Stable SHA-256 hex digest of JSON-serialisable parts."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_digest(path):
+    """
+    Content hash of a media file: size plus the first and last megabyte.
+    Cheap enough to run on every rerun, and a re-download or a different stream changes it.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        digest.update(f.read(_DIGEST_SAMPLE_BYTES))
+        if size > 2 * _DIGEST_SAMPLE_BYTES:
+            f.seek(-_DIGEST_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _asset_stamp(path):
+    """(size, mtime) of an asset file, so replacing an asset invalidates outputs."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def _render_params():
+    # render.py가 이 모듈을 간접적으로 임포트하므로 render 모드에서만 지연 임포트합니다
+    from src.processing.render import music_tracks
+
+    fonts = [config.FONT_FILE] + list(config.TITLE_FALLBACK_FONTS)
+    return {
+        "reframe": config.RENDER_REFRAME,
+        "fps": config.RENDER_FPS,
+        "title": config.RENDER_TITLE and ["overlay", config.RENDER_TITLE_FONT_SIZE, config.TITLE_MAX_LINES,
+                                          [_asset_stamp(path) for path in fonts]],
+        "music_volume": config.RENDER_MUSIC_VOLUME,
+        "assets": [_asset_stamp(path) for path in (config.INTRO_CLIP, config.OUTRO_CLIP)],
+        # 곡 목록이 바뀌면 영상마다 고르는 곡도 바뀌므로 이름과 함께 기록합니다
+        "music": [[os.path.basename(path), _asset_stamp(path)] for path in music_tracks()],
+    }
+
+
+def processing_params():
+    """Settings that change what a processed Short looks like."""
+    render = config.RENDER_MODE == "render" and _render_params()
+    return {
+        "version": PROCESSING_VERSION,
+        "short_duration": config.SHORT_DURATION,
+        "output_resolution": list(config.OUTPUT_RESOLUTION),
+        "highlight": config.HIGHLIGHT_ENABLED and [config.HIGHLIGHT_HOP, config.HIGHLIGHT_ONSET_WEIGHT],
+        "render": render,
+    }
+
+
+class StageManifest:
+    """
+    Per-video record of completed stages (collected → downloaded → processed → uploaded → analysed).
+
+    Each stage stores a fingerprint of its inputs and parameters plus its output path.
+    A stage counts as done only while the fingerprint still matches and the output file
+    still exists, so reruns resume where each item stopped and a parameter change only
+    invalidates the outputs it affects.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_state_store()
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def mark(self, video_id, stage, fingerprint=None, output_path=None):
+        self.store.set_item_stage(video_id, stage, fingerprint, output_path)
+
+    def is_done(self, video_id, stage, fingerprint=None):
+        return self.completed_output(video_id, stage, fingerprint) is not False
+
+    def completed_output(self, video_id, stage, fingerprint=None):
+        """
+        Returns the stage's output path (or None if it has none) when the stage is done
+        with a matching fingerprint, and False otherwise.
+        """
+        entry = self.store.get_item_stage(video_id, stage)
+        if not entry:
+            return False
+        if fingerprint is not None and entry['fingerprint'] != fingerprint:
+            logger.info(f"{video_id}: '{stage}' inputs or parameters changed. Redoing the stage.")
+            return False
+        output_path = entry['output_path']
+        if output_path and not os.path.exists(output_path):
+            logger.info(f"{video_id}: '{stage}' output {output_path} is missing. Redoing the stage.")
+            return False
+        return output_path
+
+    def mark_failed(self, video_id, reason):
+        self.store.set_item_stage(video_id, FAILED, str(reason)[:200])
+
+    def mark_retry(self, video_id, reason, max_attempts=None):
+        """
+        Records a transient failure. The item stays resumable until it has failed
+        max_attempts times (default config.DOWNLOAD_MAX_ATTEMPTS); then it is marked failed.
+        :return: The number of failed attempts so far.
+        """
+        max_attempts = max_attempts or config.DOWNLOAD_MAX_ATTEMPTS
+        entry = self.store.get_item_stage(video_id, RETRY)
+        attempts = int(entry['fingerprint'].split(":", 1)[0]) + 1 if entry else 1
+        if attempts >= max_attempts:
+            self.mark_failed(video_id, f"{reason} (after {attempts} attempts)")
+        else:
+            self.store.set_item_stage(video_id, RETRY, f"{attempts}:{reason}"[:200])
+        return attempts
+
+    def clear_retry(self, video_id):
+        self.store.delete_item_stage(video_id, RETRY)
+
+    def stages(self, video_id):
+        return self.store.list_item_stages(video_id)
+
+    def digest(self, path):
+        """file_digest, memoised per (path, size, mtime)."""
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime)
+        with self._lock:
+            if key in self._digests:
+                return self._digests[key]
+        value = file_digest(path)
+        with self._lock:
+            self._digests[key] = value
+        return value
+
+    def processing_fingerprint(self, source_path):
+        """Fingerprint of a processed output: source content hash plus processing parameters."""
+        return fingerprint(self.digest(source_path), processing_params())
+
+    def resumable(self, max_age=None):
+        """
+        Returns collected videos from recent runs that never reached the upload stage,
+        in collection order, so the next run continues them before searching again.
+        """
+        max_age = config.PIPELINE_RESUME_MAX_AGE if max_age is None else max_age
+        return self.store.list_unfinished_items(time.time() - max_age, "uploaded")
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest():
+    """Returns the process-wide StageManifest."""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = StageManifest()
+        return _manifest
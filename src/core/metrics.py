@@ -0,0 +1,79 @@
+"""
+Prometheus metrics for the pipeline hot paths, served by GET /metrics in src/main.py.
+
+Updating a metric is a lock-protected add, so instrumentation stays cheap enough for
+per-request and per-chunk call sites. Values that already live elsewhere (quota used,
+queue depths) are read when scraped instead of being pushed.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# 지연 시간 버킷: API 호출(수 ms~수 s)과 인코딩/업로드(수 s~수 분)를 함께 다룹니다
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+_SPEED_BUCKETS = tuple(2 ** n * 1024 * 1024 for n in range(-2, 8))  # 256KiB/s ~ 128MiB/s
+_FPS_BUCKETS = (5, 10, 25, 50, 100, 200, 400, 800, 1600, 3200)
+
+API_REQUEST_SECONDS = Histogram(
+    "shorts_api_request_seconds", "YouTube Data API request latency.",
+    ["method"], buckets=_LATENCY_BUCKETS)
+API_ERRORS = Counter(
+    "shorts_api_errors_total", "YouTube Data API requests that raised.", ["method"])
+API_CACHE_LOOKUPS = Counter(
+    "shorts_api_cache_lookups_total", "Response cache lookups by result.", ["result"])
+
+DOWNLOAD_BYTES = Counter(
+    "shorts_download_bytes_total", "Source video bytes downloaded.")
+DOWNLOAD_SECONDS = Histogram(
+    "shorts_download_seconds", "Time to download one source video.", buckets=_LATENCY_BUCKETS)
+DOWNLOAD_SPEED = Histogram(
+    "shorts_download_speed_bytes_per_second", "Download throughput per video.", buckets=_SPEED_BUCKETS)
+DOWNLOAD_CACHE_LOOKUPS = Counter(
+    "shorts_download_cache_lookups_total", "Download cache lookups by result.", ["result"])
+
+ENCODE_SECONDS = Histogram(
+    "shorts_encode_seconds", "Time to produce one Short.", ["mode"], buckets=_LATENCY_BUCKETS)
+ENCODE_FPS = Histogram(
+    "shorts_encode_fps", "Frames per second of one encode.", ["mode"], buckets=_FPS_BUCKETS)
+THUMBNAIL_SECONDS = Histogram(
+    "shorts_thumbnail_seconds", "Time to pick and write one thumbnail.", buckets=_LATENCY_BUCKETS)
+
+UPLOAD_SECONDS = Histogram(
+    "shorts_upload_seconds", "Time to upload one Short, including retries.",
+    ["outcome"], buckets=_LATENCY_BUCKETS)
+UPLOAD_BYTES = Counter(
+    "shorts_upload_bytes_total", "Bytes of successfully uploaded Shorts.")
+
+QUEUE_DEPTH = Gauge(
+    "shorts_pipeline_queue_depth", "Items waiting between streaming pipeline stages.", ["queue"])
+STAGE_SECONDS = Histogram(
+    "shorts_pipeline_stage_seconds", "Duration of pipeline stages.", ["stage"], buckets=_LATENCY_BUCKETS)
+
+QUOTA_UNITS = Counter(
+    "shorts_quota_units_total", "Data API quota units charged.", ["method"])
+QUOTA_USED = Gauge(
+    "shorts_quota_units_used_today", "Data API quota units used in the current quota day.")
+QUOTA_REMAINING = Gauge(
+    "shorts_quota_units_remaining_today", "Data API quota units left in the current quota day.")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "shorts_http_request_seconds", "Latency of requests to this service.",
+    ["method", "route", "status"], buckets=_LATENCY_BUCKETS)
+
+
+def watch_quota(ledger):
+    """Reports the ledger's usage at scrape time."""
+    QUOTA_USED.set_function(ledger.used)
+    QUOTA_REMAINING.set_function(ledger.remaining)
+
+
+def watch_queue(name, q):
+    """Reports a queue's depth at scrape time. Call unwatch_queue when the queue is gone."""
+    QUEUE_DEPTH.labels(name).set_function(q.qsize)
+
+
+def unwatch_queue(name):
+    QUEUE_DEPTH.labels(name).set_function(lambda: 0)
+
+
+def render():
+    """Returns (body, content type) for the /metrics response."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,145 @@
+import logging
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+
+from . import config
+from . import metrics
+from .state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+# YouTube Data API v3 unit cost per request
+UNIT_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+    "videos.insert": 1600,
+    "thumbnails.set": 50,
+}
+
+try:
+    from zoneinfo import ZoneInfo
+    _PACIFIC = ZoneInfo("America/Los_Angeles")
+except Exception:  # tzdata가 없는 환경에서는 PST 고정 오프셋 사용
+    _PACIFIC = timezone(timedelta(hours=-8))
+
+
+def quota_day():
+    """Returns the current quota day; the Data API quota resets at midnight Pacific time."""
+    return datetime.now(_PACIFIC).date().isoformat()
+
+
+def method_name(request):
+    """Maps a googleapiclient request ('youtube.videos.list') to a UNIT_COSTS key."""
+    method_id = getattr(request, "methodId", None) or ""
+    return method_id.split(".", 1)[1] if method_id.startswith("youtube.") else method_id
+
+
+class QuotaLedger:
+    """
+    Persistent record of API units spent per quota day and per method.
+    Usage is stored in the state store, so every process and run shares one budget.
+    """
+
+    def __init__(self, daily_budget=None, store=None):
+        self.daily_budget = config.DAILY_QUOTA_UNITS if daily_budget is None else daily_budget
+        self.store = store or get_state_store()
+        self._lock = threading.Lock()
+
+    def charge(self, method, calls=1):
+        """Records `calls` requests of `method` and returns the units charged."""
+        units = UNIT_COSTS.get(method, 1) * calls
+        self.store.add_quota_usage(quota_day(), method, units, calls)
+        metrics.QUOTA_UNITS.labels(method).inc(units)
+        return units
+
+    def charge_request(self, request):
+        return self.charge(method_name(request))
+
+    def reserve(self, method, calls=1):
+        """Charges `method` only if it fits in the remaining budget. Returns True if charged."""
+        with self._lock:
+            if not self.can_afford(method, calls):
+                return False
+            self.charge(method, calls)
+            return True
+
+    def used(self):
+        return sum(units for units, _ in self.store.get_quota_usage(quota_day()).values())
+
+    def remaining(self):
+        return max(0, self.daily_budget - self.used())
+
+    def can_afford(self, method, calls=1):
+        return UNIT_COSTS.get(method, 1) * calls <= self.remaining()
+
+    def snapshot(self):
+        usage = self.store.get_quota_usage(quota_day())
+        used = sum(units for units, _ in usage.values())
+        return {
+            "day": quota_day(),
+            "budget": self.daily_budget,
+            "used": used,
+            "remaining": max(0, self.daily_budget - used),
+            "by_method": {method: {"units": units, "calls": calls} for method, (units, calls) in usage.items()},
+        }
+
+
+class QuotaPlanner:
+    """
+    Sizes pipeline stages to the remaining budget. Units for today's remaining uploads
+    and for the analytics refresh are reserved before any search pages are granted.
+    """
+
+    def __init__(self, ledger, max_daily_uploads, uploads_today=0, analysis_video_count=0):
+        self.ledger = ledger
+        self.max_daily_uploads = max_daily_uploads
+        self.uploads_today = uploads_today
+        self.analysis_video_count = analysis_video_count
+
+    def upload_reserve(self):
+        uploads_left = max(0, self.max_daily_uploads - self.uploads_today)
+        per_upload = UNIT_COSTS["videos.insert"]
+        if config.THUMBNAIL_ENABLED:
+            per_upload += UNIT_COSTS["thumbnails.set"]
+        return uploads_left * per_upload
+
+    def analysis_reserve(self):
+        return math.ceil(self.analysis_video_count / config.VIDEOS_LIST_BATCH_SIZE) * UNIT_COSTS["videos.list"]
+
+    def search_pages(self, results_per_page=None):
+        """
+        Returns how many search pages (each followed by one videos.list batch) fit
+        in the budget after the upload and analysis reserves.
+        """
+        results_per_page = results_per_page or config.MAX_RESULTS_PER_KEYWORD
+        page_cost = UNIT_COSTS["search.list"] + math.ceil(
+            results_per_page / config.VIDEOS_LIST_BATCH_SIZE) * UNIT_COSTS["videos.list"]
+        spare = self.ledger.remaining() - self.upload_reserve() - self.analysis_reserve()
+        return max(0, spare // page_cost)
+
+    def plan(self):
+        pages = self.search_pages()
+        plan = {
+            "remaining_units": self.ledger.remaining(),
+            "upload_reserve": self.upload_reserve(),
+            "analysis_reserve": self.analysis_reserve(),
+            "search_pages": min(pages, config.MAX_SEARCH_PAGES),
+            "run_analysis": self.ledger.remaining() - self.upload_reserve() >= self.analysis_reserve(),
+        }
+        logger.info(f"Quota plan: {plan}")
+        return plan
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_quota_ledger():
+    """Returns the process-wide QuotaLedger."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = QuotaLedger()
+            metrics.watch_quota(_ledger)
+        return _ledger
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import googleapiclient.errors
+
+from . import config
+from . import metrics
+from .quota import method_name
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    On-disk cache for read-only Data API responses.
+
+    Entries are fresh for a per-method TTL and served without a request. Stale entries
+    are revalidated with If-None-Match, so an unchanged resource costs a 304 instead of
+    the full payload. The cache is capped at max_bytes; least recently used entries go first.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None, ttls=None):
+        self.cache_dir = cache_dir or config.API_CACHE_DIR
+        self.max_bytes = config.API_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttls = dict(config.API_CACHE_TTLS if ttls is None else ttls)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._sizes = self._scan()
+
+    def cacheable(self, request):
+        return request.method == "GET" and method_name(request) in self.ttls
+
+    def fetch(self, request, send, ttl=None):
+        """
+        Returns the response for a read-only request, from the cache when possible.
+        :param send: Callable that executes the request and returns the response body.
+        :param ttl: Freshness in seconds, overriding the per-method TTL (0 always revalidates).
+        """
+        method = method_name(request)
+        ttl = self.ttls[method] if ttl is None else ttl
+        key = _cache_key(request)
+        entry = self._read(key)
+
+        if entry and time.time() - entry["stored_ts"] < ttl:
+            self._count("hits")
+            return entry["body"]
+
+        if entry and entry.get("etag"):
+            request.headers["If-None-Match"] = entry["etag"]
+        etag = _capture_etag(request)
+
+        try:
+            body = send(request)
+        except googleapiclient.errors.HttpError as e:
+            if e.resp.status == 304 and entry:
+                # 변경 없음: 저장된 응답을 그대로 쓰고 신선도만 갱신합니다
+                self._count("revalidated")
+                entry["stored_ts"] = time.time()
+                self._write(key, entry)
+                return entry["body"]
+            raise
+
+        self._count("misses")
+        self._write(key, {
+            "method": method,
+            "etag": etag.get("value") or body.get("etag"),
+            "stored_ts": time.time(),
+            "body": body,
+        })
+        self._count("stores")
+        return body
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._sizes)
+            stats["bytes"] = sum(self._sizes.values())
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["revalidated"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            for file_name in list(self._sizes):
+                self._remove(file_name)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+        if name in ("hits", "misses", "revalidated"):
+            metrics.API_CACHE_LOOKUPS.labels(name).inc()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning(f"Discarding unreadable API cache entry {path}.")
+            with self._lock:
+                self._remove(key + ".json")
+            return None
+        # 최근 사용 시각을 mtime에 기록 (LRU 제거 기준)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def _write(self, key, entry):
+        file_name = key + ".json"
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._sizes[file_name] = os.path.getsize(path)
+            self._evict(keep=file_name)
+
+    def _evict(self, keep):
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_age = sorted(
+            (name for name in self._sizes if name != keep),
+            key=lambda name: _mtime(os.path.join(self.cache_dir, name)))
+        for name in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= self._sizes[name]
+            self._remove(name)
+            self._stats["evictions"] += 1
+
+    def _remove(self, file_name):
+        self._sizes.pop(file_name, None)
+        try:
+            os.remove(os.path.join(self.cache_dir, file_name))
+        except FileNotFoundError:
+            pass
+
+    def _scan(self):
+        sizes = {}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                sizes[name] = os.path.getsize(os.path.join(self.cache_dir, name))
+        return sizes
+
+
+def _cache_key(request):
+    raw = f"{request.method} {request.uri} {request.body or ''}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _capture_etag(request):
+    """Wraps the request's postproc to keep the ETag response header."""
+    captured = {}
+    postproc = request.postproc
+
+    def _postproc(resp, content):
+        captured["value"] = resp.get("etag")
+        return postproc(resp, content)
+
+    request.postproc = _postproc
+    return captured
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Returns the process-wide ResponseCache, or None if caching is disabled."""
+    global _cache
+    if not config.API_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
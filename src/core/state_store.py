@@ -0,0 +1,347 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 업로드 시각을 알 수 없는 기존 기록에 쓰는 값 (오늘 업로드 수에 세지 않도록 epoch)
+_UNKNOWN_UPLOAD_TIME = datetime.fromtimestamp(0).isoformat()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS collected_videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    duration TEXT,
+    published_at TEXT,
+    collected_ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processed_videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    original_url TEXT,
+    processed_path TEXT NOT NULL,
+    processed_ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS uploaded_videos (
+    youtube_id TEXT PRIMARY KEY,
+    source_video_id TEXT,
+    title TEXT,
+    uploaded_at TEXT NOT NULL,
+    uploaded_ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    session_key TEXT PRIMARY KEY,
+    resumable_uri TEXT NOT NULL,
+    created_ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS limiter_state (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL,
+    updated_ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quota_usage (
+    day TEXT NOT NULL,
+    method TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    calls INTEGER NOT NULL,
+    PRIMARY KEY (day, method)
+);
+CREATE TABLE IF NOT EXISTS item_stages (
+    video_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    fingerprint TEXT,
+    output_path TEXT,
+    updated_ts REAL NOT NULL,
+    PRIMARY KEY (video_id, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_uploaded_ts ON uploaded_videos (uploaded_ts);
+CREATE INDEX IF NOT EXISTS idx_uploaded_source ON uploaded_videos (source_video_id);
+"""
+
+
+class StateStore:
+    """
+    SQLite-backed store for collected, processed and uploaded videos.
+
+    Writes are append-only (INSERT OR IGNORE), lookups go through primary keys or
+    indexes, and the database runs in WAL mode so readers never block the writer.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or config.STATE_DB_FILE
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # --- Collected videos ---
+
+    def add_collected(self, videos):
+        """Records collected video metadata. Already-known IDs are left untouched."""
+        now = time.time()
+        rows = [
+            (v['id'], v.get('title'), v.get('description'), v.get('duration'), v.get('publishedAt'), now)
+            for v in videos if v.get('id')
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO collected_videos VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def is_collected(self, video_id):
+        return self._exists("SELECT 1 FROM collected_videos WHERE video_id = ?", (video_id,))
+
+    def list_collected(self):
+        """Returns collected videos in the dict shape produced by collect_videos."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM collected_videos ORDER BY collected_ts, rowid").fetchall()
+        return [{
+            'id': row['video_id'],
+            'title': row['title'],
+            'description': row['description'],
+            'duration': row['duration'],
+            'publishedAt': row['published_at'],
+        } for row in rows]
+
+    # --- Processed videos ---
+
+    def add_processed(self, video_id, processed_path, title=None, original_url=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed_videos VALUES (?, ?, ?, ?, ?)",
+                (video_id, title, original_url, processed_path, time.time()))
+
+    def is_processed(self, video_id):
+        return self._exists("SELECT 1 FROM processed_videos WHERE video_id = ?", (video_id,))
+
+    # --- Uploaded videos ---
+
+    def add_upload(self, upload_result, source_video_id=None):
+        """Appends an upload record ({'id', 'snippet': {'title'}, 'uploaded_at'})."""
+        uploaded_at = upload_result.get('uploaded_at') or datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO uploaded_videos VALUES (?, ?, ?, ?, ?)",
+                (upload_result['id'], source_video_id,
+                 upload_result.get('snippet', {}).get('title'),
+                 uploaded_at, datetime.fromisoformat(uploaded_at).timestamp()))
+
+    def is_uploaded_source(self, video_id):
+        """Returns True if a Short made from this source video was already uploaded."""
+        return self._exists("SELECT 1 FROM uploaded_videos WHERE source_video_id = ?", (video_id,))
+
+    def count_uploads_since(self, since):
+        """Counts uploads at or after `since` (a datetime)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM uploaded_videos WHERE uploaded_ts >= ?",
+                (since.timestamp(),)).fetchone()
+        return row[0]
+
+    def list_uploads(self):
+        """Returns every upload in the dict shape of the old uploaded_videos.json."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM uploaded_videos ORDER BY uploaded_ts").fetchall()
+        return [{
+            'id': row['youtube_id'],
+            'snippet': {'title': row['title']},
+            'uploaded_at': row['uploaded_at'],
+            'source_video_id': row['source_video_id'],
+        } for row in rows]
+
+    # --- Resumable upload sessions ---
+
+    def get_upload_session(self, session_key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT resumable_uri FROM upload_sessions WHERE session_key = ?",
+                (session_key,)).fetchone()
+        return row[0] if row else None
+
+    def save_upload_session(self, session_key, resumable_uri):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO upload_sessions VALUES (?, ?, ?)",
+                (session_key, resumable_uri, time.time()))
+
+    def delete_upload_session(self, session_key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM upload_sessions WHERE session_key = ?", (session_key,))
+
+    # --- Rate limiter state ---
+
+    def get_limiter_state(self, name):
+        """Returns (value, updated_ts) for a named limiter counter, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, updated_ts FROM limiter_state WHERE name = ?", (name,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def save_limiter_state(self, name, value, updated_ts):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO limiter_state VALUES (?, ?, ?)", (name, value, updated_ts))
+
+    # --- API quota usage ---
+
+    def add_quota_usage(self, day, method, units, calls=1):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO quota_usage VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (day, method) DO UPDATE SET "
+                "units = units + excluded.units, calls = calls + excluded.calls",
+                (day, method, units, calls))
+
+    def get_quota_usage(self, day):
+        """Returns {method: (units, calls)} for a quota day."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT method, units, calls FROM quota_usage WHERE day = ?", (day,)).fetchall()
+        return {row['method']: (row['units'], row['calls']) for row in rows}
+
+    # --- Per-item stage manifest ---
+
+    def set_item_stage(self, video_id, stage, fingerprint=None, output_path=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO item_stages VALUES (?, ?, ?, ?, ?)",
+                (video_id, stage, fingerprint, output_path, time.time()))
+
+    def get_item_stage(self, video_id, stage):
+        """Returns {'fingerprint', 'output_path', 'updated_ts'} for a completed stage, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, output_path, updated_ts FROM item_stages "
+                "WHERE video_id = ? AND stage = ?", (video_id, stage)).fetchone()
+        return dict(row) if row else None
+
+    def delete_item_stage(self, video_id, stage):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM item_stages WHERE video_id = ? AND stage = ?", (video_id, stage))
+
+    def list_item_stages(self, video_id):
+        """Returns {stage: updated_ts} for every completed stage of a video."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, updated_ts FROM item_stages WHERE video_id = ?", (video_id,)).fetchall()
+        return {row['stage']: row['updated_ts'] for row in rows}
+
+    def list_unfinished_items(self, since_ts, final_stage):
+        """
+        Returns collected videos updated since `since_ts` that have neither reached
+        `final_stage` nor been marked 'failed'.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.* FROM collected_videos c "
+                "JOIN item_stages s ON s.video_id = c.video_id AND s.stage = 'collected' "
+                "WHERE s.updated_ts >= ? AND NOT EXISTS ("
+                "  SELECT 1 FROM item_stages f WHERE f.video_id = c.video_id AND f.stage IN (?, 'failed')) "
+                "AND NOT EXISTS (SELECT 1 FROM uploaded_videos u WHERE u.source_video_id = c.video_id) "
+                "ORDER BY s.updated_ts, c.rowid", (since_ts, final_stage)).fetchall()
+        return [{
+            'id': row['video_id'],
+            'title': row['title'],
+            'description': row['description'],
+            'duration': row['duration'],
+            'publishedAt': row['published_at'],
+        } for row in rows]
+
+    # --- Migration ---
+
+    def import_json_files(self, video_list_file=None, uploaded_videos_file=None):
+        """
+        One-time import of the legacy video_list.json and uploaded_videos.json files.
+        Does nothing once an import has been recorded.
+        """
+        if self._get_meta('json_imported'):
+            return False
+
+        video_list_file = video_list_file or config.VIDEO_LIST_FILE
+        uploaded_videos_file = uploaded_videos_file or config.UPLOADED_VIDEOS_FILE
+
+        videos = [v for v in _read_json_list(video_list_file) if isinstance(v, dict)]
+        self.add_collected(videos)
+        uploads = [u for u in _read_json_list(uploaded_videos_file) if isinstance(u, dict) and u.get('id')]
+        for upload in uploads:
+            if _timestamp(upload.get('uploaded_at')) is None:
+                # 손상된 행 하나 때문에 마이그레이션(과 저장소를 여는 모든 단계)이 실패하지 않도록,
+                # 중복 업로드 방지를 위해 기록은 남기되 오늘 업로드 수에는 세지 않습니다
+                logger.warning(f"Legacy upload {upload['id']} has no valid uploaded_at "
+                               f"({upload.get('uploaded_at')!r}); importing it with an unknown upload time.")
+                upload = dict(upload, uploaded_at=_UNKNOWN_UPLOAD_TIME)
+            self.add_upload(upload, source_video_id=upload.get('source_video_id'))
+
+        self._set_meta('json_imported', datetime.now().isoformat())
+        logger.info(f"Imported {len(videos)} collected and {len(uploads)} uploaded videos from JSON.")
+        return True
+
+    # --- Helpers ---
+
+    def _exists(self, query, params):
+        with self._lock:
+            return self._conn.execute(query, params).fetchone() is not None
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+
+def _timestamp(value):
+    """POSIX timestamp of an ISO 8601 string, or None if it is missing or malformed."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_json_list(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    return data if isinstance(data, list) else []
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_state_store():
+    """Returns the process-wide StateStore, importing legacy JSON files on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = StateStore()
+            _store.import_json_files()
+        return _store
+
+
+if __name__ == '__main__':
+    store = get_state_store()
+    print(f"State store ready at {store.db_path}")
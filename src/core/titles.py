@@ -0,0 +1,293 @@
+"""
+Title images rasterised once with Pillow and composited by ffmpeg's overlay filter.
+
+A title is laid out once into a transparent RGBA PNG (white text, black outline, wrapped
+to the frame width and centred), so encoding only blends a still image instead of
+rendering text for every frame. Each character is drawn with the first font in the
+chain that has a glyph for it (NanumGothicBold, then TITLE_FALLBACK_FONTS: Devanagari,
+Telugu, colour emoji, DejaVu), so the mixed Korean/Hindi/Telugu/emoji titles we collect
+do not come out as boxes. Complex scripts are shaped by Pillow's raqm layout when libraqm
+is available.
+
+Images are cached in TITLE_CACHE_DIR by (text, font contents, size, width).
+"""
+import logging
+import os
+import re
+import threading
+import unicodedata
+
+from PIL import Image, ImageDraw, ImageFont, features
+
+from . import config
+from .manifest import file_digest, fingerprint
+
+logger = logging.getLogger(__name__)
+
+# 레이아웃/스타일 코드가 바뀌면 올려서 캐시된 이미지를 무효화합니다
+STYLE_VERSION = 1
+TEXT_COLOR = (255, 255, 255, 255)
+STROKE_COLOR = (0, 0, 0, 255)
+STROKE_RATIO = 0.05  # 외곽선 두께 / 글자 크기 (drawtext borderw=3 @ 64px 와 비슷)
+LINE_SPACING = 1.25
+MARGIN_RATIO = 0.06  # 좌우 여백 / 프레임 너비
+ELLIPSIS = "\u2026"
+# Noto Color Emoji 같은 비트맵(CBDT) 폰트는 이 크기로만 열립니다
+BITMAP_FONT_SIZE = 109
+
+# 앞 글자와 떨어지면 안 되는 문자: 결합 문자, ZWJ/ZWNJ, 이모지 변형 선택자
+_JOINERS = {"\u200c", "\u200d", "\ufe0e", "\ufe0f"}
+_VIRAMAS = {"\u094d", "\u0c4d"}  # 데바나가리, 텔루구
+_NOTDEF_PROBE = "\uffff"
+
+_lock = threading.Lock()
+_fonts = {}
+_digests = {}
+
+
+def raqm_available():
+    return features.check("raqm")
+
+
+class _Font:
+    """One font of the fallback chain at a given size, with a per-character coverage cache."""
+
+    def __init__(self, path, size):
+        self.path = path
+        layout = ImageFont.Layout.RAQM if raqm_available() else ImageFont.Layout.BASIC
+        try:
+            self.font = ImageFont.truetype(path, size, layout_engine=layout)
+            self.scale = 1.0
+            self.color = False
+        except OSError:
+            # 비트맵 컬러 이모지 폰트는 고정 크기로 열고 그린 뒤 축소합니다
+            self.font = ImageFont.truetype(path, BITMAP_FONT_SIZE, layout_engine=layout)
+            self.scale = size / float(BITMAP_FONT_SIZE)
+            self.color = True
+        self._mode = "RGBA" if self.color else "L"
+        self._notdef = self._mask(_NOTDEF_PROBE)
+        self._coverage = {}
+
+    def _mask(self, text):
+        mask = self.font.getmask(text, mode=self._mode)
+        return mask.size, bytes(mask)
+
+    def covers(self, char):
+        """
+        True if the font has a glyph for char. Pillow does not expose the cmap, so a glyph
+        counts as missing when it renders exactly like the .notdef glyph.
+        """
+        covered = self._coverage.get(char)
+        if covered is None:
+            try:
+                covered = self._mask(char) != self._notdef
+            except (OSError, ValueError):
+                covered = False
+            self._coverage[char] = covered
+        return covered
+
+    def length(self, text):
+        return self.font.getlength(text) * self.scale
+
+
+def font_chain(font_file=None):
+    """Existing font files in fallback order, starting with font_file (default FONT_FILE)."""
+    paths = [font_file or config.FONT_FILE] + list(config.TITLE_FALLBACK_FONTS)
+    chain = []
+    for path in paths:
+        try:
+            if path and path not in chain and os.path.getsize(path) > 0:
+                chain.append(path)
+        except OSError:
+            continue
+    return chain
+
+
+def _load_fonts(paths, size):
+    fonts = []
+    for path in paths:
+        key = (path, size)
+        with _lock:
+            font = _fonts.get(key)
+        if font is None:
+            try:
+                font = _Font(path, size)
+            except OSError as e:
+                logger.warning(f"Could not load title font {path}: {e}")
+                continue
+            with _lock:
+                _fonts[key] = font
+        fonts.append(font)
+    return fonts
+
+
+def _font_digest(path):
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime)
+    with _lock:
+        digest = _digests.get(key)
+    if digest is None:
+        digest = file_digest(path)
+        with _lock:
+            _digests[key] = digest
+    return digest
+
+
+def _sticks_to_previous(char, previous):
+    return (char in _JOINERS or unicodedata.category(char).startswith("M")
+            or previous in _VIRAMAS or previous == "\u200d")
+
+
+def _runs(text, fonts):
+    """Splits text into (font, substring) runs; each character goes to the first font covering it."""
+    runs = []
+    previous = ""
+    for char in text:
+        if runs and (char.isspace() or _sticks_to_previous(char, previous)):
+            font = runs[-1][0]
+        else:
+            font = next((f for f in fonts if f.covers(char)), fonts[0])
+        if runs and runs[-1][0] is font:
+            runs[-1][1].append(char)
+        else:
+            runs.append((font, [char]))
+        previous = char
+    return [(font, "".join(chars)) for font, chars in runs]
+
+
+def _width(text, fonts):
+    return sum(font.length(part) for font, part in _runs(text, fonts))
+
+
+def _break_units(word):
+    """Pieces a word without spaces may be broken into (never inside a cluster)."""
+    units = []
+    previous = ""
+    for char in word:
+        if units and _sticks_to_previous(char, previous):
+            units[-1] += char
+        else:
+            units.append(char)
+        previous = char
+    return units
+
+
+def _wrap(text, fonts, max_width, max_lines):
+    """Greedy word wrap; words wider than a line are broken between clusters."""
+    lines = []
+    line = ""
+    for token in re.findall(r"\S+", text):
+        candidate = f"{line} {token}" if line else token
+        if _width(candidate, fonts) <= max_width:
+            line = candidate
+            continue
+        if line:
+            lines.append(line)
+            line = ""
+        for unit in _break_units(token) if _width(token, fonts) > max_width else [token]:
+            if line and _width(line + unit, fonts) > max_width:
+                lines.append(line)
+                line = ""
+            line += unit
+    if line:
+        lines.append(line)
+
+    if len(lines) > max_lines:
+        last = lines[max_lines - 1]
+        while last and _width(last + ELLIPSIS, fonts) > max_width:
+            last = last[:-1]
+        lines = lines[:max_lines - 1] + [last.rstrip() + ELLIPSIS]
+    return lines
+
+
+def _draw_run(image, draw, font, text, x, baseline, stroke):
+    if not font.color:
+        draw.text((x, baseline), text, font=font.font, fill=TEXT_COLOR, anchor="ls",
+                  stroke_width=stroke, stroke_fill=STROKE_COLOR)
+        return
+    left, top, right, bottom = font.font.getbbox(text, anchor="ls")
+    if right <= left or bottom <= top:
+        return
+    glyphs = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+    ImageDraw.Draw(glyphs).text((-left, -top), text, font=font.font, anchor="ls", embedded_color=True)
+    size = (max(1, round(glyphs.width * font.scale)), max(1, round(glyphs.height * font.scale)))
+    glyphs = glyphs.resize(size, Image.LANCZOS)
+    position = (max(0, int(round(x + left * font.scale))), max(0, int(round(baseline + top * font.scale))))
+    image.alpha_composite(glyphs, position)
+
+
+def rasterise(text, frame_width, font_file=None, font_size=64, max_lines=None):
+    """
+    Lays out and draws a title.
+    :param frame_width: Width of the video; lines wrap inside it minus the side margins.
+    :return: An RGBA PIL image cropped to the text block, or None for an empty title or no usable font.
+    """
+    text = " ".join((text or "").split())
+    paths = font_chain(font_file)
+    fonts = _load_fonts(paths, font_size)
+    if not text or not fonts:
+        if text:
+            logger.warning(f"No usable title font (tried {[font_file or config.FONT_FILE] + list(config.TITLE_FALLBACK_FONTS)})")
+        return None
+
+    stroke = max(2, int(round(font_size * STROKE_RATIO)))
+    max_width = frame_width * (1 - 2 * MARGIN_RATIO) - 2 * stroke
+    lines = _wrap(text, fonts, max_width, max_lines or config.TITLE_MAX_LINES)
+
+    ascent, descent = fonts[0].font.getmetrics()
+    line_height = int(round(font_size * LINE_SPACING))
+    widths = [_width(line, fonts) for line in lines]
+    image_width = int(max(widths)) + 2 * stroke + 2
+    image_height = line_height * (len(lines) - 1) + ascent + descent + 2 * stroke
+    image = Image.new("RGBA", (image_width, image_height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+
+    for index, (line, line_width) in enumerate(zip(lines, widths)):
+        x = (image_width - line_width) / 2
+        baseline = stroke + ascent + index * line_height
+        for font, part in _runs(line, fonts):
+            _draw_run(image, draw, font, part, x, baseline, stroke)
+            x += font.length(part)
+    return image
+
+
+def render_title(text, frame_width, font_file=None, font_size=64, cache_dir=None):
+    """
+    Returns the cached PNG of a title, rasterising it on first use.
+    :return: A dictionary with path, width and height of the PNG, or None if there is nothing to draw.
+    """
+    paths = font_chain(font_file)
+    cache_dir = cache_dir or config.TITLE_CACHE_DIR
+    key = fingerprint(STYLE_VERSION, text, [_font_digest(path) for path in paths], font_size, frame_width,
+                      config.TITLE_MAX_LINES, raqm_available())
+    path = os.path.join(cache_dir, f"{key[:24]}.png")
+
+    if not os.path.exists(path):
+        image = rasterise(text, frame_width, font_file, font_size)
+        if image is None:
+            return None
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        image.save(temp_path, format="PNG")
+        os.replace(temp_path, path)
+        _prune(cache_dir, config.TITLE_CACHE_MAX_FILES)
+    else:
+        os.utime(path)
+
+    with Image.open(path) as image:
+        width, height = image.size
+    return {"path": path, "width": width, "height": height}
+
+
+def _prune(cache_dir, max_files):
+    """Keeps the max_files most recently used images."""
+    try:
+        entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".png")]
+        entries.sort(key=os.path.getmtime, reverse=True)
+    except OSError:
+        return
+    for path in entries[max_files:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
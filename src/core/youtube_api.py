@@ -1,9 +1,33 @@
-import googleapiclient.discovery
+import contextlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
+
 import googleapiclient.errors
+import httplib2
 from googleapiclient.http import MediaFileUpload
 
 # from . import auth # auth 모듈의 직접적인 의존성을 제거합니다.
+from . import api_client
 from . import config
+from . import metrics
+from .quota import get_quota_ledger, method_name
+from .response_cache import get_response_cache
+from .state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+
+class UploadFailedError(RuntimeError):
+    """Raised when a resumable upload still fails after UPLOAD_MAX_RETRIES retries."""
+
 
 class YouTubeAPI:
     """A wrapper class for the YouTube Data API v3."""
@@ -11,26 +35,67 @@ class YouTubeAPI:
     def __init__(self, credentials=None, developerKey=None):
         """
         Initializes the YouTube API client.
+        The underlying service and HTTP pool are shared per credential (see api_client).
         :param credentials: OAuth 2.0 credentials object.
         :param developerKey: YouTube Data API Key.
         """
         self.youtube = None
+        self._client = None
+        # 실제로 보낸 API 요청 수 (응답 캐시의 신선한 적중은 포함하지 않음)
+        self.requests_sent = 0
+        self._requests_lock = threading.Lock()
+        self.credentials = credentials
+        self.developerKey = developerKey
         if credentials:
             try:
-                self.youtube = googleapiclient.discovery.build(
-                    "youtube", "v3", credentials=credentials)
-                print("YouTube API client initialized with OAuth 2.0 credentials.")
+                self._client = api_client.get_youtube_client(credentials=credentials)
+                self.youtube = self._client.service
+                logger.info("YouTube API client initialized with OAuth 2.0 credentials.")
             except Exception as e:
-                print(f"Error initializing with OAuth credentials: {e}")
+                logger.error(f"Error initializing with OAuth credentials: {e}")
         elif developerKey:
             try:
-                self.youtube = googleapiclient.discovery.build(
-                    "youtube", "v3", developerKey=developerKey)
-                print("YouTube API client initialized with API Key.")
+                self._client = api_client.get_youtube_client(developer_key=developerKey)
+                self.youtube = self._client.service
+                logger.info("YouTube API client initialized with API Key.")
             except Exception as e:
-                print(f"Error initializing with API key: {e}")
+                logger.error(f"Error initializing with API key: {e}")
         else:
-            print("Warning: YouTubeAPI initialized without credentials or API key.")
+            logger.warning("YouTubeAPI initialized without credentials or API key.")
+
+    def execute(self, request, cache_ttl=None):
+        """
+        Executes a request built from self.youtube on a pooled keep-alive transport
+        and charges its unit cost to the quota ledger.
+        Read-only calls go through the response cache (fresh hits cost nothing).
+        Safe to call from several threads at once.
+        :param cache_ttl: Overrides the cache freshness in seconds; 0 always revalidates.
+        """
+        cache = get_response_cache()
+        if cache is not None and cache.cacheable(request):
+            return cache.fetch(request, self._send, ttl=cache_ttl)
+        return self._send(request)
+
+    def _send(self, request):
+        method = method_name(request)
+        get_quota_ledger().charge(method)
+        with self._requests_lock:
+            self.requests_sent += 1
+        started = time.perf_counter()
+        try:
+            if self._client is None:
+                return request.execute()
+            return self._client.execute(request)
+        except googleapiclient.errors.HttpError as e:
+            # 304는 응답 캐시 재검증의 정상 결과입니다
+            if e.resp.status != 304:
+                metrics.API_ERRORS.labels(method).inc()
+            raise
+        except Exception:
+            metrics.API_ERRORS.labels(method).inc()
+            raise
+        finally:
+            metrics.API_REQUEST_SECONDS.labels(method).observe(time.perf_counter() - started)
 
     def search_videos(self, query, max_results=5):
         """
@@ -40,7 +105,7 @@ class YouTubeAPI:
         :return: A list of search results.
         """
         if not self.youtube:
-            print("YouTube client not initialized.")
+            logger.error("YouTube client not initialized.")
             return []
 
         try:
@@ -50,10 +115,10 @@ class YouTubeAPI:
                 type="video",
                 maxResults=max_results
             )
-            response = request.execute()
+            response = self.execute(request)
             return response.get("items", [])
         except googleapiclient.errors.HttpError as e:
-            print(f"An HTTP error {e.resp.status} occurred: {e.content}")
+            logger.error(f"An HTTP error {e.resp.status} occurred: {e.content}")
             return []
 
     def get_video_details(self, video_id):
@@ -63,7 +128,7 @@ class YouTubeAPI:
         :return: A dictionary containing video details.
         """
         if not self.youtube:
-            print("YouTube client not initialized.")
+            logger.error("YouTube client not initialized.")
             return None
 
         try:
@@ -71,20 +136,80 @@ class YouTubeAPI:
                 part="snippet,statistics,contentDetails",
                 id=video_id
             )
-            response = request.execute()
+            response = self.execute(request)
             return response.get("items", [None])[0]
         except googleapiclient.errors.HttpError as e:
-            print(f"An HTTP error {e.resp.status} occurred: {e.content}")
+            logger.error(f"An HTTP error {e.resp.status} occurred: {e.content}")
             return None
 
-    def upload_video(self, file_path, title, description, tags, category_id, privacy_status):
+    def get_videos_details(self, video_ids, part="snippet,statistics,contentDetails", max_workers=None,
+                           cache_ttl=None):
+        """
+        Fetches details for many videos, batching IDs into videos.list requests.
+        :param video_ids: An iterable of video IDs.
+        :param part: The resource parts to request.
+        :param max_workers: Number of batches fetched concurrently (default: config.API_MAX_WORKERS).
+        :param cache_ttl: Response cache freshness override, see execute().
+        :return: A dictionary mapping each found video ID to its details.
         """
-        Uploads a video to YouTube.
+        if not self.youtube:
+            logger.error("YouTube client not initialized.")
+            return {}
+
+        # 순서를 유지하며 중복 제거
+        unique_ids = list(dict.fromkeys(video_ids))
+        batch_size = config.VIDEOS_LIST_BATCH_SIZE
+        chunks = [unique_ids[i:i + batch_size] for i in range(0, len(unique_ids), batch_size)]
+        if not chunks:
+            return {}
+
+        if max_workers is None:
+            max_workers = config.API_MAX_WORKERS
+        max_workers = max(1, min(max_workers, len(chunks)))
+
+        if max_workers == 1:
+            results = [self._fetch_videos_chunk(chunk, part, cache_ttl) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(
+                    lambda chunk: self._fetch_videos_chunk(chunk, part, cache_ttl), chunks))
+
+        details = {}
+        for items in results:
+            for item in items:
+                details[item["id"]] = item
+        return details
+
+    def _fetch_videos_chunk(self, chunk, part, cache_ttl=None):
+        """Runs a single videos.list request for up to 50 IDs."""
+        try:
+            request = self.youtube.videos().list(
+                part=part,
+                id=",".join(chunk),
+                maxResults=len(chunk)
+            )
+            response = self.execute(request, cache_ttl=cache_ttl)
+            return response.get("items", [])
+        except googleapiclient.errors.HttpError as e:
+            logger.error(f"An HTTP error {e.resp.status} occurred: {e.content}")
+            return []
+
+    def upload_video(self, file_path, title, description, tags, category_id, privacy_status,
+                     chunk_size=None, progress_callback=None, publish_at=None):
+        """
+        Uploads a video to YouTube in resumable chunks.
+        Transient failures are retried with exponential backoff, and the resumable session
+        is persisted so a restarted process continues an interrupted upload.
         :param file_path: Path to the video file.
+        :param chunk_size: Bytes per chunk (default: config.UPLOAD_CHUNK_SIZE).
+        :param progress_callback: Called as progress_callback(bytes_sent, total_bytes).
+        :param publish_at: Optional UTC datetime; the video is uploaded private and published then.
+            This overrides privacy_status: a 'public' upload with publish_at stays private
+            (scheduled) until YouTube publishes it at that time.
         :return: The upload response from YouTube.
         """
         if not self.youtube:
-            print("YouTube client not initialized.")
+            logger.error("YouTube client not initialized.")
             return None
 
         try:
@@ -99,15 +224,142 @@ class YouTubeAPI:
                     "privacyStatus": privacy_status
                 }
             }
-            media_body = MediaFileUpload(file_path, resumable=True)
+            if publish_at:
+                # publishAt은 private 상태의 비디오에만 설정할 수 있습니다
+                body["status"] = {
+                    "privacyStatus": "private",
+                    "publishAt": publish_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+                }
+            media_body = MediaFileUpload(
+                file_path, chunksize=chunk_size or config.UPLOAD_CHUNK_SIZE, resumable=True)
             request = self.youtube.videos().insert(
                 part=",".join(body.keys()),
                 body=body,
                 media_body=media_body
             )
-            response = request.execute()
-            print(f"Successfully uploaded '{title}' with ID: {response['id']}")
+            if not get_quota_ledger().reserve("videos.insert"):
+                logger.warning(f"Daily API quota exhausted. Not uploading '{title}'.")
+                return None
+            started = time.perf_counter()
+            outcome = "failure"
+            try:
+                response = self._run_resumable_upload(request, file_path, progress_callback)
+                outcome = "success"
+                metrics.UPLOAD_BYTES.inc(os.path.getsize(file_path))
+            finally:
+                metrics.UPLOAD_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+            logger.info(f"Successfully uploaded '{title}' with ID: {response['id']}")
             return {"id": response['id'], "snippet": {"title": title}}
         except googleapiclient.errors.HttpError as e:
-            print(f"An HTTP error {e.resp.status} occurred: {e.content}")
+            logger.error(f"An HTTP error {e.resp.status} occurred: {e.content}")
             return None
+        except UploadFailedError as e:
+            # 재시도를 모두 써도 세션 URI는 저장돼 있으므로 다음 실행에서 이어서 올립니다
+            logger.error(f"Upload of '{title}' gave up: {e}")
+            return None
+
+    def set_thumbnail(self, video_id, image_path):
+        """
+        Sets a custom thumbnail on an uploaded video (requires a verified channel).
+        Skipped when the daily quota cannot cover it.
+        :return: True if the thumbnail was set.
+        """
+        if not self.youtube:
+            logger.error("YouTube client not initialized.")
+            return False
+        if not get_quota_ledger().can_afford("thumbnails.set"):
+            logger.warning(f"Daily API quota exhausted. Not setting a thumbnail on {video_id}.")
+            return False
+        try:
+            request = self.youtube.thumbnails().set(
+                videoId=video_id,
+                media_body=MediaFileUpload(image_path, mimetype="image/jpeg")
+            )
+            self.execute(request)
+            return True
+        except googleapiclient.errors.HttpError as e:
+            logger.error(f"An HTTP error {e.resp.status} occurred while setting the thumbnail: {e.content}")
+            return False
+
+    def _run_resumable_upload(self, request, file_path, progress_callback=None):
+        """Drives next_chunk() until the upload completes, retrying transient errors."""
+        store = get_state_store()
+        stat = os.stat(file_path)
+        session_key = f"{os.path.abspath(file_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+        saved_uri = store.get_upload_session(session_key)
+        if saved_uri:
+            logger.info(f"Resuming interrupted upload session for {file_path}")
+            request.resumable_uri = saved_uri
+
+        # 업로드 동안 풀의 연결 하나를 계속 사용합니다
+        connection = self._client.http_pool.connection() if self._client else contextlib.nullcontext(request.http)
+        with connection as http:
+            response = None
+            retries = 0
+            # 재개하거나 청크 전송이 끊긴 뒤에는 서버가 실제로 받은 위치부터 이어서 보냅니다
+            resync = saved_uri is not None
+            while response is None:
+                try:
+                    if resync:
+                        response = self._query_upload_offset(request, http, stat.st_size)
+                        resync = False
+                        if response is not None:
+                            break
+                    status, response = request.next_chunk(http=http)
+                    if request.resumable_uri and request.resumable_uri != saved_uri:
+                        saved_uri = request.resumable_uri
+                        store.save_upload_session(session_key, saved_uri)
+                    if status and progress_callback:
+                        progress_callback(status.resumable_progress, status.total_size)
+                    retries = 0
+                    continue
+                except googleapiclient.errors.HttpError as e:
+                    if e.resp.status in (404, 410) and saved_uri:
+                        # 세션이 만료되었으면 처음부터 새 세션으로 다시 시작합니다
+                        logger.warning(f"Upload session expired for {file_path}. Starting over.")
+                        store.delete_upload_session(session_key)
+                        saved_uri = None
+                        request.resumable_uri = None
+                        request.resumable_progress = 0
+                        resync = False
+                        continue
+                    if e.resp.status not in config.UPLOAD_RETRIABLE_STATUS_CODES:
+                        raise
+                    error = f"HTTP {e.resp.status}"
+                except (httplib2.HttpLib2Error, HTTPException, socket.timeout, OSError) as e:
+                    # Python 3.9에서 socket.timeout은 TimeoutError의 하위 클래스가 아닙니다
+                    resync = request.resumable_uri is not None
+                    error = str(e) or type(e).__name__
+
+                retries += 1
+                if retries > config.UPLOAD_MAX_RETRIES:
+                    raise UploadFailedError(f"Upload of {file_path} failed after {config.UPLOAD_MAX_RETRIES} retries: {error}")
+                delay = min(random.random() * 2 ** retries, 60)
+                logger.warning(f"Retriable upload error ({error}). Retry {retries}/{config.UPLOAD_MAX_RETRIES} in {delay:.1f}s.")
+                time.sleep(delay)
+
+        if progress_callback:
+            size = os.path.getsize(file_path)
+            progress_callback(size, size)
+        store.delete_upload_session(session_key)
+        return response
+
+    @staticmethod
+    def _query_upload_offset(request, http, total_size):
+        """
+        Asks the resumable session how many bytes it has committed (an empty PUT with
+        `Content-Range: bytes */total`) and moves request.resumable_progress there.
+        :return: The video resource if the server already has the whole file, else None.
+        :raises HttpError: For any other status (404/410 for an expired session).
+        """
+        resp, content = http.request(
+            request.resumable_uri, method="PUT", body=b"",
+            headers={"Content-Length": "0", "Content-Range": f"bytes */{total_size}"})
+        if resp.status in (200, 201):
+            return json.loads(content.decode("utf-8"))
+        if resp.status != 308:
+            raise googleapiclient.errors.HttpError(resp, content, uri=request.resumable_uri)
+        match = re.match(r"bytes=0-(\d+)", resp.get("range", ""))
+        request.resumable_progress = int(match.group(1)) + 1 if match else 0
+        return None
@@ -0,0 +1,118 @@
+import contextlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """State of one pipeline run: current stage, progress counts and per-stage timings."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"  # queued -> running -> succeeded / failed
+        self.stage = None
+        self.progress = {}
+        self.timings = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed")
+
+    @contextlib.contextmanager
+    def track_stage(self, name):
+        """Marks `name` as the current stage and records how long it took."""
+        with self._lock:
+            self.stage = name
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            metrics.STAGE_SECONDS.labels(name).observe(elapsed)
+            with self._lock:
+                self.timings[name] = round(elapsed, 3)
+
+    def set_progress(self, **counts):
+        with self._lock:
+            self.progress.update(counts)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "timings": dict(self.timings),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobManager:
+    """
+    Runs pipeline jobs one at a time on a background worker thread.
+    Submitting while a job is queued or running returns that job instead of starting another.
+    """
+
+    def __init__(self, max_history=50):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline")
+        self._jobs = OrderedDict()
+        self._active = None
+        self._lock = threading.Lock()
+        self._max_history = max_history
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Enqueues fn(job, *args, **kwargs) unless a job is already active.
+        :return: A tuple (job, created) where created is False when the call was coalesced.
+        """
+        with self._lock:
+            if self._active is not None and not self._active.finished:
+                logger.info(f"Pipeline job {self._active.id} is already {self._active.status}. Coalescing.")
+                return self._active, False
+
+            job = Job()
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._max_history:
+                self._jobs.popitem(last=False)
+            self._active = job
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "succeeded"
+        except Exception as e:
+            logger.error(f"Pipeline job {job.id} failed: {e}", exc_info=True)
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
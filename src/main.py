@@ -3,55 +3,61 @@ import os
 
 # config 모듈 임포트
 import src.core.config as config
+from src.core import logging_config
 
-# Google Cloud Storage 임포트
-from google.cloud import storage
-
-# pytubefix 관련 임포트 및 경로 설정
-import pytubefix
+# pytubefix 관련 경로 설정 (패키지는 임포트하지 않고 위치만 찾습니다)
+import importlib.util
 import pathlib
 import time # time 모듈 임포트
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.DEBUG,  # DEBUG 레벨로 변경
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(config.LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# 로깅 설정: 큐 기반 단일 구성 (core/logging_config.py)
+logging_config.setup_logging()
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger(logging_config.ACCESS_LOGGER)
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import RedirectResponse
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
+from fastapi.responses import RedirectResponse, Response
+from starlette.concurrency import run_in_threadpool
 import os
 import json
-from src.collection.collect import collect_videos
-from src.processing.process import VideoProcessor
-from src.analysis import run_analysis
-from src.upload import run_upload
-from src.core.youtube_api import YouTubeAPI
+from src.core import metrics
+from src.core.quota import get_quota_ledger
+from src.core.credentials_manager import CredentialManager, CredentialsUnavailableError
+from src.jobs import JobManager
+from src.warmup import Warmup
+
+# 무거운 의존성(googleapiclient, pytubefix, 파이프라인 단계)은 여기서 불러오지 않습니다.
+# 시작 시 Warmup이 백그라운드에서 불러오고, 엔드포인트는 필요할 때 지역 임포트합니다.
 
 # FastAPI 애플리케이션 인스턴스 생성
 app = FastAPI()
 
+# 파이프라인은 이벤트 루프 밖의 작업 스레드에서 한 번에 하나씩 실행
+job_manager = JobManager()
+
 # GCS 버킷 이름 설정 (환경 변수에서 가져오거나 기본값 사용)
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "shortclipbox-token-bucket")
 TOKEN_FILE_NAME = "token.json"
 
 # pytubefix 캐시 디렉터리 및 토큰 파일 설정
-_pytubefix_cache_dir = pathlib.Path(pytubefix.__file__).parent.resolve() / '__cache__'
+_pytubefix_cache_dir = pathlib.Path(importlib.util.find_spec('pytubefix').origin).parent.resolve() / '__cache__'
 _pytubefix_token_file = os.path.join(_pytubefix_cache_dir, 'tokens.json')
 
-# 미들웨어 추가: 모든 요청과 응답을 로깅
+# 미들웨어 추가: 요청마다 지연 시간을 기록하고, 접근 로그는 샘플링해서 한 줄로 남김
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    logger.debug(f"Request: {request.method} {request.url}")
+    started = time.perf_counter()
     response = await call_next(request)
-    logger.debug(f"Response: {response.status_code}")
+    elapsed = time.perf_counter() - started
+    # 경로 템플릿(/jobs/{job_id})을 라벨로 써서 시계열 수가 늘지 않게 합니다
+    route = request.scope.get("route")
+    route_path = route.path if route else "unmatched"
+    metrics.HTTP_REQUEST_SECONDS.labels(request.method, route_path, str(response.status_code)).observe(elapsed)
+    level = logging.WARNING if response.status_code >= 500 else logging.INFO
+    if access_logger.isEnabledFor(level):
+        access_logger.log(level, "%s %s %d (%.1f ms)", request.method, request.url.path, response.status_code,
+                          elapsed * 1000, extra={"route": route_path, "status": response.status_code,
+                                                 "duration_ms": round(elapsed * 1000, 1)})
     return response
 
 # OAuth 2.0 클라이언트 설정
@@ -70,9 +76,6 @@ SCOPES = [
     "https://www.googleapis.com/auth/youtube"
 ]
 
-# 인증 정보를 메모리에 저장 (GCS에서 로드된 임시 저장소 역할)
-credentials_in_memory = None
-
 print("🔥 FastAPI main.py가 실행되고 있습니다.")
 
 @app.get("/")
@@ -82,6 +85,7 @@ async def read_root():
 @app.get("/auth/login")
 async def login():
     """YouTube 로그인 페이지로 리다이렉트"""
+    from google_auth_oauthlib.flow import Flow
     try:
         redirect_uri = os.getenv("REDIRECT_URI", "http://localhost:8000/auth/callback")
         flow = Flow.from_client_config(
@@ -101,7 +105,7 @@ async def login():
 @app.get("/auth/callback")
 async def auth_callback(code: str):
     """OAuth 인증 콜백 처리"""
-    global credentials_in_memory
+    from google_auth_oauthlib.flow import Flow
     try:
         redirect_uri = os.getenv("REDIRECT_URI", "http://localhost:8000/auth/callback")
         flow = Flow.from_client_config(
@@ -109,152 +113,121 @@ async def auth_callback(code: str):
             scopes=SCOPES,
             redirect_uri=redirect_uri
         )
-        flow.fetch_token(code=code)
+        await run_in_threadpool(flow.fetch_token, code=code)
         credentials = flow.credentials
         
-        # GCS에 credentials 저장
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(TOKEN_FILE_NAME)
-        
-        creds_dict = {
-            "token": credentials.token,
-            "refresh_token": credentials.refresh_token,
-            "token_uri": credentials.token_uri,
-            "client_id": credentials.client_id,
-            "client_secret": credentials.client_secret,
-            "scopes": credentials.scopes,
-            "expiry": credentials.expiry.isoformat() if credentials.expiry else None
-        }
-        
-        blob.upload_from_string(json.dumps(creds_dict))
+        # GCS와 메모리에 credentials 저장 (pytubefix 캐시도 함께 갱신됨)
+        # GCS 업로드는 블로킹이므로 이벤트 루프 밖에서 실행합니다
+        await run_in_threadpool(credential_manager.set, credentials)
         logger.info("인증 정보가 GCS에 성공적으로 저장되었습니다.")
-        
-        # 메모리에도 임시 저장
-        credentials_in_memory = credentials
-
-        # pytubefix 캐시도 업데이트
-        visitor_data = os.getenv("YOUTUBE_VISITOR_DATA")
-        po_token = os.getenv("YOUTUBE_PO_TOKEN")
-        if visitor_data and po_token:
-            save_pytubefix_tokens(credentials, visitor_data, po_token)
-        else:
-            logger.warning("YOUTUBE_VISITOR_DATA or YOUTUBE_PO_TOKEN environment variables are not set. pytubefix cache might not be fully populated.")
 
         return {"message": "인증이 완료되었습니다."}
     except Exception as e:
         logger.error(f"Callback error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-async def get_youtube_credentials():
-    """GCS에서 저장된 인증 정보를 가져오거나 갱신함"""
-    global credentials_in_memory
-    
-    # 메모리에 인증 정보가 있으면 사용
-    if credentials_in_memory and credentials_in_memory.valid:
-        return credentials_in_memory
+def update_pytubefix_cache(credentials):
+    """인증 정보가 바뀌었을 때만 pytubefix 토큰 캐시를 다시 씁니다."""
+    visitor_data = os.getenv("YOUTUBE_VISITOR_DATA")
+    po_token = os.getenv("YOUTUBE_PO_TOKEN")
+    if visitor_data and po_token:
+        save_pytubefix_tokens(credentials, visitor_data, po_token)
+    else:
+        logger.warning("YOUTUBE_VISITOR_DATA or YOUTUBE_PO_TOKEN environment variables are not set. pytubefix cache might not be fully populated.")
 
-    try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(TOKEN_FILE_NAME)
-        
-        # GCS에서 token.json 파일 읽기
-        token_data = blob.download_as_string().decode("utf-8")
-        creds_dict = json.loads(token_data)
-        
-        creds = Credentials.from_authorized_user_info(creds_dict, SCOPES)
-        
-        if not creds.valid:
-            if creds.expired and creds.refresh_token:
-                # Request 객체를 사용하지 않고 refresh
-                creds.refresh(Request())
-                # 갱신된 인증 정보 GCS에 저장
-                updated_creds_dict = {
-                    "token": creds.token,
-                    "refresh_token": creds.refresh_token,
-                    "token_uri": creds.token_uri,
-                    "client_id": creds.client_id,
-                    "client_secret": creds.client_secret,
-                    "scopes": creds.scopes,
-                    "expiry": creds.expiry.isoformat() if creds.expiry else None
-                }
-                blob.upload_from_string(json.dumps(updated_creds_dict))
-                logger.info("갱신된 인증 정보가 GCS에 성공적으로 저장되었습니다.")
-            else:
-                logger.error("인증 정보가 만료되었고 갱신 토큰이 없습니다.")
-                raise HTTPException(status_code=401, detail="인증이 만료되었습니다. /auth/login으로 이동해주세요.")
-
-        # 메모리에 갱신된 인증 정보 저장
-        credentials_in_memory = creds
-
-        # pytubefix 캐시도 업데이트
-        visitor_data = os.getenv("YOUTUBE_VISITOR_DATA")
-        po_token = os.getenv("YOUTUBE_PO_TOKEN")
-        if visitor_data and po_token:
-            save_pytubefix_tokens(creds, visitor_data, po_token)
-        else:
-            logger.warning("YOUTUBE_VISITOR_DATA or YOUTUBE_PO_TOKEN environment variables are not set. pytubefix cache might not be fully populated.")
-
-        return creds
+# 프로세스 전체에서 공유하는 인증 정보 캐시 (만료 전 백그라운드 갱신, 단일 GCS 읽기/갱신)
+credential_manager = CredentialManager(
+    GCS_BUCKET_NAME, TOKEN_FILE_NAME, SCOPES, on_change=update_pytubefix_cache)
 
-    except Exception as e:
+async def get_youtube_credentials():
+    """메모리에 캐시된 인증 정보를 반환하고, 필요하면 GCS에서 읽거나 갱신함"""
+    try:
+        # GCS 읽기와 토큰 갱신은 블로킹 호출이므로 스레드 풀에서 실행
+        return await run_in_threadpool(credential_manager.get)
+    except CredentialsUnavailableError as e:
         logger.error(f"GCS에서 인증 정보를 로드하거나 갱신하는 중 오류 발생: {str(e)}", exc_info=True)
         raise HTTPException(status_code=401, detail="인증이 필요합니다. /auth/login으로 이동해주세요.")
 
-@app.post("/run")
-async def run_automation():
+@app.post("/run", status_code=202)
+async def run_automation(mode: str = None):
+    """
+    파이프라인 작업을 큐에 넣고 즉시 작업 ID를 반환합니다. 실행 중인 작업이 있으면 그 작업을 반환합니다.
+    mode: "streaming" 또는 "batch" (기본값은 config.PIPELINE_MODE)
+    """
+    if mode not in (None, "streaming", "batch"):
+        raise HTTPException(status_code=400, detail="mode는 streaming 또는 batch여야 합니다.")
+    from src.pipeline import run_pipeline
+    credentials = await get_youtube_credentials()
     try:
-        logger.info("자동화 작업 시작")
-
-        # 1. 비디오 수집
-        logger.info("비디오 수집 시작")
-        credentials = await get_youtube_credentials()
-        collected_videos = collect_videos(credentials)
-        logger.info(f"수집된 비디오: {len(collected_videos)}개")
-
-        # 2. 비디오 처리
-        logger.info("비디오 처리 시작")
-        video_processor = VideoProcessor()
-        processed_videos_count = video_processor.run_processing(collected_videos)
-        logger.info(f"처리된 비디오: {processed_videos_count}개")
-
-        # 3. 성과 분석
-        logger.info("성과 분석 시작")
-        analysis_results = run_analysis()
-        logger.info("성과 분석 완료")
-
-        # 4. YouTube 업로드
-        logger.info("YouTube 업로드 시작")
-        # run_upload 함수가 처리된 비디오 목록을 기대하는 경우:
-        uploaded_videos = run_upload(video_processor.processed_videos, credentials)
-        logger.info(f"업로드된 비디오: {len(uploaded_videos)}개")
-
-        return {
-            "status": "success",
-            "collected_videos": len(collected_videos),
-            "processed_videos": processed_videos_count,
-            "uploaded_videos": len(uploaded_videos)
-        }
-
+        job, created = job_manager.submit(run_pipeline, credentials, mode=mode)
     except Exception as e:
-        logger.error(f"자동화 작업 중 오류 발생: {e}", exc_info=True)
+        logger.error(f"자동화 작업 등록 중 오류 발생: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        "status": job.status,
+        "job_id": job.id,
+        "coalesced": not created
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """파이프라인 작업의 단계, 진행 상황, 단계별 소요 시간을 반환합니다."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
+@app.get("/quota")
+async def get_quota():
+    """오늘(태평양 시간 기준) 사용한 YouTube Data API 쿼터를 메서드별로 반환합니다."""
+    return await run_in_threadpool(get_quota_ledger().snapshot)
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus 형식의 지표를 반환합니다."""
+    get_quota_ledger()  # 쿼터 게이지가 등록되도록 원장을 초기화합니다
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/cache")
+async def get_cache_stats():
+    """읽기 전용 API 응답 캐시의 적중/미스 통계를 반환합니다."""
+    from src.core.response_cache import get_response_cache
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return dict(cache.stats(), enabled=True)
+
+# 콜드 스타트 직후 첫 요청이 지연되지 않도록 인증 정보, API 클라이언트, ffmpeg를 미리 준비
+warmup = Warmup(credential_manager)
+
+@app.on_event("startup")
+def start_warmup():
+    if config.STARTUP_WARMUP:
+        warmup.start()
+
+@app.on_event("shutdown")
+def shutdown_job_manager():
+    job_manager.shutdown(wait=False)
+    credential_manager.close()
+
 @app.get("/status")
 async def get_status():
     """현재 작업 상태 확인"""
     return {
         "status": "running",
-        "message": "서버가 정상적으로 실행 중입니다."
+        "message": "서버가 정상적으로 실행 중입니다.",
+        "warmup": warmup.to_dict()
     }
 
 def run():
+    from src.upload import run_upload
     # 3. Upload videos
     run_upload(uploaded_videos)
 
 # pytubefix 토큰을 로컬 캐시에 저장하는 헬퍼 함수
-def save_pytubefix_tokens(google_creds: Credentials, visitor_data: str, po_token: str):
+def save_pytubefix_tokens(google_creds, visitor_data: str, po_token: str):
     if not _pytubefix_cache_dir.exists():
         _pytubefix_cache_dir.mkdir(parents=True, exist_ok=True)
 
@@ -0,0 +1,258 @@
+import logging
+import itertools
+import queue
+import threading
+import time
+
+from src.analysis import run_analysis
+from src.collection import collect_videos, iter_videos
+from src.core import config
+from src.core import metrics
+from src.core.manifest import get_manifest
+from src.core.quota import QuotaPlanner, get_quota_ledger
+from src.core.state_store import get_state_store
+from src.processing import VideoProcessor
+from src.processing.transcode import encode_threads_per_job
+from src.upload import run_upload
+from src.upload.upload import get_today_uploads, prepare_upload, upload_one
+
+logger = logging.getLogger(__name__)
+
+# 단계 사이 큐에서 작업자에게 종료를 알리는 표식
+_DONE = object()
+
+
+def run_pipeline(job, credentials, mode=None):
+    """
+    수집 → 처리 → 분석 → 업로드 파이프라인. 백그라운드 작업 스레드에서 실행됩니다.
+    :param mode: "streaming" or "batch" (default: config.PIPELINE_MODE).
+    """
+    mode = mode or config.PIPELINE_MODE
+    logger.info(f"자동화 작업 시작 (job {job.id}, {mode} 모드)")
+
+    # 0. 남은 API 쿼터로 업로드·분석 몫을 먼저 확보하고 검색 페이지 수를 정함
+    quota_plan = QuotaPlanner(
+        get_quota_ledger(), config.MAX_DAILY_UPLOADS,
+        uploads_today=get_today_uploads(),
+        analysis_video_count=len(get_state_store().list_uploads())
+    ).plan()
+
+    # 이전 실행에서 업로드까지 가지 못한 항목을 먼저 이어서 처리합니다.
+    # 오늘 남은 업로드 수만큼 밀려 있으면 새로 검색하지 않습니다.
+    resumed = get_manifest().resumable()
+    uploads_left = max(0, config.MAX_DAILY_UPLOADS - get_today_uploads())
+    if resumed and len(resumed) >= uploads_left:
+        logger.info(f"{len(resumed)}개 항목을 이어서 처리하므로 검색을 건너뜁니다.")
+        quota_plan = dict(quota_plan, search_pages=0)
+    job.set_progress(quota_plan=quota_plan, mode=mode, resumed_videos=len(resumed))
+
+    if mode == "streaming":
+        return run_streaming(job, credentials, quota_plan, resumed)
+    return run_batch(job, credentials, quota_plan, resumed)
+
+
+def run_batch(job, credentials, quota_plan, resumed=()):
+    """각 단계가 전체 목록을 끝낸 뒤 다음 단계로 넘어가는 순차 실행."""
+    # 1. 비디오 수집
+    with job.track_stage("collect"):
+        logger.info("비디오 수집 시작")
+        collected_videos = list(resumed) + collect_videos(
+            credentials, max_pages=quota_plan["search_pages"], skip_ids={video['id'] for video in resumed})
+        job.set_progress(collected_videos=len(collected_videos))
+        logger.info(f"수집된 비디오: {len(collected_videos)}개")
+
+    # 2. 비디오 처리
+    with job.track_stage("process"):
+        logger.info("비디오 처리 시작")
+        video_processor = VideoProcessor()
+        processed_videos_count = video_processor.run_processing(collected_videos)
+        job.set_progress(processed_videos=processed_videos_count)
+        logger.info(f"처리된 비디오: {processed_videos_count}개")
+
+    # 3. 성과 분석
+    with job.track_stage("analyze"):
+        _run_analysis(quota_plan, credentials)
+
+    # 4. YouTube 업로드
+    with job.track_stage("upload"):
+        logger.info("YouTube 업로드 시작")
+        uploaded_videos = run_upload(video_processor.processed_videos, credentials)
+        job.set_progress(uploaded_videos=len(uploaded_videos))
+        logger.info(f"업로드된 비디오: {len(uploaded_videos)}개")
+
+    return {
+        "collected_videos": len(collected_videos),
+        "processed_videos": processed_videos_count,
+        "uploaded_videos": len(uploaded_videos)
+    }
+
+
+def run_streaming(job, credentials, quota_plan, resumed=()):
+    """
+    Runs collect → download → transcode → upload as concurrent stages joined by bounded
+    queues. Each video moves on as soon as its stage finishes, so the first upload starts
+    after one item's latency instead of the whole batch, and a full queue blocks the
+    stage before it, which bounds the number of downloaded files waiting on disk.
+    Encodes go to the same process pool as in batch mode (transcode_executor). Only as
+    many items as there are uploads left today (daily limit, API quota) are in flight at
+    once, so no video is downloaded or encoded just to be dropped before upload.
+    Analysis of earlier uploads runs alongside on its own thread.
+    Items resumed from an earlier run enter the queue before newly searched ones.
+    """
+    depth = max(1, config.PIPELINE_QUEUE_DEPTH)
+    download_queue = queue.Queue(maxsize=depth)
+    transcode_queue = queue.Queue(maxsize=depth)
+    upload_queue = queue.Queue(maxsize=depth)
+
+    processor = VideoProcessor()
+    encode_workers = max(1, config.MAX_PARALLEL_ENCODES)
+    encode_threads = encode_threads_per_job(encode_workers)
+    uploader = prepare_upload(credentials)
+
+    counts = {"collected_videos": 0, "downloaded_videos": 0, "processed_videos": 0, "uploaded_videos": 0}
+    counts_lock = threading.Lock()
+    started = time.monotonic()
+
+    def count(name):
+        with counts_lock:
+            counts[name] += 1
+            job.set_progress(**counts)
+            if name == "uploaded_videos" and counts[name] == 1:
+                job.set_progress(time_to_first_upload=round(time.monotonic() - started, 3))
+
+    # 수집 단계는 오늘 남은 업로드 수만큼만 항목을 들여보내고, 항목이 업로드되거나
+    # 중간에 빠지면 자리를 돌려받습니다 (버려질 다운로드·인코딩을 하지 않습니다)
+    admission = threading.Condition()
+    pending = [0]
+
+    def uploads_left():
+        return uploader[1].remaining() if uploader is not None else 0
+
+    def admit():
+        with admission:
+            while True:
+                left = uploads_left()
+                if pending[0] < left:
+                    pending[0] += 1
+                    return True
+                if pending[0] == 0:
+                    return False
+                admission.wait()
+
+    def finish():
+        with admission:
+            pending[0] -= 1
+            admission.notify_all()
+
+    def collect():
+        try:
+            new_videos = iter_videos(credentials, max_pages=quota_plan["search_pages"],
+                                     skip_ids={video['id'] for video in resumed})
+            for video in itertools.chain(resumed, new_videos):
+                if not video.get('id'):
+                    continue
+                if not admit():
+                    logger.warning("업로드할 수 없으므로 (일일 업로드 제한 또는 API 쿼터) 수집을 멈춥니다.")
+                    return
+                count("collected_videos")
+                download_queue.put(video)
+        except Exception as e:
+            logger.error(f"비디오 수집 중 오류 발생: {str(e)}", exc_info=True)
+
+    def download(video):
+        downloaded = None
+        try:
+            # 큐에서 기다리는 동안 다른 실행이 예산을 다 썼다면 버릴 결과를 만들지 않습니다
+            if uploads_left() > 0:
+                downloaded = processor.download_video(video)
+        finally:
+            if not downloaded:
+                finish()
+        if downloaded:
+            count("downloaded_videos")
+            transcode_queue.put((video, downloaded))
+
+    def transcode(item):
+        video, downloaded = item
+        entry = None
+        try:
+            if uploads_left() > 0:
+                entry = processor.process_one(video, downloaded, threads=encode_threads, executor=encoder)
+        finally:
+            if not entry:
+                finish()
+        if entry:
+            count("processed_videos")
+            upload_queue.put(entry)
+
+    def upload(entry):
+        try:
+            if upload_one(uploader[0], uploader[1], entry):
+                count("uploaded_videos")
+        finally:
+            finish()
+
+    analysis = threading.Thread(target=_run_analysis, args=(quota_plan, credentials),
+                                name="pipeline-analyze", daemon=True)
+    analysis.start()
+
+    queues = {"download": download_queue, "transcode": transcode_queue, "upload": upload_queue}
+    for name, q in queues.items():
+        metrics.watch_queue(name, q)
+
+    with job.track_stage("stream"), processor.transcode_executor() as encoder:
+        stages = [
+            ("collect", [_start(collect, "pipeline-collect")], download_queue),
+            ("download", _start_workers(download, download_queue, config.DOWNLOAD_WORKERS, "pipeline-download"),
+             transcode_queue),
+            ("transcode", _start_workers(transcode, transcode_queue, encode_workers, "pipeline-transcode"),
+             upload_queue),
+            ("upload", _start_workers(upload, upload_queue, config.MAX_CONCURRENT_UPLOADS, "pipeline-upload"), None),
+        ]
+        # 앞 단계가 모두 끝나면 다음 단계 작업자 수만큼 종료 표식을 넣습니다
+        for index, (name, workers, out_queue) in enumerate(stages):
+            for worker in workers:
+                worker.join()
+            job.set_progress(finished_stage=name)
+            if out_queue is not None:
+                for _ in stages[index + 1][1]:
+                    out_queue.put(_DONE)
+
+    for name in queues:
+        metrics.unwatch_queue(name)
+
+    with job.track_stage("analyze"):
+        analysis.join()
+
+    logger.info(f"스트리밍 파이프라인 완료: {counts}")
+    return dict(counts)
+
+
+def _run_analysis(quota_plan, credentials):
+    if quota_plan["run_analysis"]:
+        logger.info("성과 분석 시작")
+        run_analysis(credentials)
+        logger.info("성과 분석 완료")
+    else:
+        logger.warning("업로드에 필요한 API 쿼터를 남기기 위해 성과 분석을 건너뜁니다.")
+
+
+def _start(target, name):
+    thread = threading.Thread(target=target, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def _start_workers(handle, in_queue, count, name):
+    """Starts `count` threads that call handle(item) for each queued item until _DONE."""
+    def work():
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                return
+            try:
+                handle(item)
+            except Exception as e:
+                logger.error(f"{name} 작업 중 오류 발생: {str(e)}", exc_info=True)
+
+    return [_start(work, f"{name}-{i}") for i in range(max(1, count))]
@@ -0,0 +1,197 @@
+"""
+Intro/outro clips and background music prepared once per output profile.
+
+Every render used to decode, scale and re-encode the same intro and outro and decode the
+same music track again. AssetCache transcodes each asset once into the exact profile of
+the rendered Shorts (codec settings, resolution, framerate, sample rate, track timescale),
+so bumpers can be joined to a freshly encoded main part with the concat demuxer by
+stream copy, and music is mixed from a decoded PCM WAV file.
+
+Entries are named by a digest of the asset's path plus a fingerprint of its contents and
+the profile, so replacing an asset file or changing the output settings selects a new
+entry by itself; older entries for the same path are removed when the new one is written.
+
+Runs in transcode pool workers: several workers may prepare the same asset at once, each
+writes its own temporary file and the last atomic rename wins.
+"""
+import logging
+import os
+import re
+import threading
+
+from src.core import config
+from src.core import ffmpeg_utils
+from src.core.manifest import file_digest, fingerprint
+
+logger = logging.getLogger(__name__)
+
+# concat 데머서로 스트림 복사하려면 모든 세그먼트의 트랙 timescale이 같아야 합니다
+VIDEO_TIMESCALE = 90000
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+_KEY_LENGTH = 16
+_SOURCE_LENGTH = 12
+
+
+def output_profile(width, height, fps):
+    """
+    Everything that has to match between segments joined by stream copy.
+    :return: A JSON-serialisable dictionary, fingerprinted into cache keys.
+    """
+    return {
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "video_args": list(ffmpeg_utils.VIDEO_ENCODE_ARGS),
+        "audio_args": list(ffmpeg_utils.AUDIO_ENCODE_ARGS),
+        "sample_rate": SAMPLE_RATE,
+        "channels": CHANNELS,
+        "timescale": VIDEO_TIMESCALE,
+    }
+
+
+def profile_output_args(profile):
+    """Output options that make an encode match the profile (pass after the codec arguments)."""
+    return ['-ar', str(profile["sample_rate"]), '-ac', str(profile["channels"]),
+            '-video_track_timescale', str(profile["timescale"])]
+
+
+class AssetCache:
+    """
+    Directory of assets normalised to an output profile.
+    prepare_clip() and prepare_music() return the cached file, building it on first use.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or config.ASSET_CACHE_DIR
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def prepare_clip(self, path, profile):
+        """
+        Returns an H.264/AAC MP4 of the clip in the profile's resolution (letterboxed),
+        framerate and sample rate; clips without audio get a silent track.
+        """
+        return self._prepare(path, profile, "clip", ".mp4", self._build_clip)
+
+    def prepare_music(self, path, profile):
+        """Returns the track decoded to a 16-bit PCM WAV at the profile's sample rate and channels."""
+        return self._prepare(path, profile, "music", ".wav", self._build_music)
+
+    def entry_path(self, path, profile, kind, suffix):
+        """Cache file for (asset content, profile); does not check that it exists."""
+        key = fingerprint(kind, file_digest(path), profile)[:_KEY_LENGTH]
+        return os.path.join(self.cache_dir, f"{_stem(path)}-{kind}-{_source_id(path)}-{key}{suffix}")
+
+    def _prepare(self, path, profile, kind, suffix, build):
+        target = self.entry_path(path, profile, kind, suffix)
+        if os.path.exists(target):
+            with self._lock:
+                self.hits += 1
+            return target
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            build(path, temp_path, profile)
+            os.replace(temp_path, target)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        with self._lock:
+            self.misses += 1
+        logger.info(f"Prepared {kind} asset {os.path.basename(path)} -> {os.path.basename(target)}")
+        self._remove_stale(target, path, kind, suffix)
+        return target
+
+    def _remove_stale(self, target, path, kind, suffix):
+        """Deletes entries of the same asset path and kind built for other contents or profiles."""
+        current = os.path.basename(target)
+        # 파일 이름 앞부분(_stem)은 비ASCII 이름끼리 겹칠 수 있으므로 경로 다이제스트로 고릅니다
+        stale = re.compile(r"-%s-%s-[0-9a-f]{%d}%s$" % (
+            re.escape(kind), _source_id(path), _KEY_LENGTH, re.escape(suffix)))
+        for name in os.listdir(self.cache_dir):
+            if name != current and stale.search(name):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    logger.debug(f"Removed stale asset cache entry {name}")
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _build_clip(path, output_path, profile):
+        width, height, fps = profile["width"], profile["height"], profile["fps"]
+        info = ffmpeg_utils.probe(path)
+        args = ['-i', path]
+        if info['audio_codec']:
+            audio = '0:a:0'
+        else:
+            args += ['-f', 'lavfi', '-t', f"{info['duration']:.3f}",
+                     '-i', f"anullsrc=r={profile['sample_rate']}:cl=stereo"]
+            audio = '1:a:0'
+        video_filter = (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={fps},format=yuv420p,setsar=1"
+        )
+        ffmpeg_utils.run_ffmpeg(
+            args + ['-map', '0:v:0', '-map', audio, '-vf', video_filter]
+            + profile["video_args"] + profile["audio_args"] + profile_output_args(profile)
+            + ['-shortest', '-movflags', '+faststart', '-f', 'mp4', output_path]
+        )
+
+    @staticmethod
+    def _build_music(path, output_path, profile):
+        ffmpeg_utils.run_ffmpeg([
+            '-i', path, '-map', '0:a:0', '-vn', '-c:a', 'pcm_s16le',
+            '-ar', str(profile["sample_rate"]), '-ac', str(profile["channels"]), '-f', 'wav', output_path
+        ])
+
+    def to_dict(self):
+        return {"dir": self.cache_dir, "hits": self.hits, "misses": self.misses}
+
+
+def _stem(path):
+    """File name without extension, reduced to characters safe in a cache file name."""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", os.path.splitext(os.path.basename(path))[0])[:40] or "asset"
+
+
+def _source_id(path):
+    """Short digest of the asset's absolute path, so every source file has its own entries."""
+    return fingerprint(os.path.abspath(path))[:_SOURCE_LENGTH]
+
+
+def prepare_configured_assets(cache=None):
+    """
+    Prepares the configured intro, outro and every music track for the configured profile,
+    so the first render does not pay for it.
+    :return: Names of the cache entries, or None if the cache is disabled.
+    """
+    cache = cache or get_asset_cache()
+    if cache is None:
+        return None
+    # render.py가 이 모듈을 임포트하므로 여기서는 지연 임포트합니다
+    from .render import music_tracks, usable_asset
+
+    width, height = config.OUTPUT_RESOLUTION
+    profile = output_profile(width, height, config.RENDER_FPS)
+    prepared = [cache.prepare_clip(path, profile)
+                for path in (config.INTRO_CLIP, config.OUTRO_CLIP) if usable_asset(path)]
+    prepared += [cache.prepare_music(path, profile) for path in music_tracks()]
+    return [os.path.basename(path) for path in prepared]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_asset_cache():
+    """Process-wide AssetCache, or None if ASSET_CACHE_ENABLED is off."""
+    global _cache
+    if not config.ASSET_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AssetCache()
+        return _cache
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from src.core import config
+from src.core import metrics
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE_NAME = "index.json"
+
+
+class DownloadCache:
+    """
+    Content-addressed cache for downloaded source videos.
+
+    Files are keyed by video ID plus stream itag, downloaded in ranged chunks into a
+    `.part` file that is resumed after a crash or timeout, checked against the expected
+    size, and evicted least-recently-used first once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or config.DOWNLOADS_DIR
+        self.max_bytes = config.DOWNLOAD_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.index_path = os.path.join(self.cache_dir, INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def lookup(self, video_id):
+        """
+        Returns the cached entry for a video, or None if it is missing or corrupt.
+        :return: A dictionary with path, title, itag and size.
+        """
+        with self._lock:
+            entry = self._index.get(video_id)
+            if not entry:
+                metrics.DOWNLOAD_CACHE_LOOKUPS.labels("miss").inc()
+                return None
+            path = os.path.join(self.cache_dir, entry['file'])
+            if not os.path.exists(path) or os.path.getsize(path) != entry['size']:
+                logger.warning(f"Cached download for {video_id} failed the size check. Discarding.")
+                self._discard(video_id)
+                self._save_index()
+                metrics.DOWNLOAD_CACHE_LOOKUPS.labels("corrupt").inc()
+                return None
+            metrics.DOWNLOAD_CACHE_LOOKUPS.labels("hit").inc()
+            entry['last_used'] = time.time()
+            self._save_index()
+            return dict(entry, path=path)
+
+    def fetch(self, video_id, stream, title):
+        """
+        Downloads a pytubefix stream into the cache, resuming any partial file.
+        :return: The cached entry, as returned by lookup().
+        """
+        file_name = f"{video_id}_{stream.itag}.{stream.subtype or 'mp4'}"
+        path = os.path.join(self.cache_dir, file_name)
+        expected_size = stream.filesize
+        if not expected_size:
+            raise IOError(f"Stream {stream.itag} of {video_id} did not report a file size.")
+
+        self._download(stream.url, path, expected_size)
+
+        with self._lock:
+            self._index[video_id] = {
+                'file': file_name,
+                'itag': stream.itag,
+                'size': expected_size,
+                'title': title,
+                'last_used': time.time(),
+            }
+            self._evict(keep=video_id)
+            self._save_index()
+        return dict(self._index[video_id], path=path)
+
+    def _download(self, url, path, expected_size):
+        """Downloads url to path in ranged chunks, resuming from an existing .part file."""
+        part_path = path + ".part"
+        attempts = 0
+        fetched = 0
+        started = time.perf_counter()
+        while True:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if offset > expected_size:
+                os.remove(part_path)
+                offset = 0
+            try:
+                with open(part_path, 'ab') as f:
+                    while offset < expected_size:
+                        end = min(offset + config.DOWNLOAD_CHUNK_SIZE, expected_size) - 1
+                        response = requests.get(
+                            url, headers={'Range': f"bytes={offset}-{end}"},
+                            stream=True, timeout=config.DOWNLOAD_TIMEOUT)
+                        response.raise_for_status()
+                        if response.status_code != 206 and offset > 0:
+                            # 서버가 Range를 무시하면 처음부터 다시 받습니다
+                            f.truncate(0)
+                            f.seek(0)
+                            offset = 0
+                        for block in response.iter_content(chunk_size=1024 * 1024):
+                            f.write(block)
+                            offset += len(block)
+                            fetched += len(block)
+                break
+            except (requests.RequestException, OSError) as e:
+                attempts += 1
+                if attempts > config.DOWNLOAD_RETRIES:
+                    raise
+                logger.warning(f"Download interrupted at {offset} bytes ({e}). "
+                               f"Resuming (attempt {attempts}/{config.DOWNLOAD_RETRIES}).")
+                time.sleep(min(2 ** attempts, 30))
+
+        actual_size = os.path.getsize(part_path)
+        if actual_size != expected_size:
+            os.remove(part_path)
+            raise IOError(f"Downloaded size {actual_size} does not match expected {expected_size} for {path}")
+        os.replace(part_path, path)
+
+        elapsed = time.perf_counter() - started
+        metrics.DOWNLOAD_BYTES.inc(fetched)
+        metrics.DOWNLOAD_SECONDS.observe(elapsed)
+        if elapsed > 0:
+            metrics.DOWNLOAD_SPEED.observe(fetched / elapsed)
+
+    def _evict(self, keep=None):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        total = sum(entry['size'] for entry in self._index.values())
+        for video_id in sorted(self._index, key=lambda v: self._index[v]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if video_id == keep:
+                continue
+            total -= self._index[video_id]['size']
+            logger.info(f"Evicting cached download for {video_id}.")
+            self._discard(video_id)
+
+    def _discard(self, video_id):
+        entry = self._index.pop(video_id, None)
+        if entry:
+            path = os.path.join(self.cache_dir, entry['file'])
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=4)
+        os.replace(tmp_path, self.index_path)
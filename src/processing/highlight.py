@@ -0,0 +1,121 @@
+"""
+Picks the most energetic `window`-second stretch of a video from its audio track.
+
+ffmpeg decodes the audio to mono 16-bit PCM at a low sample rate and streams it through a
+pipe; the samples are read in fixed-size blocks, reduced to one loudness value per hop
+(RMS in dBFS) and scored as loudness plus onset strength (the rise in loudness from the
+previous hop). Window scores are running sums over those hop scores, so memory stays at
+one block plus one window no matter how long the source is.
+"""
+import logging
+import subprocess
+import time
+
+import numpy as np
+
+from src.core import config
+
+logger = logging.getLogger(__name__)
+
+# 무음 구간의 dB 하한 (log(0) 방지)
+SILENCE_DB = -80.0
+
+
+def find_highlight(input_path, window, sample_rate=None, hop=None, onset_weight=None, block_seconds=30):
+    """
+    Finds the start of the `window`-second stretch with the highest audio energy score.
+    :param window: Length of the Short in seconds.
+    :param hop: Analysis resolution in seconds; the chosen start is a multiple of it.
+    :param onset_weight: Weight of onset strength relative to loudness.
+    :param block_seconds: Seconds of audio read from the pipe at a time.
+    :return: A dictionary with start, score, analysed duration and elapsed seconds,
+        or None if the source has no usable audio or is not longer than the window.
+    """
+    sample_rate = sample_rate or config.HIGHLIGHT_SAMPLE_RATE
+    hop = hop or config.HIGHLIGHT_HOP
+    onset_weight = config.HIGHLIGHT_ONSET_WEIGHT if onset_weight is None else onset_weight
+
+    hop_samples = max(1, int(round(sample_rate * hop)))
+    window_hops = max(1, int(round(window / hop)))
+    block_bytes = max(1, int(block_seconds * sample_rate) // hop_samples) * hop_samples * 2
+
+    command = [
+        config.FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-nostdin',
+        '-i', input_path, '-map', '0:a:0', '-vn', '-sn', '-dn',
+        '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1'
+    ]
+    started = time.monotonic()
+    scorer = _WindowScorer(window_hops, onset_weight)
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        remainder = b''
+        while True:
+            chunk = process.stdout.read(block_bytes)
+            if not chunk:
+                break
+            data = remainder + chunk
+            usable = len(data) - len(data) % (hop_samples * 2)
+            remainder = data[usable:]
+            if usable:
+                samples = np.frombuffer(data[:usable], dtype='<i2').reshape(-1, hop_samples)
+                scorer.feed(_loudness_db(samples))
+        _, stderr = process.communicate()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    if process.returncode != 0:
+        logger.warning(f"Highlight analysis of {input_path} failed: {stderr.decode('utf-8', 'replace').strip()}")
+        return None
+    if scorer.hops <= window_hops:
+        return None
+
+    return {
+        'start': round(scorer.best_start * hop, 3),
+        'score': round(scorer.best_score / window_hops, 3),
+        'analysed_duration': round(scorer.hops * hop, 3),
+        'elapsed': time.monotonic() - started,
+    }
+
+
+def _loudness_db(frames):
+    """RMS level in dBFS of each row of int16 samples."""
+    frames = frames.astype(np.float32) / 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return np.maximum(20.0 * np.log10(np.maximum(rms, 1e-12)), SILENCE_DB)
+
+
+class _WindowScorer:
+    """
+    Running best window over a stream of per-hop loudness values.
+    Only the last `window_hops - 1` hop scores and the previous loudness are carried
+    between blocks.
+    """
+
+    def __init__(self, window_hops, onset_weight):
+        self.window_hops = window_hops
+        self.onset_weight = onset_weight
+        self.hops = 0
+        self.best_start = 0
+        self.best_score = -np.inf
+        self._previous_db = None
+        self._tail = np.empty(0, dtype=np.float64)
+
+    def feed(self, loudness):
+        previous = loudness[0] if self._previous_db is None else self._previous_db
+        onset = np.maximum(np.diff(loudness, prepend=previous), 0.0)
+        self._previous_db = loudness[-1]
+        scores = np.concatenate((self._tail, loudness + self.onset_weight * onset))
+
+        # scores[0]는 전체 스트림에서 (self.hops - len(self._tail))번째 홉입니다
+        offset = self.hops - len(self._tail)
+        self.hops += len(loudness)
+        if len(scores) >= self.window_hops:
+            cumulative = np.concatenate(([0.0], np.cumsum(scores)))
+            sums = cumulative[self.window_hops:] - cumulative[:-self.window_hops]
+            best = int(np.argmax(sums))
+            if sums[best] > self.best_score:
+                self.best_score = float(sums[best])
+                self.best_start = offset + best
+        self._tail = scores[-(self.window_hops - 1):] if self.window_hops > 1 else scores[:0]
@@ -1,26 +1,26 @@
+import contextlib
 import json
 import logging
 import os
 import ssl
 import certifi
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pytubefix import YouTube
-from moviepy.editor import VideoFileClip
+from pytubefix.exceptions import BotDetection, LoginRequired, PoTokenRequired, VideoUnavailable
 from src.core import config
 from src.core import ffmpeg_utils
+from src.core import logging_config
+from src.core import metrics
+from src.core.manifest import get_manifest
+from src.core.state_store import get_state_store
+from src.processing.download_cache import DownloadCache
+from src.processing.transcode import encode_threads_per_job, transcode_job
 from datetime import datetime
 # from typing import Tuple # Removed as dummy_po_token_verifier is no longer needed
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 핸들러가 없으면 추가
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-
 # Removed dummy verifiers as they interfere with pytubefix's token handling
 # def dummy_oauth_verifier(verification_url: str, user_code: str):
 #     logger.error(f"Attempted interactive OAuth verification in headless environment. This is not supported. Please ensure token.json is valid and accessible via GCS. Verification URL: {verification_url}, User Code: {user_code}")
@@ -39,6 +39,18 @@ class VideoProcessor:
     def __init__(self):
         self.config = config
         self.processed_videos = []
+        # 비디오 ID + itag 기준 다운로드 캐시 (재실행 시 네트워크 생략)
+        self.download_cache = DownloadCache()
+        self.store = get_state_store()
+        # 항목별 단계 기록 (입력 해시 + 파라미터가 같으면 재인코딩 생략)
+        self.manifest = get_manifest()
+        # 작업별 인코딩 통계 (모드, 소요 시간, fps, 스레드 수)
+        self.encode_stats = []
+        # 동시 인코딩 수에 맞춰 코어를 나눠 x264 스레드 수를 정합니다
+        self.max_parallel_encodes = 1
+        if self.config.TRANSCODE_MODE == "process":
+            self.max_parallel_encodes = max(1, self.config.MAX_PARALLEL_ENCODES)
+        self.encode_threads = encode_threads_per_job(self.max_parallel_encodes)
         # SSL 컨텍스트 설정
         self.ssl_context = ssl.create_default_context(cafile=certifi.where())
         self.ssl_context.check_hostname = False
@@ -60,79 +72,252 @@ class VideoProcessor:
             logger.error(f"Invalid input for run_processing: Expected a list, got {type(videos_data)}")
             return 0
 
-        for video in videos_data:
-            try:
-                logger.info(f"Processing video: {video.get('id')}")
-                video_id = video.get('id')
-                if not video_id:
+        # 다운로드는 제한된 스레드 풀에서 병렬로 진행하고, 끝나는 대로 트랜스코딩에 넘깁니다.
+        # process 모드에서는 트랜스코딩도 프로세스 풀에서 동시에 실행됩니다.
+        os.makedirs(self.config.PROCESSED_DIR, exist_ok=True)
+        jobs = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.config.DOWNLOAD_WORKERS)) as downloader, \
+                self.transcode_executor() as encoder:
+            downloads = {}
+            for index, video in enumerate(videos_data):
+                if not video.get('id'):
                     logger.warning(f"Skipping video due to missing ID: {video}")
                     continue
-                
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                
-                logger.info(f"YouTube 객체 생성 시도: {url}")
-                yt = YouTube(
-                    url,
-                    use_oauth=True,
-                    allow_oauth_cache=True
-                    # Removed dummy verifiers: oauth_verifier=dummy_oauth_verifier, po_token_verifier=dummy_po_token_verifier
-                )
-                logger.info("YouTube 객체 생성 성공")
-                
-                logger.info(f"스트림 선택 시도 for {url}...")
-                stream = yt.streams.filter(file_extension='mp4', progressive=True).order_by('resolution').desc().first()
-                if not stream:
-                    logger.warning(f"No suitable stream found for video: {url}. Skipping.")
+                downloads[downloader.submit(self.download_video, video)] = index
+
+            for future in as_completed(downloads):
+                index = downloads[future]
+                url = f"https://www.youtube.com/watch?v={videos_data[index].get('id')}"
+                try:
+                    downloaded = future.result()
+                    if not downloaded:
+                        continue
+
+                    reused = self._reusable_output(videos_data[index]['id'], downloaded)
+                    if reused:
+                        jobs[index] = (url, downloaded, reused)
+                        continue
+
+                    logger.info(f"Processing downloaded video: {downloaded['path']}")
+                    if encoder is None:
+                        processed_path = self._process_video(downloaded['path'], title=downloaded.get('title'))
+                        jobs[index] = (url, downloaded, processed_path)
+                    else:
+                        processed_path = self._processed_path_for(downloaded['path'])
+                        job = encoder.submit(
+                            transcode_job, downloaded['path'], processed_path,
+                            self.config.SHORT_DURATION, self.encode_threads, downloaded.get('title'))
+                        jobs[index] = (url, downloaded, job)
+
+                except Exception as e:
+                    logger.error(f"Error processing video {url}: {str(e)}", exc_info=True)
+                    continue
+
+            # 결과는 입력 순서대로 모읍니다
+            for index in sorted(jobs):
+                url, downloaded, job = jobs[index]
+                try:
+                    if not isinstance(job, Future):
+                        processed_path = job
+                    else:
+                        processed_path = self._finish_transcode(
+                            downloaded['path'], self._processed_path_for(downloaded['path']), job.result())
+
+                    if processed_path:
+                        self._record_processed(videos_data[index]['id'], url, downloaded, processed_path)
+                        processed_count += 1
+                        logger.info(f"Successfully processed video: {url}")
+                    else:
+                        self.manifest.mark_failed(videos_data[index]['id'], "transcode")
+
+                except Exception as e:
+                    self.manifest.mark_failed(videos_data[index]['id'], f"transcode: {e}")
+                    logger.error(f"Error processing video {url}: {str(e)}", exc_info=True)
                     continue
-                logger.info(f"스트림 선택 성공: {stream.resolution} for {url}")
-                
-                logger.info(f"비디오 다운로드 시도: {url} to {self.config.DOWNLOADS_DIR}")
-                output_path = stream.download(output_path=self.config.DOWNLOADS_DIR)
-                logger.info(f"비디오 다운로드 완료: {output_path}")
-                
-                logger.info(f"Processing downloaded video: {output_path}")
-                processed_path = self._process_video(output_path)
-                
-                if processed_path:
-                    self.processed_videos.append({
-                        'original_url': url,
-                        'processed_path': processed_path,
-                        'title': yt.title
-                    })
-                    processed_count += 1
-                    logger.info(f"Successfully processed video: {url}")
-                
-            except Exception as e:
-                logger.error(f"Error processing video {url}: {str(e)}", exc_info=True)
-                continue
         
         logger.info(f"Video processing phase completed. Successfully processed {processed_count} videos.")
         return processed_count
 
-    def _process_video(self, video_path):
-        """비디오 처리"""
+    def process_one(self, video, downloaded, threads=None, executor=None):
+        """
+        Transcodes one downloaded video and records it, waiting for the encode.
+        Used by the streaming pipeline, whose transcode workers each run one job at a time.
+        :param downloaded: The result of download_video ({'path', 'title'}).
+        :param threads: x264 threads for this encode (default: self.encode_threads).
+        :param executor: The pool from transcode_executor(); None encodes in the calling thread.
+        :return: The processed video entry, or None if transcoding failed.
+        """
+        url = f"https://www.youtube.com/watch?v={video['id']}"
+        processed_path = (self._reusable_output(video['id'], downloaded)
+                          or self._process_video(downloaded['path'], threads, downloaded.get('title'), executor))
+        if not processed_path:
+            self.manifest.mark_failed(video['id'], "transcode")
+            return None
+        logger.info(f"Successfully processed video: {url}")
+        return self._record_processed(video['id'], url, downloaded, processed_path)
+
+    def _record_processed(self, video_id, url, downloaded, processed_path):
+        entry = {
+            'video_id': video_id,
+            'original_url': url,
+            'processed_path': processed_path,
+            'title': downloaded['title'],
+            'thumbnail_path': self._thumbnail_for(processed_path)
+        }
+        self.processed_videos.append(entry)
+        self.store.add_processed(video_id, processed_path, downloaded['title'], url)
+        self.manifest.mark(video_id, "processed",
+                           self.manifest.processing_fingerprint(downloaded['path']), processed_path)
+        return entry
+
+    def _thumbnail_for(self, processed_path):
+        """
+        처리된 쇼츠의 썸네일 경로를 반환합니다. 결과물보다 오래된 썸네일은 다시 만들고,
+        만들 수 없으면 None을 반환합니다 (업로드는 썸네일 없이 진행).
+        """
+        if not self.config.THUMBNAIL_ENABLED:
+            return None
+        name = os.path.splitext(os.path.basename(processed_path))[0]
+        thumbnail_path = os.path.join(self.config.THUMBNAILS_DIR, f"{name}.jpg")
         try:
-            processed_dir = self.config.PROCESSED_DIR
-            os.makedirs(processed_dir, exist_ok=True)
-            
-            video_id = os.path.basename(video_path).split('.')[0]
-            processed_path = os.path.join(processed_dir, f"{video_id}_short.mp4")
-            
-            logger.info(f"Loading video clip: {video_path}")
-            video = VideoFileClip(video_path)
-            
-            if video.duration > self.config.SHORT_DURATION:
-                video = video.subclip(0, self.config.SHORT_DURATION)
-                logger.info(f"Video clipped to {self.config.SHORT_DURATION} seconds.")
+            if os.path.getmtime(thumbnail_path) >= os.path.getmtime(processed_path):
+                return thumbnail_path
+        except OSError:
+            pass
+        try:
+            # numpy는 썸네일을 만들 때만 불러옵니다
+            from src.processing.thumbnail import generate_thumbnail
+            os.makedirs(self.config.THUMBNAILS_DIR, exist_ok=True)
+            result = generate_thumbnail(processed_path, thumbnail_path)
+        except Exception as e:
+            logger.warning(f"Thumbnail generation failed for {processed_path}: {e}")
+            return None
+        if not result:
+            return None
+        metrics.THUMBNAIL_SECONDS.observe(result['elapsed'])
+        logger.info(f"Thumbnail for {os.path.basename(processed_path)}: keyframe at {result['time']:.1f}s "
+                    f"of {result['candidates']} (score {result['score']:.2f}) in {result['elapsed']:.2f}s")
+        return thumbnail_path
+
+    def _reusable_output(self, video_id, downloaded):
+        """처리 결과가 같은 원본·파라미터로 이미 만들어져 있으면 그 경로를, 아니면 None을 반환합니다."""
+        expected = self.manifest.processing_fingerprint(downloaded['path'])
+        processed_path = self.manifest.completed_output(video_id, "processed", expected)
+        if processed_path:
+            logger.info(f"Reusing processed video for {video_id}: {processed_path}")
+            return processed_path
+        return None
+
+    def download_video(self, video):
+        """
+        비디오 한 개를 다운로드합니다. 적절한 스트림이 없으면 None을 반환합니다.
+        비공개/삭제 등 영구적인 실패만 'failed'로 기록하고, 타임아웃·5xx 같은 일시적인
+        실패는 다음 실행에서 DOWNLOAD_MAX_ATTEMPTS번까지 다시 시도합니다.
+        """
+        video_id = video.get('id')
+        try:
+            downloaded = self._download(video)
+        except Exception as e:
+            if _is_permanent_download_error(e):
+                self.manifest.mark_failed(video_id, f"download: {e}")
+            else:
+                attempts = self.manifest.mark_retry(video_id, f"download: {e}")
+                logger.warning(f"Download of {video_id} failed (attempt {attempts}/{config.DOWNLOAD_MAX_ATTEMPTS}): {e}")
+            raise
+        if not downloaded:
+            self.manifest.mark_failed(video_id, "download: no suitable stream")
+        else:
+            self.manifest.clear_retry(video_id)
+        return downloaded
+
+    def _download(self, video):
+        video_id = video.get('id')
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        logger.info(f"Processing video: {video_id}")
+
+        cached = self.download_cache.lookup(video_id)
+        if cached:
+            logger.info(f"캐시된 다운로드 사용: {cached['path']}")
+            return self._record_downloaded(video_id, cached)
+
+        logger.info(f"YouTube 객체 생성 시도: {url}")
+        yt = YouTube(
+            url,
+            use_oauth=True,
+            allow_oauth_cache=True
+            # Removed dummy verifiers: oauth_verifier=dummy_oauth_verifier, po_token_verifier=dummy_po_token_verifier
+        )
+        logger.info("YouTube 객체 생성 성공")
+
+        logger.info(f"스트림 선택 시도 for {url}...")
+        stream = yt.streams.filter(file_extension='mp4', progressive=True).order_by('resolution').desc().first()
+        if not stream:
+            logger.warning(f"No suitable stream found for video: {url}. Skipping.")
+            return None
+        logger.info(f"스트림 선택 성공: {stream.resolution} for {url}")
+
+        logger.info(f"비디오 다운로드 시도: {url} to {self.download_cache.cache_dir}")
+        cached = self.download_cache.fetch(video_id, stream, yt.title)
+        logger.info(f"비디오 다운로드 완료: {cached['path']}")
+
+        return self._record_downloaded(video_id, cached)
+
+    def _record_downloaded(self, video_id, cached):
+        self.manifest.mark(video_id, "downloaded", self.manifest.digest(cached['path']), cached['path'])
+        return {'path': cached['path'], 'title': cached['title']}
+
+    def transcode_executor(self):
+        """process 모드이면 인코딩용 프로세스 풀을, 아니면 None을 반환하는 컨텍스트를 만듭니다."""
+        if self.config.TRANSCODE_MODE != "process":
+            return contextlib.nullcontext()
+        logger.info(f"Transcoding with up to {self.max_parallel_encodes} parallel encodes, "
+                    f"{self.encode_threads} threads each.")
+        # 다운로드 스레드가 도는 중에 fork 하지 않도록 spawn 컨텍스트를 사용합니다
+        context = multiprocessing.get_context("spawn")
+        # spawn된 워커는 로깅 설정이 없으므로 로그를 큐로 부모 프로세스의 핸들러에 보냅니다
+        return ProcessPoolExecutor(max_workers=self.max_parallel_encodes, mp_context=context,
+                                   initializer=logging_config.configure_worker,
+                                   initargs=(logging_config.worker_log_queue(context), logging.getLogger().level))
+
+    def _processed_path_for(self, video_path):
+        """원본 파일 경로에 대응하는 처리 결과 경로를 반환합니다."""
+        video_id = os.path.basename(video_path).split('.')[0]
+        return os.path.join(self.config.PROCESSED_DIR, f"{video_id}_short.mp4")
+
+    def _finish_transcode(self, video_path, processed_path, stats):
+        """인코딩 통계를 기록합니다. 원본은 다운로드 캐시에 남겨 재실행 시 재사용합니다."""
+        stats = dict(stats, video_path=video_path)
+        self.encode_stats.append(stats)
+        metrics.ENCODE_SECONDS.labels(stats['mode']).observe(stats['elapsed'])
+        if stats['fps']:
+            metrics.ENCODE_FPS.labels(stats['mode']).observe(stats['fps'])
+        logger.info(f"Video processed with mode '{stats['mode']}' "
+                    f"(source {stats['source_duration']:.1f}s, {stats['video_codec']}, from {stats['start_time']:.1f}s) in "
+                    f"{stats['elapsed']:.2f}s at {stats['fps']:.1f} fps using {stats['threads']} threads.")
+        return processed_path
+
+    def _process_video(self, video_path, threads=None, title=None, executor=None):
+        """비디오 처리 (executor가 있으면 인코딩 프로세스 풀에서 실행하고 끝날 때까지 기다립니다)"""
+        try:
+            os.makedirs(self.config.PROCESSED_DIR, exist_ok=True)
+            processed_path = self._processed_path_for(video_path)
             
+            # ffprobe 결과에 따라 리먹스/스트림 복사/재인코딩 중 하나로 처리
             logger.info(f"Writing processed video to: {processed_path}")
-            video.write_videofile(processed_path, codec='libx264', audio_codec='aac')
-            video.close()
-            
-            logger.info(f"Original video removed: {video_path}")
-            os.remove(video_path)
-            
-            return processed_path
+            args = (video_path, processed_path, self.config.SHORT_DURATION, threads or self.encode_threads, title)
+            stats = executor.submit(transcode_job, *args).result() if executor else transcode_job(*args)
+            return self._finish_transcode(video_path, processed_path, stats)
         except Exception as e:
             logger.error(f"Error processing video {video_path}: {str(e)}", exc_info=True)
             return None
+
+
+
+def _is_permanent_download_error(error):
+    """
+    True for failures a later run cannot fix (private, removed, region-blocked videos...).
+    Bot checks and login/PO token prompts depend on the session, so they are retried.
+    """
+    if isinstance(error, (BotDetection, LoginRequired, PoTokenRequired)):
+        return False
+    return isinstance(error, VideoUnavailable)
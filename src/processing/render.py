@@ -0,0 +1,338 @@
+"""
+Single-pass Short renderer.
+
+plan_render() turns a declarative RenderSpec into one ffmpeg command whose filter_complex
+reframes the source to 9:16 (crop, or fit over a blurred copy of itself), overlays the title,
+ducks background music under the original audio and concatenates the intro and outro.
+Each Short is decoded and encoded once, with no intermediate files, instead of going
+through a chain of file-to-file ffmpeg_utils steps.
+
+With the asset cache (processing/assets.py) enabled, the intro and outro are not part of
+the graph: only the main part is encoded, in the same profile as the cached bumpers, and
+the three are joined by concat-demuxer stream copy. Music is read from its cached PCM.
+
+Runs in transcode pool workers, so it only depends on the standard library and ffmpeg_utils;
+Pillow is imported when a title is actually rasterised (core/titles.py).
+"""
+import hashlib
+import logging
+import os
+import re
+import subprocess
+from dataclasses import dataclass, replace
+
+from src.core import config
+from src.core import ffmpeg_utils
+
+from .assets import get_asset_cache, output_profile, profile_output_args
+
+logger = logging.getLogger(__name__)
+
+# 모든 세그먼트의 오디오를 같은 형식으로 맞춰야 concat/amix가 동작합니다
+AUDIO_FORMAT = "aresample=44100,aformat=sample_fmts=fltp:channel_layouts=stereo"
+MUSIC_EXTENSIONS = ('.mp3', '.m4a', '.aac', '.wav', '.ogg', '.flac')
+
+_CROP = re.compile(r"crop=(\d+):(\d+):(\d+):(\d+)")
+
+
+def usable_asset(path):
+    """Returns path if it is a non-empty file, else None (the repository ships empty placeholders)."""
+    try:
+        return path if path and os.path.getsize(path) > 0 else None
+    except OSError:
+        return None
+
+
+def music_tracks(music_dir=None):
+    """Usable background tracks in music_dir (default config.MUSIC_DIR), sorted by name."""
+    music_dir = music_dir or config.MUSIC_DIR
+    try:
+        names = sorted(name for name in os.listdir(music_dir) if name.lower().endswith(MUSIC_EXTENSIONS))
+    except OSError:
+        return []
+    return [path for path in (os.path.join(music_dir, name) for name in names) if usable_asset(path)]
+
+
+def pick_music(key, music_dir=None):
+    """Picks a background track from music_dir, always the same one for a given key (None if empty)."""
+    tracks = music_tracks(music_dir)
+    if not tracks:
+        return None
+    return tracks[int(hashlib.sha1(str(key).encode('utf-8')).hexdigest(), 16) % len(tracks)]
+
+
+@dataclass
+class RenderSpec:
+    """
+    Declarative description of one Short.
+    :param duration: Maximum length of the whole Short, intro and outro included.
+    :param reframe: "crop", "pad" or "auto" (see config.RENDER_REFRAME).
+    :param title: Text overlaid on the source part (None for no title).
+    :param music: Background track, looped and ducked under the source audio (None for none).
+    """
+    source: str
+    output: str
+    start: float = 0.0
+    duration: float = None
+    width: int = 1080
+    height: int = 1920
+    fps: int = 30
+    reframe: str = "auto"
+    title: str = None
+    font_file: str = None
+    font_size: int = 64
+    title_position: str = "top"
+    music: str = None
+    music_volume: float = 0.3
+    duck: bool = True
+    intro: str = None
+    outro: str = None
+    threads: int = None
+
+    @classmethod
+    def from_config(cls, source, output, start=0.0, duration=None, title=None, threads=None):
+        """Builds a spec from the configured resolution, assets and render settings."""
+        width, height = config.OUTPUT_RESOLUTION
+        return cls(
+            source=source, output=output, start=start, duration=duration,
+            width=width, height=height, fps=config.RENDER_FPS, reframe=config.RENDER_REFRAME,
+            title=title if config.RENDER_TITLE else None,
+            font_file=usable_asset(config.FONT_FILE), font_size=config.RENDER_TITLE_FONT_SIZE,
+            music=pick_music(os.path.basename(source)), music_volume=config.RENDER_MUSIC_VOLUME,
+            intro=usable_asset(config.INTRO_CLIP), outro=usable_asset(config.OUTRO_CLIP),
+            threads=threads)
+
+
+class RenderPlan:
+    """ffmpeg arguments for one spec, with what the planner decided."""
+
+    def __init__(self, args, filter_complex, duration, reframe, info):
+        self.args = args
+        self.filter_complex = filter_complex
+        self.duration = duration
+        self.reframe = reframe
+        self.info = info
+
+
+class _Graph:
+    """Collects input arguments and filter statements for one filter_complex."""
+
+    def __init__(self):
+        self.input_args = []
+        self.statements = []
+        self._inputs = 0
+
+    def input(self, path, start=0.0, duration=None, loop=False):
+        """Adds an input file and returns its index."""
+        if loop:
+            self.input_args += ['-stream_loop', '-1']
+        if start:
+            self.input_args += ['-ss', f"{start:.3f}"]
+        if duration:
+            self.input_args += ['-t', f"{duration:.3f}"]
+        self.input_args += ['-i', path]
+        self._inputs += 1
+        return self._inputs - 1
+
+    def add(self, statement):
+        self.statements.append(statement)
+
+    def silence(self, label, duration):
+        self.add(f"anullsrc=r=44100:cl=stereo,atrim=duration={duration:.3f}[{label}]")
+
+    @property
+    def filter_complex(self):
+        return ';'.join(self.statements)
+
+
+def detect_crop(input_path, start=0.0, duration=None):
+    """
+    Finds the picture area inside black bars (letterbox/pillarbox) with cropdetect.
+    Only keyframes are decoded, so this costs a small fraction of an encode.
+    :return: (width, height, x, y) of the picture, or None if nothing was detected.
+    """
+    command = [config.FFMPEG_BINARY, '-hide_banner', '-nostdin', '-skip_frame', 'nokey']
+    if start:
+        command += ['-ss', f"{start:.3f}"]
+    if duration:
+        command += ['-t', f"{duration:.3f}"]
+    command += ['-i', input_path, '-map', '0:v:0', '-vf', 'cropdetect=limit=24:round=2:reset=0',
+                '-f', 'null', '-']
+    result = subprocess.run(command, capture_output=True, text=True, errors='replace')
+    matches = _CROP.findall(result.stderr)
+    if result.returncode != 0 or not matches:
+        return None
+    # reset=0 이므로 마지막 값이 전체 구간에서 검출된 영역의 합집합입니다
+    width, height, x, y = (int(value) for value in matches[-1])
+    return (width, height, x, y) if width > 0 and height > 0 else None
+
+
+def _even(value):
+    return max(2, int(value) // 2 * 2)
+
+
+def crop_box(width, height, target_width, target_height):
+    """Largest centred box with the target aspect ratio that fits inside width x height."""
+    if width * target_height > height * target_width:
+        return _even(height * target_width / target_height), _even(height)
+    return _even(width), _even(width * target_height / target_width)
+
+
+def choose_reframe(spec, content_width, content_height):
+    """Resolves "auto" to "crop" or "pad" by how much of the picture a crop would cut away."""
+    if spec.reframe != "auto":
+        return spec.reframe
+    box_width, box_height = crop_box(content_width, content_height, spec.width, spec.height)
+    loss = 1 - (box_width * box_height) / float(content_width * content_height)
+    return "crop" if loss <= config.RENDER_MAX_CROP_LOSS else "pad"
+
+
+def plan_render(spec, info=None):
+    """
+    Builds the single ffmpeg command for spec.
+    :param info: probe() result of spec.source, if the caller already has it.
+    :return: A RenderPlan.
+    :raises ValueError: If the source has no video or the intro/outro leave no room for it.
+    """
+    info = info or ffmpeg_utils.probe(spec.source)
+    if not info['video_codec']:
+        raise ValueError(f"{spec.source} has no video stream")
+
+    graph = _Graph()
+    width, height = spec.width, spec.height
+    normalise = f"fps={spec.fps},format=yuv420p,setsar=1"
+
+    # 인트로/아웃트로 길이만큼 본편을 줄여 전체 길이(spec.duration)를 지킵니다
+    bumpers = [(role, path, ffmpeg_utils.probe(path))
+               for role, path in (('intro', spec.intro), ('outro', spec.outro)) if path]
+    bumper_seconds = sum(bumper_info['duration'] for _, _, bumper_info in bumpers)
+    main_seconds = max(0.0, info['duration'] - spec.start)
+    if spec.duration:
+        if spec.duration <= bumper_seconds:
+            raise ValueError(f"Intro and outro ({bumper_seconds:.1f}s) leave no room in a {spec.duration}s Short")
+        budget = spec.duration - bumper_seconds
+        main_seconds = min(main_seconds, budget) if main_seconds else budget
+    if not main_seconds:
+        raise ValueError(f"Cannot determine the duration of {spec.source}")
+
+    # --- 본편 영상: 검은 여백 제거 → 9:16 크롭 또는 블러 배경 위에 맞춤 → 제목 ---
+    main = graph.input(spec.source, start=spec.start, duration=main_seconds)
+    crop = detect_crop(spec.source, spec.start, main_seconds)
+    content_width, content_height = (crop[0], crop[1]) if crop else (info['width'], info['height'])
+    trim_bars = f"crop={crop[0]}:{crop[1]}:{crop[2]}:{crop[3]}," if crop and crop[:2] != (info['width'], info['height']) else ""
+    reframe = choose_reframe(spec, content_width, content_height)
+
+    if reframe == "crop":
+        box_width, box_height = crop_box(content_width, content_height, width, height)
+        graph.add(f"[{main}:v]{trim_bars}crop={box_width}:{box_height},scale={width}:{height},{normalise}[main_v0]")
+    else:
+        # 배경은 1/4 해상도에서 블러한 뒤 확대합니다 (전체 해상도 블러보다 훨씬 빠름)
+        graph.add(f"[{main}:v]{trim_bars}split=2[main_fg][main_bg]")
+        graph.add(f"[main_bg]scale={_even(width / 4)}:{_even(height / 4)}:force_original_aspect_ratio=increase,"
+                  f"crop={_even(width / 4)}:{_even(height / 4)},boxblur=10:2,scale={width}:{height}[main_blur]")
+        graph.add(f"[main_fg]scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2[main_fit]")
+        graph.add(f"[main_blur][main_fit]overlay=(W-w)/2:(H-h)/2,{normalise}[main_v0]")
+
+    main_video = "main_v0"
+    if spec.title:
+        # 제목은 한 번만 PNG로 래스터화(캐시)하고 overlay 필터로 합성합니다
+        from src.core import titles
+        title = titles.render_title(spec.title, width, spec.font_file, spec.font_size)
+        if title:
+            index = graph.input(title['path'])
+            graph.add(f"[main_v0][{index}:v]{ffmpeg_utils.overlay_filter(spec.title_position)},format=yuv420p[main_v]")
+            main_video = "main_v"
+
+    # --- 본편 오디오: 원본 음성 아래로 배경 음악을 덕킹해서 섞습니다 ---
+    if info['audio_codec']:
+        graph.add(f"[{main}:a]{AUDIO_FORMAT}[main_a0]")
+    else:
+        graph.silence("main_a0", main_seconds)
+    main_audio = "main_a0"
+    if spec.music:
+        music = graph.input(spec.music, loop=True)
+        graph.add(f"[{music}:a]{AUDIO_FORMAT},volume={spec.music_volume},atrim=duration={main_seconds:.3f}[music]")
+        if spec.duck and info['audio_codec']:
+            graph.add("[main_a0]asplit=2[main_a1][main_key]")
+            graph.add("[music][main_key]sidechaincompress=threshold=0.02:ratio=8:attack=20:release=400[music_ducked]")
+            graph.add("[main_a1][music_ducked]amix=inputs=2:duration=first:normalize=0[main_a]")
+        else:
+            graph.add("[main_a0][music]amix=inputs=2:duration=first:normalize=0[main_a]")
+        main_audio = "main_a"
+
+    # --- 인트로/아웃트로: 출력 해상도에 맞춰 패딩하고 concat 필터로 잇습니다 ---
+    segments = {'main': (main_video, main_audio)}
+    for role, path, bumper_info in bumpers:
+        index = graph.input(path)
+        graph.add(f"[{index}:v]scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2,"
+                  f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,{normalise}[{role}_v]")
+        if bumper_info['audio_codec']:
+            graph.add(f"[{index}:a]{AUDIO_FORMAT}[{role}_a]")
+        else:
+            graph.silence(f"{role}_a", bumper_info['duration'])
+        segments[role] = (f"{role}_v", f"{role}_a")
+
+    order = [role for role in ('intro', 'main', 'outro') if role in segments]
+    if len(order) > 1:
+        pads = ''.join(f"[{segments[role][0]}][{segments[role][1]}]" for role in order)
+        graph.add(f"{pads}concat=n={len(order)}:v=1:a=1[out_v][out_a]")
+        out_video, out_audio = "out_v", "out_a"
+    else:
+        out_video, out_audio = segments['main']
+
+    args = (graph.input_args
+            + ['-filter_complex', graph.filter_complex, '-map', f"[{out_video}]", '-map', f"[{out_audio}]"]
+            + ffmpeg_utils.video_encode_args(spec.threads) + ffmpeg_utils.AUDIO_ENCODE_ARGS
+            + profile_output_args(output_profile(width, height, spec.fps))
+            + ['-movflags', '+faststart', spec.output])
+    return RenderPlan(args, graph.filter_complex, bumper_seconds + main_seconds, reframe, info)
+
+
+def render(spec, info=None, assets=None):
+    """
+    Renders spec.output.
+    Without an asset cache (or without intro/outro) this is a single ffmpeg run. With one, the
+    main part is encoded on its own and joined to the cached intro/outro by stream copy.
+    :param assets: AssetCache to use; None for the process-wide one, False to bypass it.
+    :return: A dictionary with mode 'render', the reframe used, the output duration, the probe
+        info and how the bumpers were joined ('graph', 'copy', 'encode' or None).
+    """
+    if assets is None:
+        assets = get_asset_cache()
+    if not assets:
+        return _render_once(spec, info)
+
+    profile = output_profile(spec.width, spec.height, spec.fps)
+    if spec.music:
+        spec = replace(spec, music=assets.prepare_music(spec.music, profile))
+    if not (spec.intro or spec.outro):
+        return _render_once(spec, info)
+
+    intro = assets.prepare_clip(spec.intro, profile) if spec.intro else None
+    outro = assets.prepare_clip(spec.outro, profile) if spec.outro else None
+    bumper_seconds = sum(ffmpeg_utils.probe(path)['duration'] for path in (intro, outro) if path)
+    if spec.duration and spec.duration <= bumper_seconds:
+        raise ValueError(f"Intro and outro ({bumper_seconds:.1f}s) leave no room in a {spec.duration}s Short")
+
+    root, ext = os.path.splitext(spec.output)
+    main_path = f"{root}.main{ext}"
+    main_spec = replace(spec, output=main_path, intro=None, outro=None,
+                        duration=spec.duration - bumper_seconds if spec.duration else None)
+    try:
+        result = _render_once(main_spec, info)
+        concat = ffmpeg_utils.merge_clips([path for path in (intro, main_path, outro) if path], spec.output)
+    finally:
+        if os.path.exists(main_path):
+            os.remove(main_path)
+    if concat != 'copy':
+        logger.warning(f"Bumpers for {spec.output} did not match the main part and were re-encoded.")
+    result.update(duration=bumper_seconds + result['duration'], concat=concat)
+    return result
+
+
+def _render_once(spec, info):
+    plan = plan_render(spec, info)
+    logger.debug(f"Render graph for {spec.source}: {plan.filter_complex}")
+    ffmpeg_utils.run_ffmpeg(plan.args)
+    return {'mode': 'render', 'reframe': plan.reframe, 'duration': plan.duration, 'info': plan.info,
+            'concat': 'graph' if spec.intro or spec.outro else None}
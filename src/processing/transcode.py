@@ -0,0 +1,59 @@
+import os
+import time
+
+from src.core import config
+from src.core import ffmpeg_utils
+from src.processing.render import RenderSpec, render
+
+# 이 모듈은 프로세스 풀 워커에서 import 되므로 무거운 의존성을 두지 않습니다.
+
+
+def encode_threads_per_job(max_parallel_encodes, cpu_count=None):
+    """
+    Splits the available CPU cores evenly between concurrent encodes.
+    :return: The x264 thread count each job may use (at least 1).
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, max_parallel_encodes))
+
+
+def transcode_job(video_path, processed_path, max_duration, threads=None, title=None):
+    """
+    Turns one downloaded video into a Short. Runs in a pool worker process.
+    Sources longer than max_duration start at their audio highlight (see highlight.py).
+    With RENDER_MODE "render" the Short is rendered in one pass (render.py); otherwise
+    the source is only trimmed.
+    :param title: Title drawn over the Short in render mode.
+    :return: A dictionary with the mode used, elapsed seconds, encoded frames, encode fps
+        and the chosen start offset.
+    """
+    started = time.monotonic()
+    info = ffmpeg_utils.probe(video_path)
+    highlight = None
+    if config.HIGHLIGHT_ENABLED and info['audio_codec'] and info['duration'] > max_duration:
+        # numpy는 하이라이트 분석이 필요한 경우에만 워커에서 불러옵니다
+        from src.processing.highlight import find_highlight
+        highlight = find_highlight(video_path, max_duration)
+    start_time = highlight['start'] if highlight else 0.0
+    if config.RENDER_MODE == "render":
+        spec = RenderSpec.from_config(video_path, processed_path, start=start_time, duration=max_duration,
+                                      title=title, threads=threads)
+        result = render(spec, info=info)
+        frames = int(result['duration'] * spec.fps)
+    else:
+        result = ffmpeg_utils.make_short(video_path, processed_path, max_duration, start_time=start_time,
+                                         threads=threads, info=info)
+        frames = int(min(info['duration'], max_duration) * info['fps'])
+    elapsed = time.monotonic() - started
+
+    return {
+        'mode': result['mode'],
+        'source_duration': info['duration'],
+        'video_codec': info['video_codec'],
+        'threads': threads,
+        'elapsed': elapsed,
+        'frames': frames,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'start_time': start_time,
+        'highlight_seconds': highlight['elapsed'] if highlight else 0.0,
+    }
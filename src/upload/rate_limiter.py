@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from ..core.quota import get_quota_ledger
+from ..core.state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket holding up to `capacity` tokens, refilled at capacity / interval per second.
+    The token count and refill time are persisted so the budget survives restarts.
+    """
+
+    def __init__(self, name, capacity, interval, store=None):
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = self.capacity / float(interval)
+        self.store = store or get_state_store()
+        self._lock = threading.Lock()
+        saved = self.store.get_limiter_state(name)
+        if saved:
+            self.tokens, self.updated = saved
+        else:
+            self.tokens, self.updated = self.capacity, time.time()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Takes `tokens` from the bucket, waiting for a refill if needed.
+        :return: True once acquired, False if it would take longer than timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.time()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.store.save_limiter_state(self.name, self.tokens, self.updated)
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class UploadRateLimiter:
+    """
+    Budgets uploads per interval (token bucket), uploads per day and API units per day
+    (through the quota ledger). Daily counters are backed by the state store, so a second
+    run on the same day sees what the first one used. Also hands out publish times
+    spaced by `interval`, starting `publish_lead` seconds from now.
+    """
+
+    def __init__(self, max_daily_uploads, uploads_per_interval, interval, publish_lead=None,
+                 ledger=None, store=None):
+        self.store = store or get_state_store()
+        self.ledger = ledger or get_quota_ledger()
+        self.max_daily_uploads = max_daily_uploads
+        self.interval = interval
+        self.publish_lead = interval if publish_lead is None else publish_lead
+        self.bucket = TokenBucket("uploads_per_interval", uploads_per_interval, interval, store=self.store)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def reserve(self):
+        """
+        Reserves one upload against the daily budgets and waits for an interval token.
+        :return: True if the upload may proceed, False if a daily budget is exhausted.
+        """
+        with self._lock:
+            uploads_today = self.store.count_uploads_since(_start_of_today()) + self._in_flight
+            if uploads_today >= self.max_daily_uploads:
+                logger.warning(f"Daily upload limit ({self.max_daily_uploads}) reached.")
+                return False
+            # 실제 차감은 upload_video가 원자적으로 수행하며, 여기서는 미리 걸러냅니다
+            if not self.ledger.can_afford("videos.insert"):
+                logger.warning(f"Daily API unit budget exhausted ({self.ledger.remaining()} units left).")
+                return False
+            self._in_flight += 1
+
+        self.bucket.acquire()
+        return True
+
+    def remaining(self):
+        """Uploads the daily budgets still allow today, not counting in-flight reservations."""
+        with self._lock:
+            if not self.ledger.can_afford("videos.insert"):
+                return 0
+            return max(0, self.max_daily_uploads - self.store.count_uploads_since(_start_of_today()))
+
+    def release(self):
+        """Ends an in-flight reservation (after the upload was recorded or failed)."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def next_publish_time(self):
+        """
+        Returns the next publish time (UTC datetime), at least `interval` seconds after
+        the previously scheduled one, so published Shorts are spaced without sleeping.
+        The time is never earlier than `publish_lead` seconds from now: YouTube rejects or
+        ignores a publishAt that has already passed by the time the upload completes.
+        """
+        with self._lock:
+            now = time.time()
+            earliest = now + self.publish_lead
+            saved = self.store.get_limiter_state("next_publish_ts")
+            publish_ts = max(earliest, saved[0] if saved else earliest)
+            self.store.save_limiter_state("next_publish_ts", publish_ts + self.interval, now)
+        return datetime.fromtimestamp(publish_ts, tz=timezone.utc)
+
+
+def _start_of_today():
+    return datetime.combine(datetime.now().date(), datetime.min.time())
+
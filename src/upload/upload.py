@@ -1,104 +1,133 @@
 import os
-import json
 import logging
-import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from ..core import config
 from ..core.youtube_api import YouTubeAPI
+from ..core.manifest import get_manifest
+from ..core.state_store import get_state_store
+from .rate_limiter import UploadRateLimiter
 # from google.oauth2.credentials import Credentials # 더 이상 필요 없음
-
-# 하루 최대 업로드 수 제한
-MAX_DAILY_UPLOADS = 5
-# 업로드 간격 (초)
-UPLOAD_INTERVAL = 60
+# 업로드 예산·간격·동시성 설정은 core/config.py에 있습니다 (환경 변수로 조정)
 
 def get_today_uploads():
     """오늘 업로드된 비디오 수를 반환합니다."""
-    try:
-        with open(config.UPLOADED_VIDEOS_FILE, 'r', encoding='utf-8') as f:
-            uploaded_videos = json.load(f)
-            today = datetime.now().date()
-            today_uploads = sum(1 for video in uploaded_videos 
-                              if datetime.fromisoformat(video.get('uploaded_at', '')).date() == today)
-            return today_uploads
-    except (FileNotFoundError, json.JSONDecodeError):
-        return 0
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    return get_state_store().count_uploads_since(today)
 
 def run_upload(processed_videos: list, credentials):
     """
     Finds processed videos and uploads them to YouTube.
+    Uploads run concurrently within the budgets of UploadRateLimiter; when the target
+    privacy is public, publish times are spaced by UPLOAD_INTERVAL instead of sleeping.
+    Note that such videos are uploaded as private with a publishAt time (at least
+    PUBLISH_LEAD_TIME from now), so they only become public when YouTube publishes them.
+    """
+    if not processed_videos:
+        logging.warning("No processed videos found to upload.")
+        return []
+
+    uploader = prepare_upload(credentials)
+    if uploader is None:
+        return []
+    api, limiter = uploader
+
+    logging.info(f"Found {len(processed_videos)} videos to upload.")
+
+    with ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_UPLOADS) as executor:
+        results = list(executor.map(lambda video_info: upload_one(api, limiter, video_info), processed_videos))
+
+    uploaded_video_log = [result for result in results if result]
+    logging.info(f"Upload process finished. {len(uploaded_video_log)} videos uploaded.")
+    return uploaded_video_log
+
+def prepare_upload(credentials):
+    """
+    Creates the API client and rate limiter shared by upload_one calls.
+    :return: A tuple (api, limiter), or None if uploads cannot run now.
     """
     logging.info("Initializing video upload.")
-    
+
     # 전달받은 credentials 객체로 YouTubeAPI 초기화
     api = YouTubeAPI(credentials=credentials)
-    
+
     if not api.youtube:
         logging.error("Failed to initialize YouTube API client. Aborting upload.")
-        return []
-        
-    if not processed_videos:
-        logging.warning("No processed videos found to upload.")
-        return []
+        return None
 
     # 오늘의 업로드 수 확인
-    today_uploads = get_today_uploads()
-    if today_uploads >= MAX_DAILY_UPLOADS:
-        logging.warning(f"Daily upload limit ({MAX_DAILY_UPLOADS}) reached. Skipping uploads.")
-        return []
+    if get_today_uploads() >= config.MAX_DAILY_UPLOADS:
+        logging.warning(f"Daily upload limit ({config.MAX_DAILY_UPLOADS}) reached. Skipping uploads.")
+        return None
 
-    logging.info(f"Found {len(processed_videos)} videos to upload.")
-    
-    uploaded_video_log = []
+    limiter = UploadRateLimiter(
+        max_daily_uploads=config.MAX_DAILY_UPLOADS,
+        uploads_per_interval=config.UPLOADS_PER_INTERVAL,
+        interval=config.UPLOAD_INTERVAL,
+        publish_lead=config.PUBLISH_LEAD_TIME
+    )
+    return api, limiter
+
+def upload_one(api, limiter, video_info):
+    """비디오 한 개를 업로드 예산 안에서 업로드하고 결과를 기록합니다."""
+    file_path = video_info.get('processed_path')
+    video_title = video_info.get('title', f"Cool Short - {os.path.splitext(os.path.basename(file_path))[0] if file_path else 'untitled'}")
     
-    for video_info in processed_videos:
-        # 일일 업로드 제한 확인
-        if today_uploads >= MAX_DAILY_UPLOADS:
-            logging.warning(f"Daily upload limit ({MAX_DAILY_UPLOADS}) reached. Stopping uploads.")
-            break
-
-        file_path = video_info.get('processed_path')
-        video_title = video_info.get('title', f"Cool Short - {os.path.splitext(os.path.basename(file_path))[0] if file_path else 'untitled'}")
-        
-        if not file_path or not os.path.exists(file_path):
-            logging.warning(f"Processed video file not found or path is invalid: {file_path}. Skipping upload.")
-            continue
-             
-        logging.info(f"Uploading {os.path.basename(file_path)}...")
+    if not file_path or not os.path.exists(file_path):
+        logging.warning(f"Processed video file not found or path is invalid: {file_path}. Skipping upload.")
+        return None
+
+    # 이전 실행에서 이미 업로드한 원본은 다시 올리지 않습니다
+    source_video_id = video_info.get('video_id')
+    if source_video_id and get_state_store().is_uploaded_source(source_video_id):
+        logging.info(f"{source_video_id} was already uploaded. Skipping {os.path.basename(file_path)}.")
+        return None
+
+    # 일일 업로드 제한 / API 쿼터 / 간격당 업로드 수 확인
+    if not limiter.reserve():
+        logging.warning(f"Upload budget exhausted. Skipping {os.path.basename(file_path)}.")
+        return None
+
+    try:
+        publish_at = None
+        if config.UPLOAD_DEFAULTS['privacyStatus'] == 'public':
+            publish_at = limiter.next_publish_time()
 
+        logging.info(f"Uploading {os.path.basename(file_path)}...")
         upload_result = api.upload_video(
             file_path=file_path,
             title=video_title,
             description=config.UPLOAD_DEFAULTS['description'],
             tags=config.UPLOAD_DEFAULTS['tags'],
             category_id=config.UPLOAD_DEFAULTS['categoryId'],
-            privacy_status=config.UPLOAD_DEFAULTS['privacyStatus']
+            privacy_status=config.UPLOAD_DEFAULTS['privacyStatus'],
+            progress_callback=lambda sent, total, name=os.path.basename(file_path): logging.info(
+                f"Uploading {name}: {sent * 100 // max(total, 1)}% ({sent}/{total} bytes)"),
+            publish_at=publish_at
         )
-        
+
         if upload_result and 'id' in upload_result:
             logging.info(f"Successfully uploaded '{video_title}' with ID: {upload_result['id']}")
             # 업로드 시간 추가
             upload_result['uploaded_at'] = datetime.now().isoformat()
-            uploaded_video_log.append(upload_result)
-            today_uploads += 1
-            
-            # 업로드 간격 대기
-            if today_uploads < MAX_DAILY_UPLOADS:
-                logging.info(f"Waiting {UPLOAD_INTERVAL} seconds before next upload...")
-                time.sleep(UPLOAD_INTERVAL)
-        else:
-            logging.error(f"Failed to upload {os.path.basename(file_path)}.")
-            
-    # Save log of uploaded videos
-    try:
-        os.makedirs(os.path.dirname(config.UPLOADED_VIDEOS_FILE), exist_ok=True)
-        with open(config.UPLOADED_VIDEOS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(uploaded_video_log, f, indent=4)
-        logging.info(f"Upload process finished. {len(uploaded_video_log)} videos uploaded.")
-    except IOError as e:
-        logging.error(f"Failed to process upload results: {e}")
+            if publish_at:
+                upload_result['publish_at'] = publish_at.isoformat()
+            thumbnail_path = video_info.get('thumbnail_path')
+            if thumbnail_path and os.path.exists(thumbnail_path):
+                upload_result['thumbnail_set'] = api.set_thumbnail(upload_result['id'], thumbnail_path)
+            # 업로드 기록은 상태 저장소에 추가만 하므로 이전 실행의 기록도 유지됩니다
+            get_state_store().add_upload(upload_result, source_video_id=source_video_id)
+            if source_video_id:
+                get_manifest().mark(source_video_id, "uploaded", upload_result['id'])
+            return upload_result
 
-    return uploaded_video_log
+        logging.error(f"Failed to upload {os.path.basename(file_path)}.")
+        return None
+    except Exception as e:
+        logging.error(f"Failed to upload {os.path.basename(file_path)}: {e}", exc_info=True)
+        return None
+    finally:
+        limiter.release()
 
 if __name__ == '__main__':
     # 로컬 테스트 시 필요한 경우 여기에 인자 전달 로직 추가
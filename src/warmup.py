@@ -0,0 +1,87 @@
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """
+    Background warm-up run once at service start-up.
+
+    The service module imports only what answering a request needs; the pipeline stages,
+    googleapiclient and pytubefix are imported here instead, together with loading the
+    OAuth credentials, building the discovery client and probing the ffmpeg binaries, so
+    the first /run finds everything ready. Each step is independent: a failure is logged
+    and recorded, and the remaining steps still run.
+    """
+
+    def __init__(self, credential_manager):
+        self.credential_manager = credential_manager
+        self.status = "pending"  # pending -> running -> done
+        self.steps = {}
+        self._credentials = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Runs the warm-up on a daemon thread and returns immediately."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def run(self):
+        self.status = "running"
+        for name, step in (
+            ("imports", self._import_stages),
+            ("credentials", self._load_credentials),
+            ("api_client", self._build_api_client),
+            ("ffmpeg", self._probe_ffmpeg),
+            ("assets", self._prepare_assets),
+        ):
+            started = time.monotonic()
+            try:
+                detail = step()
+                outcome = {"status": "ok"}
+                if detail:
+                    outcome["detail"] = detail
+            except Exception as e:
+                logger.warning(f"Warm-up step '{name}' failed: {e}")
+                outcome = {"status": "failed", "error": str(e)}
+            outcome["seconds"] = round(time.monotonic() - started, 3)
+            with self._lock:
+                self.steps[name] = outcome
+        self.status = "done"
+        logger.info(f"Warm-up finished: {self.to_dict()['steps']}")
+
+    def to_dict(self):
+        with self._lock:
+            return {"status": self.status, "steps": {name: dict(step) for name, step in self.steps.items()}}
+
+    def _import_stages(self):
+        importlib.import_module("src.pipeline")
+
+    def _load_credentials(self):
+        self._credentials = self.credential_manager.get()
+
+    def _build_api_client(self):
+        from src.core import api_client
+        if self._credentials is None:
+            return "skipped: no credentials"
+        # discovery 문서 파싱과 서비스 객체 생성을 미리 해 둡니다
+        api_client.get_youtube_client(self._credentials)
+
+    def _probe_ffmpeg(self):
+        from src.core import ffmpeg_utils
+        return ffmpeg_utils.check_binaries()
+
+    def _prepare_assets(self):
+        from src.core import config
+        if config.RENDER_MODE != "render":
+            return "skipped: trim mode"
+        from src.processing.assets import prepare_configured_assets
+        prepared = prepare_configured_assets()
+        return "skipped: asset cache disabled" if prepared is None else prepared
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 코드가 `src.xxx`로 임포트하므로 저장소 루트를 경로에 넣습니다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
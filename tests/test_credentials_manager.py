@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from benchmarks.fakes import FakeBlob, FakeStorageClient
+from src.core import credentials_manager
+from src.core.credentials_manager import CredentialManager, CredentialsUnavailableError
+
+BUCKET = "test-bucket"
+BLOB = "token.json"
+SCOPES = ["https://www.googleapis.com/auth/youtube"]
+
+
+def _store_token(storage, token="stored-token", expires_in=3600):
+    storage.bucket(BUCKET).blob(BLOB).upload_from_string(json.dumps({
+        "token": token,
+        "refresh_token": "refresh-token",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "client_id": "client",
+        "client_secret": "secret",
+        "scopes": SCOPES,
+        "expiry": (datetime.utcnow() + timedelta(seconds=expires_in)).isoformat(),
+    }))
+
+
+def _stored(storage):
+    return json.loads(storage.objects[(BUCKET, BLOB)])
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """Counts writes to the fake blob store."""
+    calls = []
+    upload = FakeBlob.upload_from_string
+
+    def counting_upload(blob, data):
+        calls.append(data)
+        upload(blob, data)
+
+    monkeypatch.setattr(FakeBlob, "upload_from_string", counting_upload)
+    return calls
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Replaces the OAuth token endpoint: each refresh issues a new token valid for an hour."""
+    calls = []
+    lock = threading.Lock()
+
+    def refresh(credentials, request):
+        time.sleep(0.05)
+        with lock:
+            calls.append(credentials)
+            count = len(calls)
+        credentials.token = f"refreshed-{count}"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+    return calls
+
+
+def _manager(storage, **kwargs):
+    return CredentialManager(BUCKET, BLOB, SCOPES, storage_client=storage, **kwargs)
+
+
+def test_concurrent_callers_share_one_refresh(uploads, refreshes):
+    storage = FakeStorageClient()
+    _store_token(storage, expires_in=60)  # 기본 갱신 여유(300초)보다 짧게 남았습니다
+    uploads.clear()
+    manager = _manager(storage)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get())) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        manager.close()
+
+    assert len(refreshes) == 1
+    assert {credentials.token for credentials in results} == {"refreshed-1"}
+    assert len(uploads) == 1
+    assert _stored(storage)["token"] == "refreshed-1"
+
+
+def test_write_back_only_when_token_changed(uploads, refreshes):
+    storage = FakeStorageClient()
+    _store_token(storage)
+    uploads.clear()
+    manager = _manager(storage)
+    try:
+        credentials = manager.get()
+        assert not refreshes
+        assert not uploads
+
+        manager.set(credentials)
+        assert not uploads
+
+        credentials.token = "new-token"
+        manager.set(credentials)
+        assert len(uploads) == 1
+        assert _stored(storage)["token"] == "new-token"
+    finally:
+        manager.close()
+
+
+def test_timer_refreshes_before_expiry(uploads, refreshes):
+    storage = FakeStorageClient()
+    refresh_margin = 300
+    # 만료 301초 전: 타이머가 최소 지연(1초) 뒤에 갱신해야 합니다
+    _store_token(storage, expires_in=refresh_margin + 1)
+    uploads.clear()
+    changed = threading.Event()
+    manager = _manager(storage, refresh_margin=refresh_margin, on_change=lambda credentials: changed.set())
+    try:
+        assert manager.get().token == "stored-token"
+        changed.clear()  # 처음 불러올 때의 알림
+
+        assert changed.wait(timeout=10)
+        assert len(refreshes) == 1
+        assert _stored(storage)["token"] == "refreshed-1"
+        assert manager.get().token == "refreshed-1"
+    finally:
+        manager.close()
+
+
+@pytest.mark.parametrize("blob", [b'{"token": "partial', json.dumps({"token": "only-a-token"}).encode()])
+def test_corrupt_token_blob_is_unavailable(blob):
+    storage = FakeStorageClient()
+    storage.objects[(BUCKET, BLOB)] = blob
+    manager = _manager(storage)
+
+    with pytest.raises(CredentialsUnavailableError):
+        manager.get()
+
+
+def test_failed_background_refresh_is_retried(monkeypatch, refreshes):
+    monkeypatch.setattr(credentials_manager, "RETRY_DELAY", 0.1)
+    upload = FakeBlob.upload_from_string
+    attempts = []
+    written = threading.Event()
+
+    def flaky_upload(blob, data):
+        attempts.append(data)
+        if len(attempts) == 1:
+            raise ConnectionError("GCS unreachable")
+        upload(blob, data)
+        written.set()
+
+    storage = FakeStorageClient()
+    refresh_margin = 300
+    _store_token(storage, expires_in=refresh_margin + 1)
+    monkeypatch.setattr(FakeBlob, "upload_from_string", flaky_upload)
+    manager = _manager(storage, refresh_margin=refresh_margin)
+    try:
+        manager.get()
+        # 첫 갱신 뒤 GCS 저장이 실패해도 타이머가 다시 걸려 저장까지 마쳐야 합니다
+        assert written.wait(timeout=10)
+        assert len(attempts) == 2
+        assert _stored(storage)["token"] == manager.get().token
+    finally:
+        manager.close()
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src.processing.highlight import _WindowScorer
+
+QUIET_DB = -60.0
+LOUD_DB = -10.0
+
+
+def _loudness(hops, loud_start, loud_hops):
+    loudness = np.full(hops, QUIET_DB)
+    loudness[loud_start:loud_start + loud_hops] = LOUD_DB
+    return loudness
+
+
+def _best_start(loudness, window_hops, block_hops, onset_weight=0.5):
+    scorer = _WindowScorer(window_hops, onset_weight)
+    for start in range(0, len(loudness), block_hops):
+        scorer.feed(loudness[start:start + block_hops])
+    return scorer.best_start
+
+
+@pytest.mark.parametrize("block_hops", [50, 7, 1000])
+def test_loud_segment_across_block_boundary(block_hops):
+    # 95..104번 홉이 큰 소리: 블록 크기 50이면 100번 홉의 블록 경계에 걸칩니다
+    loudness = _loudness(300, loud_start=95, loud_hops=10)
+
+    assert _best_start(loudness, window_hops=10, block_hops=block_hops) == 95
+
+
+def test_window_longer_than_block():
+    loudness = _loudness(300, loud_start=130, loud_hops=40)
+
+    assert _best_start(loudness, window_hops=40, block_hops=16, onset_weight=0.0) == 130
@@ -0,0 +1,41 @@
+from src.core.manifest import StageManifest
+from src.core.state_store import StateStore
+
+
+def _manifest(tmp_path, *video_ids):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.add_collected([{"id": video_id, "title": video_id} for video_id in video_ids])
+    for video_id in video_ids:
+        store.set_item_stage(video_id, "collected")
+    return StageManifest(store)
+
+
+def _resumable_ids(manifest):
+    return [video["id"] for video in manifest.resumable()]
+
+
+def test_transient_failures_stay_resumable_until_max_attempts(tmp_path):
+    manifest = _manifest(tmp_path, "a")
+
+    assert manifest.mark_retry("a", "download: timed out", max_attempts=3) == 1
+    assert manifest.mark_retry("a", "download: HTTP Error 503", max_attempts=3) == 2
+    assert _resumable_ids(manifest) == ["a"]
+
+    assert manifest.mark_retry("a", "download: timed out", max_attempts=3) == 3
+    assert _resumable_ids(manifest) == []
+
+
+def test_permanent_failure_is_not_resumed(tmp_path):
+    manifest = _manifest(tmp_path, "a", "b")
+
+    manifest.mark_failed("a", "download: no suitable stream")
+    manifest.mark_retry("b", "download: timed out")
+    assert _resumable_ids(manifest) == ["b"]
+
+
+def test_clear_retry_resets_attempts(tmp_path):
+    manifest = _manifest(tmp_path, "a")
+
+    manifest.mark_retry("a", "download: timed out", max_attempts=3)
+    manifest.clear_retry("a")
+    assert manifest.mark_retry("a", "download: timed out", max_attempts=3) == 1
@@ -0,0 +1,25 @@
+import json
+from datetime import datetime
+
+from src.core.state_store import StateStore
+
+
+def test_legacy_import_keeps_uploads_with_bad_timestamps(tmp_path):
+    video_list = tmp_path / "video_list.json"
+    uploaded = tmp_path / "uploaded_videos.json"
+    video_list.write_text(json.dumps([{"id": "a", "title": "A"}, "not a video"]))
+    uploaded.write_text(json.dumps([
+        {"id": "u1", "source_video_id": "a", "uploaded_at": datetime.now().isoformat()},
+        {"id": "u2", "source_video_id": "b", "uploaded_at": "yesterday-ish"},
+        {"id": "u3", "source_video_id": "c"},
+        {"uploaded_at": "no id"},
+    ]))
+    store = StateStore(str(tmp_path / "state.db"))
+
+    assert store.import_json_files(str(video_list), str(uploaded))
+
+    assert [video["id"] for video in store.list_collected()] == ["a"]
+    assert {upload["id"] for upload in store.list_uploads()} == {"u1", "u2", "u3"}
+    assert store.is_uploaded_source("b") and store.is_uploaded_source("c")
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    assert store.count_uploads_since(today) == 1
@@ -0,0 +1,102 @@
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.core import config
+from src.core import ffmpeg_utils
+from src.processing.thumbnail import frame_metrics, generate_thumbnail, score_frames
+
+needs_ffmpeg = pytest.mark.skipif(
+    not (shutil.which(config.FFMPEG_BINARY) and shutil.which(config.FFPROBE_BINARY)),
+    reason="ffmpeg/ffprobe not installed")
+
+HEIGHT, WIDTH = 36, 64
+
+
+def _textured(rng, level, spread=40):
+    """A noisy frame around `level` (0-255) with some colour."""
+    frame = rng.normal(level, spread, size=(HEIGHT, WIDTH, 3))
+    frame[..., 0] += 20
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def test_near_black_frames_rank_last():
+    rng = np.random.default_rng(0)
+    frames = np.stack([
+        _textured(rng, 120),
+        np.full((HEIGHT, WIDTH, 3), 4, dtype=np.uint8),  # 암전
+        _textured(rng, 90),
+        _textured(rng, 6, spread=30),  # 어둡지만 노이즈로 선명도는 높은 프레임
+        _textured(rng, 160),
+    ])
+
+    scores = score_frames(frame_metrics(frames))
+
+    assert set(np.argsort(scores)[:2]) == {1, 3}
+    assert scores[[0, 2, 4]].min() > scores[[1, 3]].max()
+
+
+def test_metrics_shape_and_range():
+    rng = np.random.default_rng(1)
+    frames = np.stack([_textured(rng, level) for level in (30, 128, 220)])
+
+    metrics = frame_metrics(frames)
+
+    assert set(metrics) == {"sharpness", "brightness", "colourfulness"}
+    for values in metrics.values():
+        assert values.shape == (3,)
+    assert np.all(np.diff(metrics["brightness"]) > 0)
+    assert np.all((metrics["brightness"] >= 0) & (metrics["brightness"] <= 1))
+
+
+def _clip(path, video_filter=None, extra_args=()):
+    """3.5s test pattern with a keyframe every 0.5s."""
+    command = [config.FFMPEG_BINARY, '-loglevel', 'error', '-y', '-f', 'lavfi',
+               '-i', 'testsrc2=s=320x240:r=30:d=3.5']
+    if video_filter:
+        command += ['-vf', video_filter]
+    command += ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-sc_threshold', '0',
+                '-force_key_frames', 'expr:gte(t,n_forced*0.5)', *extra_args, str(path)]
+    subprocess.run(command, check=True)
+    return str(path)
+
+
+@needs_ffmpeg
+def test_generate_thumbnail_picks_the_only_visible_keyframe(tmp_path):
+    # 2.0~2.5초만 보이고 나머지는 검게 칠한 클립: 키프레임 7개 중 2.0초만 정상 노출입니다
+    source = _clip(tmp_path / "source.mp4",
+                   "drawbox=x=0:y=0:w=iw:h=ih:color=black:t=fill:enable='not(between(t,2,2.49))'")
+    output = str(tmp_path / "thumbnail.jpg")
+
+    result = generate_thumbnail(source, output, size=(320, 180))
+
+    assert result["candidates"] == 7
+    assert result["time"] == pytest.approx(2.0, abs=0.05)
+    # 시각이 다른 키프레임으로 잘못 매핑되면 검은 프레임이 잘립니다
+    with Image.open(output) as image:
+        assert image.size == (320, 180)
+        assert np.asarray(image.convert("L")).mean() > 60
+
+
+@needs_ffmpeg
+def test_generate_thumbnail_without_video_returns_none(tmp_path):
+    source = str(tmp_path / "audio.m4a")
+    subprocess.run([config.FFMPEG_BINARY, '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=d=1',
+                    '-c:a', 'aac', source], check=True)
+
+    assert generate_thumbnail(source, str(tmp_path / "thumbnail.jpg")) is None
+
+
+@needs_ffmpeg
+def test_generate_thumbnail_without_decodable_keyframes_returns_none(tmp_path, monkeypatch):
+    # 비디오 스트림이 있다고 보고되지만 디코딩되는 프레임이 하나도 없는 파일
+    source = _clip(tmp_path / "empty.mp4", extra_args=('-frames:v', '0'))
+    monkeypatch.setattr(ffmpeg_utils, "probe", lambda path: {
+        'duration': 3.5, 'video_codec': 'h264', 'audio_codec': None, 'width': 320, 'height': 240, 'fps': 30.0})
+    output = tmp_path / "thumbnail.jpg"
+
+    assert generate_thumbnail(source, str(output)) is None
+    assert not output.exists()